@@ -0,0 +1,240 @@
+"""
+Local stand-in for the Wazuh API serving a generated fleet, for benchmarks. Implements authentication,
+/agents, /groups, /syscollector/{agent_id}/{kind} and /vulnerability/{agent_id} with offset, limit,
+select and agents_list, and can add a fixed latency to every response.
+"""
+import base64
+import json
+import multiprocessing
+import random
+import threading
+import time
+
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List
+from urllib.parse import parse_qs, urlsplit
+
+
+OS_CHOICES = [('ubuntu', 'Ubuntu', '22.04'), ('centos', 'CentOS Linux', '7'), ('windows', 'Microsoft Windows', '10'),
+              ('darwin', 'macOS', '14.2')]
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+
+
+class Fleet:
+    """Deterministic synthetic fleet. Per-agent inventories are generated on first use and then reused"""
+    def __init__(self, agents: int = 1000, groups: int = 10, packages: int = 200, processes: int = 100,
+                 ports: int = 20, vulnerabilities: int = 50, seed: int = 0):
+        self.seed = seed
+        self.counts = {'packages': packages, 'processes': processes, 'ports': ports, 'vulnerabilities': vulnerabilities}
+        self.groups = [{'name': 'default', 'count': agents, 'configSum': 'ab73af41699f13fdd81903b5f23d8d00'}]
+        self.groups += [{'name': f'group-{i:02}', 'count': 0, 'configSum': f'{i:032x}'} for i in range(1, groups)]
+
+        rng = random.Random(seed)
+        self.agents = []
+        for index in range(agents):
+            platform, name, version = rng.choice(OS_CHOICES)
+            agent_groups = ['default'] + ([rng.choice(self.groups[1:])['name']] if len(self.groups) > 1 else [])
+            self.agents.append({
+                'id': f'{index:03}', 'name': f'agent-{index:05}', 'ip': f'10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}',
+                'registerIP': 'any', 'status': rng.choice(['active'] * 8 + ['disconnected', 'never_connected']),
+                'version': 'Wazuh v4.7.2', 'manager': 'wazuh-manager', 'node_name': 'node01', 'group': agent_groups,
+                'os': {'platform': platform, 'name': name, 'version': version, 'arch': 'x86_64'},
+                'dateAdd': '2024-01-01T00:00:00Z', 'lastKeepAlive': f'2024-03-{1 + index % 28:02}T12:00:00Z',
+                'group_config_status': 'synced'})
+        self.by_id = {agent['id']: agent for agent in self.agents}
+
+    @lru_cache(maxsize=None)
+    def inventory(self, agent_id: str, kind: str) -> List[Dict]:
+        rng = random.Random(f'{self.seed}-{agent_id}-{kind}')
+        scan = {'id': 1, 'time': '2024-03-01T00:00:00Z'}
+        if kind == 'packages':
+            return [{'name': f'package-{rng.randrange(5000)}', 'version': f'{rng.randrange(10)}.{rng.randrange(30)}',
+                     'vendor': 'Ubuntu Developers', 'architecture': 'amd64', 'format': 'deb', 'size': rng.randrange(10 ** 6),
+                     'description': 'synthetic package used by the wazuhpy benchmarks', 'scan': scan}
+                    for _ in range(self.counts['packages'])]
+        if kind == 'processes':
+            return [{'pid': str(pid), 'ppid': 1, 'name': f'proc-{rng.randrange(300)}', 'state': 'S', 'euser': 'root',
+                     'cmd': '/usr/bin/synthetic --flag', 'vm_size': rng.randrange(10 ** 6), 'scan': scan}
+                    for pid in range(self.counts['processes'])]
+        if kind == 'ports':
+            return [{'protocol': 'tcp', 'local': {'ip': '0.0.0.0', 'port': rng.randrange(65536)},
+                     'remote': {'ip': '0.0.0.0', 'port': 0}, 'state': 'listening', 'scan': scan}
+                    for _ in range(self.counts['ports'])]
+        if kind == 'vulnerabilities':
+            return [{'cve': f'CVE-2023-{rng.randrange(50000):05}', 'name': f'package-{rng.randrange(5000)}',
+                     'version': '1.0', 'architecture': 'amd64', 'severity': rng.choice(SEVERITIES),
+                     'cvss3_score': round(rng.uniform(1, 10), 1), 'status': 'VALID', 'type': 'PACKAGE',
+                     'condition': 'Package less than 1.1', 'detection_time': '2024-03-01T00:00:00Z'}
+                    for _ in range(self.counts['vulnerabilities'])]
+        if kind == 'os':
+            agent = self.by_id[agent_id]
+            return [{'os': agent['os'], 'architecture': 'x86_64', 'hostname': agent['name'], 'scan': scan}]
+        if kind == 'hardware':
+            return [{'cpu': {'name': 'Synthetic CPU', 'cores': 4, 'mhz': 2400.0},
+                     'ram': {'total': 8 * 2 ** 20, 'free': 2 ** 20}, 'scan': scan}]
+        return []
+
+
+def make_token(lifetime: float) -> str:
+    def encode(part: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip('=')
+    return f"{encode({'alg': 'ES512', 'typ': 'JWT'})}.{encode({'exp': time.time() + lifetime})}.signature"
+
+
+class MockWazuhServer:
+    """
+    Threaded HTTP server answering like the Wazuh API. Use as a context manager, `url` is the base URL
+    to pass to the client.
+    """
+    def __init__(self, fleet: Fleet, latency: float = 0.0, token_lifetime: float = 900):
+        """
+        :param fleet: Agents and inventories served
+        :param latency: Seconds added to every response
+        :param token_lifetime: Lifetime of issued tokens, requests with an expired token get a 401
+        """
+        self.fleet = fleet
+        self.latency = latency
+        self.token_lifetime = token_lifetime
+        self.requests = 0
+        self.authentications = 0
+        self.tokens: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def do_PUT(self):
+                self._dispatch('PUT')
+
+            def do_DELETE(self):
+                self._dispatch('DELETE')
+
+            def _dispatch(self, method: str):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                if server.latency:
+                    time.sleep(server.latency)
+                status, body = server.route(method, self.path, self.headers.get('Authorization', ''))
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def route(self, method: str, path: str, authorization: str):
+        url = urlsplit(path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = url.path.strip('/').split('/')
+
+        if parts == ['_mock', 'stats']:
+            return 200, {'requests': self.requests, 'authentications': self.authentications}
+
+        with self._lock:
+            self.requests += 1
+
+        if parts[:3] == ['security', 'user', 'authenticate']:
+            token = make_token(self.token_lifetime)
+            with self._lock:
+                self.authentications += 1
+                self.tokens[token] = time.time() + self.token_lifetime
+            return 200, {'data': {'token': token}, 'error': 0}
+
+        expires_at = self.tokens.get(authorization.removeprefix('Bearer '))
+        if expires_at is None or expires_at <= time.time():
+            return 401, {'title': 'Unauthorized', 'detail': 'Invalid token', 'error': 6}
+
+        fleet = self.fleet
+        if parts == ['agents']:
+            items = fleet.agents
+            if 'agents_list' in query:
+                wanted = set(query['agents_list'].split(','))
+                items = [agent for agent in items if agent['id'] in wanted]
+            return 200, page(items, query)
+        if parts == ['groups']:
+            return 200, page(fleet.groups, query)
+        if len(parts) == 3 and parts[0] == 'groups' and parts[2] == 'agents':
+            return 200, page([agent for agent in fleet.agents if parts[1] in agent['group']], query)
+        if len(parts) == 3 and parts[0] == 'groups' and parts[2] == 'configuration':
+            return 200, page([{'filters': {}, 'config': {'localfile': [{'location': '/var/log/syslog'}]}}], query)
+        if len(parts) == 3 and parts[0] == 'syscollector' and parts[1] in fleet.by_id:
+            return 200, page(fleet.inventory(parts[1], parts[2]), query)
+        if len(parts) == 2 and parts[0] == 'vulnerability' and parts[1] in fleet.by_id:
+            return 200, page(fleet.inventory(parts[1], 'vulnerabilities'), query)
+        if len(parts) == 3 and parts[0] == 'vulnerability' and parts[2] == 'last_scan':
+            return 200, page([{'last_full_scan': '2024-03-01T00:00:00Z', 'last_partial_scan': None}], query)
+        return 404, {'title': 'Not Found', 'detail': f'{method} {url.path}', 'error': 404}
+
+
+def page(items: List[Dict], query: Dict[str, str]) -> Dict:
+    offset = int(query.get('offset', 0))
+    limit = int(query.get('limit', 500))
+    selected = items[offset:offset + limit]
+    if 'select' in query:
+        fields = {field.split('.')[0] for field in query['select'].split(',')} | {'id'}
+        selected = [{key: value for key, value in item.items() if key in fields} for item in selected]
+    return {'data': {'affected_items': selected, 'total_affected_items': len(items),
+                     'total_failed_items': 0, 'failed_items': []},
+            'message': 'All selected items were returned', 'error': 0}
+
+
+def _serve(pipe, latency: float, token_lifetime: float, fleet_options: Dict):
+    with MockWazuhServer(Fleet(**fleet_options), latency=latency, token_lifetime=token_lifetime) as server:
+        pipe.send(server.url)
+        # block until the parent asks to stop
+        pipe.recv()
+
+
+@contextmanager
+def running(latency: float = 0.0, token_lifetime: float = 900, **fleet_options) -> Iterator[str]:
+    """
+    Run a MockWazuhServer in a child process, so that neither its CPU time nor its allocations are
+    measured with the client's, and yield its URL. Counters are served unauthenticated on /_mock/stats
+
+    :param latency: Seconds added to every response
+    :param token_lifetime: Lifetime of issued tokens
+    :param fleet_options: Arguments of Fleet
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(child, latency, token_lifetime, fleet_options), daemon=True)
+    process.start()
+    try:
+        yield parent.recv()
+    finally:
+        parent.send(None)
+        parent.close()
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
@@ -0,0 +1,206 @@
+"""
+Benchmarks of wazuhpy against a local mock of the Wazuh API serving a synthetic fleet, see mock_wazuh.py.
+Every benchmark runs twice on a fresh client: once timed, reporting requests per second and p50/p99
+latency from a MetricsCollector, and once under tracemalloc for the peak memory of the client process.
+
+    python benchmarks/run.py
+    python benchmarks/run.py pagination_concurrent fanout --agents 10000 --latency 0.05
+    python benchmarks/run.py --json results.json
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from wazuhpy import MetricsCollector, WazuhClient  # noqa: E402
+from mock_wazuh import running  # noqa: E402
+
+
+class Benchmark(NamedTuple):
+    run: Callable[[WazuhClient, argparse.Namespace], Dict]
+    server: Callable[[argparse.Namespace], Dict]
+    client: Callable[[argparse.Namespace], Dict]
+
+
+class Result(NamedTuple):
+    name: str
+    requests: int
+    elapsed: float
+    rate: float
+    p50: float
+    p99: float
+    peak_memory: int
+    details: Dict
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(server: Callable = lambda args: {}, client: Callable = lambda args: {}):
+    """Register a benchmark, `server` and `client` return the options of the mock server and of the client"""
+    def register(func):
+        BENCHMARKS[func.__name__] = Benchmark(func, server, client)
+        return func
+    return register
+
+
+def _fleet(args) -> Dict:
+    return dict(agents=args.agents, latency=args.latency)
+
+
+@benchmark(server=_fleet)
+def pagination_sequential(client: WazuhClient, args) -> Dict:
+    return {'items': sum(1 for _ in client.agents.iter_list(page_size=args.page_size))}
+
+
+@benchmark(server=_fleet)
+def pagination_concurrent(client: WazuhClient, args) -> Dict:
+    items = client.agents.iter_list(page_size=args.page_size, concurrency=args.concurrency, ordered=False)
+    return {'items': sum(1 for _ in items)}
+
+
+@benchmark(server=_fleet, client=lambda args: dict(adaptive_pages=True))
+def pagination_adaptive(client: WazuhClient, args) -> Dict:
+    # a cold tuner starts at the default page size, the second crawl reuses what the first one learned
+    for _ in client.agents.iter_list():
+        pass
+    items = sum(1 for _ in client.agents.iter_list())
+    return {'items': items, 'page_size': next(iter(client.page_tuner.sizes.values()), None)}
+
+
+@benchmark(server=lambda args: dict(agents=args.fanout_agents, latency=args.latency))
+def fanout(client: WazuhClient, args) -> Dict:
+    agent_ids = (agent['id'] for agent in client.agents.iter_list(select=['id']))
+    results = list(client.syscol.collect(agent_ids, kinds=['os', 'packages', 'processes', 'ports'],
+                                         concurrency=args.concurrency))
+    return {'calls': len(results), 'failed': sum(result.error is not None for result in results),
+            'items': sum(len(result.items or ()) for result in results)}
+
+
+@benchmark(server=lambda args: dict(agents=args.agents, latency=args.latency, token_lifetime=args.token_lifetime),
+           client=lambda args: dict(token_refresh_margin=0))
+def auth_refresh(client: WazuhClient, args) -> Dict:
+    # tokens expire every token_lifetime seconds under concurrent load, each expiry must cause one authentication
+    authentications = _stats(client.base_url)['authentications']
+    deadline = time.monotonic() + args.duration
+    errors = []
+
+    def worker():
+        while time.monotonic() < deadline:
+            try:
+                client.agents.list(limit=1).raise_for_status()
+            except requests.RequestException as err:
+                errors.append(err)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'authentications': _stats(client.base_url)['authentications'] - authentications, 'errors': len(errors)}
+
+
+def _decode_server(args) -> Dict:
+    return dict(agents=1, packages=args.decode_items, latency=args.latency)
+
+
+@benchmark(server=_decode_server)
+def decode_json(client: WazuhClient, args) -> Dict:
+    for _ in range(args.repeat):
+        items = client.syscol.agent_packages('000', limit=args.decode_items).json()['data']['affected_items']
+    return {'items': len(items)}
+
+
+@benchmark(server=_decode_server)
+def decode_stream(client: WazuhClient, args) -> Dict:
+    for _ in range(args.repeat):
+        items = sum(1 for _ in client.syscol.stream(client.syscol.agent_packages, '000', limit=args.decode_items))
+    return {'items': items}
+
+
+@benchmark(server=_decode_server, client=lambda args: dict(models=True))
+def decode_models(client: WazuhClient, args) -> Dict:
+    for _ in range(args.repeat):
+        items = client.syscol.agent_packages('000', limit=args.decode_items)
+    return {'items': len(items)}
+
+
+def _stats(url: str) -> Dict:
+    return requests.get(f'{url}/_mock/stats').json()
+
+
+def measure(name: str, args) -> Result:
+    bench = BENCHMARKS[name]
+    with running(**bench.server(args)) as url:
+        def connect(**options) -> WazuhClient:
+            return WazuhClient(url, 'wazuh', 'wazuh', pool_maxsize=args.concurrency, **bench.client(args), **options)
+
+        collector = MetricsCollector(samples=1_000_000)
+        client = connect(metrics=collector)
+        start = time.perf_counter()
+        details = bench.run(client, args)
+        elapsed = time.perf_counter() - start
+
+        peak = 0
+        if args.memory:
+            client = connect()
+            tracemalloc.start()
+            try:
+                bench.run(client, args)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+    count = sum(stats['count'] for stats in collector.summary().values())
+    return Result(name, count, elapsed, count / elapsed, collector.percentile(50), collector.percentile(99),
+                  peak, details)
+
+
+def report(results: List[Result]):
+    header = f'{"benchmark":<24}{"requests":>10}{"seconds":>10}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"peak MiB":>10}  details'
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        details = ' '.join(f'{key}={value}' for key, value in r.details.items())
+        print(f'{r.name:<24}{r.requests:>10}{r.elapsed:>10.2f}{r.rate:>10.1f}{(r.p50 or 0) * 1000:>10.1f}'
+              f'{(r.p99 or 0) * 1000:>10.1f}{r.peak_memory / 2 ** 20:>10.1f}  {details}')
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help=f'Benchmarks to run, all of them if none is given: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--agents', type=int, default=5000, help='Fleet size for the pagination and auth benchmarks')
+    parser.add_argument('--fanout-agents', type=int, default=200, help='Fleet size for the syscollector fan-out')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds added by the mock API to every response')
+    parser.add_argument('--concurrency', type=int, default=8, help='Threads, pages or calls in flight')
+    parser.add_argument('--page-size', type=int, default=500, help='Page size of the pagination benchmarks')
+    parser.add_argument('--token-lifetime', type=float, default=1.0, help='Token lifetime of the auth benchmark')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds the auth benchmark runs')
+    parser.add_argument('--decode-items', type=int, default=20000, help='Items per response in the decode benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='Responses decoded per decode benchmark')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='Skip the tracemalloc pass')
+    parser.add_argument('--json', type=Path, help='Also write the results to this file')
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    results = [measure(name, args) for name in args.benchmarks or BENCHMARKS]
+    report(results)
+    if args.json:
+        args.json.write_text(json.dumps([r._asdict() for r in results], indent=2))
+
+
+if __name__ == '__main__':
+    main()
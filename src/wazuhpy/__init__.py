@@ -1 +1,16 @@
-from .wazuhpy import WazuhClient
\ No newline at end of file
+from .wazuhpy import WazuhClient
+from .aio import AsyncWazuhClient
+from .pool import WazuhClientPool
+from .cache import ResponseCache
+from .sync import GroupConfigSync
+from .inventory import AgentInventory
+from .vulnindex import VulnerabilityIndex
+from .results import BulkResult
+from .coalesce import RequestCoalescer
+from .ratelimit import RateLimiter
+from .tuning import PageSizeTuner
+from .metrics import MetricsCollector
+from .query import F, Field, Query
+from .breaker import CircuitBreaker, CircuitOpenError
+from .deadline import Deadline, DeadlineExceeded
+from .hedge import HedgePolicy
@@ -0,0 +1,523 @@
+import asyncio
+import json
+import time
+
+from collections import deque
+from functools import cached_property
+from itertools import islice
+from typing import Dict, Callable, Iterable, Iterator, AsyncIterator, List, Optional, Type, Union
+
+from requests.adapters import Retry
+from urllib3.exceptions import MaxRetryError
+
+from .auth import token_expiry, DEFAULT_TOKEN_LIFETIME, TokenCache
+from .breaker import CircuitBreaker, CircuitOpenError
+from .deadline import DEFAULT_TIMEOUT, Deadline, DeadlineExceeded
+from .cache import ResponseCache
+from .coalesce import RequestCoalescer
+from .hedge import HedgePolicy
+from .metrics import MetricsCollector, MetricsHook
+from .ratelimit import RateLimiter
+from .tuning import PageSizeTuner
+from .models import Record
+from .results import BulkResult
+from .endpoints.endpoint import BaseEndpoint, resolve_retry, can_retry_error
+from .endpoints.groups import WazuhGroups
+from .endpoints.agents import WazuhAgents
+from .endpoints.syscollector import WazuhSyscollector, CollectResult
+from .endpoints.vulnerability import WazuhVulnerability
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+_NO_STREAM = ('stream is not supported by AsyncWazuhClient, its responses are read whole. '
+              'Use WazuhClient to decode large pages incrementally')
+
+
+class AsyncBaseEndpoint(BaseEndpoint):
+    """Class for handling requests on an httpx.AsyncClient. Endpoint methods return coroutines"""
+
+    async def _do(self, http_method: str, endpoint: str, params: Dict = None,
+                  data=None, files: Dict = None, invalidates: Iterable[str] = (), model: Type[Record] = None,
+                  split: str = None, **kwargs):
+
+        if kwargs.pop('stream', False):
+            raise TypeError(_NO_STREAM)
+        model = model if kwargs.pop('models', self.models) else None
+        params = self._push_down(params, model)
+        self._with_deadline(kwargs)
+        hedge = self._hedge_key(http_method, endpoint, kwargs)
+
+        cache_key, cache_ttl = self._cache_key(http_method, endpoint, params, kwargs)
+        response = self.cache.get(cache_key) if cache_key is not None else None
+
+        if response is None:
+            coalesce_key = self._coalesce_key(http_method, endpoint, params, kwargs)
+            try:
+                if coalesce_key is None:
+                    response = await self._send(http_method, endpoint, params, data, files, split, hedge, **kwargs)
+                else:
+                    response = await self.coalescer.do_async(
+                        coalesce_key, lambda: self._send(http_method, endpoint, params, data, files, split, hedge, **kwargs),
+                        kwargs.get('deadline'))
+            except CircuitOpenError:
+                response = self._stale(cache_key)
+                if response is None:
+                    raise
+            else:
+                self._cache_store(cache_key, cache_ttl, response, invalidates)
+
+        return self._records(response, model, False)
+
+    async def _send(self, http_method: str, endpoint: str, params: Dict = None, data=None, files: Dict = None,
+                    split: str = None, hedge: str = None, **kwargs):
+        chunks = self._split(params, split)
+        with self._circuit(endpoint):
+            if chunks is not None:
+                return await self._request_split(http_method, endpoint, params, chunks, data, files, **kwargs)
+            if hedge is None:
+                return await self._request(http_method, endpoint, params, data, files, **kwargs)
+            return await self.hedge.call_async(
+                hedge, lambda: self._request(http_method, endpoint, params, data, files, **kwargs))
+
+    def stream(self, func: Callable, *args, **kwargs):
+        """Streaming is a WazuhClient feature, the async client reads responses whole and rejects it"""
+        raise TypeError(_NO_STREAM)
+
+    @staticmethod
+    def _overloaded(err: Exception) -> bool:
+        if isinstance(err, httpx.TransportError):
+            return True
+        return BaseEndpoint._overloaded(err)
+
+    async def _request_split(self, http_method: str, endpoint: str, params: Dict, chunks: List[Dict],
+                             data=None, files: Dict = None, **kwargs):
+        totals = None
+        if 'offset' in params:
+            totals = self._known_totals(endpoint, params)
+            if totals is None:
+                probes = await self._request_parts(http_method, endpoint, self._probes(chunks), data, files, kwargs)
+                totals = self._remember_totals(endpoint, params, probes)
+            chunks = self._windows(params, chunks, [total['total_affected_items'] for total in totals])
+        parts = await self._request_parts(http_method, endpoint, chunks, data, files, kwargs)
+
+        return httpx.Response(parts[0].status_code, json=self._merge_parts([part.json() for part in parts], totals),
+                              request=parts[0].request)
+
+    async def _request_parts(self, http_method: str, endpoint: str, chunks: List[Dict], data, files: Optional[Dict],
+                             kwargs: Dict):
+        semaphore = asyncio.Semaphore(self.split_concurrency)
+
+        async def send(chunk: Dict):
+            async with semaphore:
+                return await self._request(http_method, endpoint, chunk, data, files, **kwargs)
+
+        return await asyncio.gather(*(send(chunk) for chunk in chunks))
+
+    async def _request(self, http_method: str, endpoint: str, params: Dict = None,
+                       data=None, files: Dict = None, **kwargs):
+
+        _retry = resolve_retry(kwargs.pop('retry', self.retry))
+        deadline = kwargs.pop('deadline', None)
+        timeout = _httpx_timeout(kwargs.pop('timeout', None)) or self.session.timeout
+
+        if params is not None:
+            params = {key: value for key, value in params.items() if value is not None}
+        throttled = 0
+        attempts = 0
+        start = time.perf_counter()
+
+        try:
+            while True:
+                attempts += 1
+                if deadline is not None:
+                    deadline.check()
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(deadline)
+                    if deadline is not None:
+                        deadline.check()
+                try:
+                    response = await self.session.request(method=http_method, url=endpoint, params=params,
+                                                          content=data, files=files,
+                                                          timeout=_cap(timeout, deadline), **kwargs)
+                except httpx.TransportError as err:
+                    if _retry is None or not (isinstance(err, (httpx.ConnectError, httpx.ConnectTimeout))
+                                              or can_retry_error(_retry, http_method, err)):
+                        raise
+                    try:
+                        _retry = _retry.increment(method=http_method, url=endpoint, error=err)
+                    except MaxRetryError:
+                        raise err
+                    if deadline is not None and _retry.get_backoff_time() >= deadline.remaining():
+                        raise err
+                    await asyncio.sleep(_retry.get_backoff_time())
+                    continue
+
+                if self._throttled(response.status_code, response.headers, throttled):
+                    throttled += 1
+                    await response.aclose()
+                    continue
+
+                has_retry_after = 'Retry-After' in response.headers
+                if _retry is None or not _retry.is_retry(http_method, response.status_code, has_retry_after):
+                    break
+
+                try:
+                    _retry = _retry.increment(method=http_method, url=endpoint,
+                                              response=_RetriedResponse(response.status_code))
+                except MaxRetryError:
+                    break
+
+                delay = _retry.get_backoff_time()
+                if has_retry_after and _retry.respect_retry_after_header:
+                    delay = max(delay, _retry.parse_retry_after(response.headers['Retry-After']))
+                if deadline is not None and delay >= deadline.remaining():
+                    break
+                await response.aclose()
+                await asyncio.sleep(delay)
+        except (httpx.HTTPError, DeadlineExceeded) as err:
+            self._observe(http_method, endpoint, None, start, attempts, False, None, err)
+            raise
+
+        self._observe(http_method, endpoint, response, start, attempts, False, None)
+        response.raise_for_status()
+        return response
+
+    async def paginate(self, func: Callable, *args, page_size: int = None, offset: int = 0,
+                       concurrency: int = 1, ordered: bool = True, **kwargs) -> AsyncIterator[Dict]:
+        """
+        Asynchronously iterate over every item of a paginated collection. Iteration stops once
+        total_affected_items have been returned. With a concurrency above 1 the remaining offset
+        windows are fetched as concurrent tasks once the first page has reported the total, with at
+        most `concurrency` pages in flight at any time.
+
+        :param func: Bound collection method accepting offset and limit, for example client.agents.list
+        :param args: Positional arguments passed to func, for example the agent ID
+        :param page_size: Number of elements to request per page. If not specified, 500 or the size tuned
+            by the endpoint's page_tuner
+        :param offset: First element to return in the collection (Default: 0)
+        :param concurrency: Number of pages fetched concurrently (Default: 1)
+        :param ordered: Yield items in collection order. If False, pages are yielded as they complete
+        :param kwargs: Any other parameter accepted by func, deadline is the budget of the whole iteration
+        :return: Async iterator of affected items
+        """
+        deadline = self._with_deadline(kwargs)
+        tune_key = self._tune_key(func, kwargs) if page_size is None and self.page_tuner is not None else None
+        if page_size is None:
+            page_size = self.page_tuner.size(tune_key) if tune_key is not None else 500
+
+        items, total = await self._fetch_page(func, args, kwargs, offset, page_size, tune_key)
+        for item in items:
+            yield item
+
+        if not items:
+            return
+
+        if concurrency <= 1:
+            offset += len(items)
+            while offset < total:
+                if deadline is not None:
+                    deadline.check()
+                if tune_key is not None:
+                    page_size = self.page_tuner.size(tune_key)
+                items, total = await self._fetch_page(func, args, kwargs, offset, page_size, tune_key)
+                for item in items:
+                    yield item
+                if not items:
+                    break
+                offset += len(items)
+            return
+
+        # the manager may cap the page size, so step by what it actually returned
+        step = len(items)
+        windows = iter(range(offset + step, total, step))
+        pending = deque() if ordered else set()
+
+        def submit(window: int):
+            task = asyncio.ensure_future(self._fetch_page(func, args, kwargs, window, step, tune_key))
+            if ordered:
+                pending.append(task)
+            else:
+                pending.add(task)
+
+        try:
+            for window in islice(windows, concurrency):
+                submit(window)
+
+            while pending:
+                if ordered:
+                    task = pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    task = done.pop()
+                    pending.remove(task)
+
+                page, _ = await task
+                for window in islice(windows, 1):
+                    submit(window)
+                for item in page:
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch_page(self, func: Callable, args: tuple, kwargs: Dict, offset: int, limit: int, tune_key=None):
+        start = time.monotonic()
+        result = await func(*args, offset=offset, limit=limit, **kwargs)
+        elapsed = time.monotonic() - start
+
+        items, total = self._page_items(result)
+        if tune_key is not None:
+            self.page_tuner.observe(tune_key, limit, len(items), elapsed, self._body_size(result))
+        return items, total
+
+
+class AsyncWazuhGroups(AsyncBaseEndpoint, WazuhGroups):
+    pass
+
+
+class AsyncWazuhAgents(AsyncBaseEndpoint, WazuhAgents):
+    """add_many, assign_many and unassign_many are coroutines running at most `concurrency` calls at a time"""
+
+    async def _bulk(self, calls: Iterator[tuple], concurrency: int, deadline: Deadline = None) -> BulkResult:
+        result = BulkResult()
+        if deadline is not None:
+            calls = deadline.bound(calls)
+        pending = {asyncio.ensure_future(func(**call_kwargs)): (ids, item)
+                   for ids, item, func, call_kwargs in islice(calls, concurrency)}
+
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    ids, item = pending.pop(task)
+                    for next_ids, next_item, func, call_kwargs in islice(calls, 1):
+                        pending[asyncio.ensure_future(func(**call_kwargs))] = (next_ids, next_item)
+
+                    try:
+                        data = task.result().json().get('data', {})
+                    except (httpx.HTTPError, DeadlineExceeded, ValueError) as err:
+                        result.fail(ids, err)
+                        continue
+                    result.merge(data, item)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self._expired(calls, result)
+        return result
+
+
+class AsyncWazuhSyscollector(AsyncBaseEndpoint, WazuhSyscollector):
+    """collect() returns an async iterator of CollectResult, with at most `concurrency` calls in flight"""
+
+    async def _collect(self, calls: Iterator[tuple], concurrency: int, page_size: int,
+                       **kwargs) -> AsyncIterator[CollectResult]:
+        pending = {asyncio.ensure_future(self._collect_one(agent_id, kind, page_size, **kwargs))
+                   for agent_id, kind in islice(calls, concurrency)}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    for agent_id, kind in islice(calls, 1):
+                        pending.add(asyncio.ensure_future(self._collect_one(agent_id, kind, page_size, **kwargs)))
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        for result in self._expired(calls):
+            yield result
+
+    async def _collect_one(self, agent_id: str, kind: str, page_size: int, **kwargs) -> CollectResult:
+        method = getattr(self, f'agent_{kind}')
+        try:
+            if kind in self.UNPAGINATED_KINDS:
+                items, _ = self._page_items(await method(agent_id, **kwargs))
+            else:
+                items = [item async for item in self.paginate(method, agent_id, page_size=page_size, **kwargs)]
+        except (httpx.HTTPError, DeadlineExceeded, ValueError) as err:
+            return CollectResult(agent_id, kind, None, err)
+
+        return CollectResult(agent_id, kind, items)
+
+
+class AsyncWazuhVulnerability(AsyncBaseEndpoint, WazuhVulnerability):
+    pass
+
+
+class _RetriedResponse:
+    """Status of an httpx response in the form Retry.increment counts against its status limit"""
+    __slots__ = ('status',)
+
+    def __init__(self, status: int):
+        self.status = status
+
+    @staticmethod
+    def get_redirect_location() -> bool:
+        return False
+
+
+def _httpx_timeout(timeout: Union[float, tuple, None]):
+    """httpx.Timeout from a requests style timeout, a number or a (connect, read) tuple"""
+    if timeout is None or isinstance(timeout, httpx.Timeout):
+        return timeout
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def _cap(timeout, deadline: Optional[Deadline]):
+    if deadline is None:
+        return timeout
+    remaining = deadline.cap(None)
+    return httpx.Timeout(connect=min(timeout.connect or remaining, remaining),
+                         read=min(timeout.read or remaining, remaining),
+                         write=min(timeout.write or remaining, remaining),
+                         pool=min(timeout.pool or remaining, remaining))
+
+
+class _AsyncTokenAuth(httpx.Auth if httpx else object):
+    """
+    httpx authentication flow with the same token lifecycle as WazuhTokenAuth: the JWT is requested on
+    first use, refreshed shortly before its exp claim and once more on a 401. Concurrent tasks holding the
+    same stale token trigger a single re-authentication
+    """
+    requires_response_body = True
+
+    def __init__(self, url: str, username: str, password: str, refresh_margin: int = 60,
+                 token_cache: TokenCache = None):
+        self.url = f'{url}/security/user/authenticate'
+        self.credentials = httpx.BasicAuth(username, password)
+        self.refresh_margin = refresh_margin
+        self.token_cache = token_cache
+        self._cache_key = TokenCache.cache_key(url, username)
+        self.token = None
+        self.expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def async_auth_flow(self, request):
+        token = self.token
+        if token is None or time.time() >= self.expires_at - self.refresh_margin:
+            async with self._lock:
+                if self.token == token and not self._load_cached(token):
+                    self._store((yield self._auth_request(request)))
+
+        token = self.token
+        request.headers['Authorization'] = f'Bearer {token}'
+        response = yield request
+
+        if response.status_code == 401:
+            async with self._lock:
+                if self.token == token and not self._load_cached(token):
+                    self._store((yield self._auth_request(request)))
+
+            request.headers['Authorization'] = f'Bearer {self.token}'
+            yield request
+
+    def _auth_request(self, request):
+        # the login shares the timeout of the request it authenticates, capped by that request's deadline
+        extensions = {'timeout': request.extensions['timeout']} if 'timeout' in request.extensions else None
+        auth_request = httpx.Request('GET', self.url, extensions=extensions)
+        return next(self.credentials.auth_flow(auth_request))
+
+    def _load_cached(self, stale_token: Optional[str]) -> bool:
+        if self.token_cache is None:
+            return False
+        token = self.token_cache.load(self._cache_key, self.refresh_margin)
+        if token is None or token == stale_token:
+            return False
+        self._set(token)
+        return True
+
+    def _store(self, response):
+        response.raise_for_status()
+        token = json.loads(response.text).get('data')['token']
+        if self.token_cache is not None:
+            self.token_cache.store(self._cache_key, token)
+        self._set(token)
+
+    def _set(self, token: str):
+        self.expires_at = token_expiry(token) or time.time() + DEFAULT_TOKEN_LIFETIME
+        self.token = token
+
+
+class AsyncWazuhClient:
+    """
+    asyncio counterpart of WazuhClient. All endpoint methods take the same parameters as their
+    synchronous versions and return coroutines, iter_* methods return async iterators. Requests
+    share a single httpx connection pool. Authentication happens on the first request and the token
+    is refreshed before it expires. Endpoints are created on first access.
+
+    Requires httpx, available with the 'async' extra: pip install wazuhpy[async]
+    """
+    def __init__(self, url: str = None, username: str = None, password: str = None, verify_ssl: bool = False,
+                 max_connections: int = 100, max_keepalive_connections: int = 20, token_refresh_margin: int = 60,
+                 retry: Union[bool, Retry, None] = None, cache: Union[bool, ResponseCache] = False,
+                 models: bool = False, coalesce: Union[bool, RequestCoalescer] = False,
+                 rate_limit: Union[float, RateLimiter, None] = None,
+                 adaptive_pages: Union[bool, PageSizeTuner] = False, metrics: Union[bool, MetricsHook] = False,
+                 token_cache: str = None, circuit_breaker: Union[bool, CircuitBreaker] = False,
+                 timeout: Union[float, tuple, None] = DEFAULT_TIMEOUT, hedge: Union[bool, HedgePolicy] = False,
+                 **client_kwargs):
+        if httpx is None:
+            raise ImportError('AsyncWazuhClient requires httpx, install it with: pip install wazuhpy[async]')
+
+        self.base_url = url
+        self.verify_ssl = verify_ssl
+        self.retry = retry
+        self.cache = ResponseCache() if cache is True else cache if cache is not False else None
+        self.models = models
+        self.coalescer = RequestCoalescer() if coalesce is True else coalesce or None
+        self.rate_limiter = RateLimiter(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+        self.page_tuner = PageSizeTuner() if adaptive_pages is True else adaptive_pages or None
+        self.metrics = MetricsCollector() if metrics is True else metrics or None
+        self.breaker = CircuitBreaker() if circuit_breaker is True else circuit_breaker or None
+        self.hedge = HedgePolicy() if hedge is True else hedge or None
+
+        auth = None
+        if username is not None and password is not None:
+            auth = _AsyncTokenAuth(self.base_url, username, password, refresh_margin=token_refresh_margin,
+                                   token_cache=TokenCache(token_cache) if token_cache is not None else None)
+
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_keepalive_connections)
+
+        self.session = httpx.AsyncClient(auth=auth, verify=verify_ssl, limits=limits, timeout=_httpx_timeout(timeout),
+                                         headers={'Content-Type': 'application/json'}, **client_kwargs)
+
+        # endpoints are created on first access
+        self._options = dict(url=self.base_url, session=self.session, verify_ssl=self.verify_ssl,
+                             retry=self.retry, cache=self.cache, models=self.models,
+                             coalescer=self.coalescer, rate_limiter=self.rate_limiter, page_tuner=self.page_tuner,
+                             metrics=self.metrics, breaker=self.breaker, hedge=self.hedge)
+
+    @cached_property
+    def groups(self) -> AsyncWazuhGroups:
+        return AsyncWazuhGroups(**self._options)
+
+    @cached_property
+    def agents(self) -> AsyncWazuhAgents:
+        return AsyncWazuhAgents(**self._options)
+
+    @cached_property
+    def syscol(self) -> AsyncWazuhSyscollector:
+        return AsyncWazuhSyscollector(**self._options)
+
+    @cached_property
+    def vulns(self) -> AsyncWazuhVulnerability:
+        return AsyncWazuhVulnerability(**self._options)
+
+    async def close(self):
+        await self.session.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
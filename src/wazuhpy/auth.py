@@ -0,0 +1,176 @@
+import base64
+import json
+import os
+import threading
+import time
+
+from typing import Optional
+
+import requests
+from requests.auth import AuthBase, HTTPBasicAuth
+from requests.cookies import extract_cookies_to_jar
+
+from .deadline import current as current_deadline
+
+
+# lifetime assumed for tokens whose exp claim cannot be read, the Wazuh default auth_token_exp_timeout
+DEFAULT_TOKEN_LIFETIME = 900
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """
+    Read the exp claim of a JWT without verifying its signature
+
+    :param token: Encoded JWT
+    :return: Expiration as a unix timestamp, or None if the token carries no readable exp claim
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenCache:
+    """
+    JSON file keeping API tokens between processes, per manager URL and user, so that short-lived scripts
+    reuse a still valid token instead of authenticating on every run. The file is created readable by its
+    owner only, the tokens it holds grant API access until they expire
+    """
+    def __init__(self, path: str):
+        """
+        :param path: Cache file, created on the first authentication. ~ is expanded to the home directory
+        """
+        self.path = os.path.expanduser(path)
+
+    def load(self, key: str, margin: float = 0) -> Optional[str]:
+        """
+        :param key: Manager and user, see cache_key
+        :param margin: Seconds of validity the token must have left
+        :return: Cached token, or None if there is none or it expires within margin
+        """
+        token = self._read().get(key)
+        expires_at = token_expiry(token) if isinstance(token, str) else None
+        if expires_at is None or time.time() >= expires_at - margin:
+            return None
+        return token
+
+    def store(self, key: str, token: str):
+        """Save a token, dropping the expired ones. Failing to write the cache does not fail authentication"""
+        now = time.time()
+        tokens = {k: t for k, t in self._read().items() if isinstance(t, str) and (token_expiry(t) or 0) > now}
+        tokens[key] = token
+
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+                json.dump(tokens, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r') as f:
+                tokens = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return tokens if isinstance(tokens, dict) else {}
+
+    @staticmethod
+    def cache_key(url: str, username: str) -> str:
+        return f'{username}@{url}'
+
+
+class WazuhTokenAuth(AuthBase):
+    """
+    Bearer token authentication for a requests session. The token is requested from
+    /security/user/authenticate and refreshed `refresh_margin` seconds before its exp claim. A 401
+    response triggers a single re-authentication and the request is sent again. Refreshes are serialized
+    so that concurrent threads holding the same expired token cause only one re-authentication.
+    With a token_cache, a valid token saved by a previous process is used before authenticating.
+    """
+    def __init__(self, session: requests.Session, url: str, credentials: HTTPBasicAuth,
+                 verify_ssl: bool = True, refresh_margin: int = 60, token_cache: TokenCache = None, timeout=None):
+        self.session = session
+        self.url = f'{url}/security/user/authenticate'
+        self.credentials = credentials
+        self.verify_ssl = verify_ssl
+        self.refresh_margin = refresh_margin
+        self.token_cache = token_cache
+        self.timeout = timeout
+        self._cache_key = TokenCache.cache_key(url, credentials.username)
+        self.token = None
+        self.expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def valid_token(self) -> str:
+        """Return the current token, refreshing it first if it is missing or about to expire"""
+        token = self.token
+        if token is None or time.time() >= self.expires_at - self.refresh_margin:
+            return self.refresh(stale_token=token)
+        return token
+
+    def refresh(self, stale_token: str = None) -> str:
+        """
+        Request a new token. If another thread already replaced `stale_token` while this one was waiting,
+        its token is returned instead of authenticating again
+
+        :param stale_token: Token the caller found expired or rejected
+        :return: Valid token
+        """
+        with self._lock:
+            if self.token != stale_token:
+                return self.token
+
+            token = self._cached_token(stale_token)
+            if token is None:
+                # a login on the first request of a lazy client is bounded by that request's deadline
+                deadline = current_deadline()
+                timeout = deadline.cap(self.timeout) if deadline is not None else self.timeout
+                response = self.session.get(url=self.url, auth=self.credentials, verify=self.verify_ssl,
+                                            timeout=timeout)
+                response.raise_for_status()
+
+                token = json.loads(response.text).get('data')['token']
+                if self.token_cache is not None:
+                    self.token_cache.store(self._cache_key, token)
+
+            self.expires_at = token_expiry(token) or time.time() + DEFAULT_TOKEN_LIFETIME
+            self.token = token
+            self.session.headers.update({'Authorization': f'Bearer {token}'})
+            return token
+
+    def _cached_token(self, stale_token: Optional[str]) -> Optional[str]:
+        if self.token_cache is None:
+            return None
+        token = self.token_cache.load(self._cache_key, self.refresh_margin)
+        # a cached token the manager rejected must not be reused
+        return token if token != stale_token else None
+
+    def __call__(self, r: requests.PreparedRequest):
+        r.headers['Authorization'] = f'Bearer {self.valid_token()}'
+        r.register_hook('response', self._handle_401)
+        return r
+
+    def _handle_401(self, r: requests.Response, **kwargs):
+        if r.status_code != 401:
+            return r
+
+        rejected = r.request.headers.get('Authorization', '').removeprefix('Bearer ')
+        token = self.refresh(stale_token=rejected)
+
+        # consume content and release the original connection so it can be reused
+        r.content
+        r.close()
+
+        prep = r.request.copy()
+        extract_cookies_to_jar(prep._cookies, r.request, r.raw)
+        prep.prepare_cookies(prep._cookies)
+        prep.headers['Authorization'] = f'Bearer {token}'
+
+        _r = r.connection.send(prep, **kwargs)
+        _r.history.append(r)
+        _r.request = prep
+        return _r
@@ -0,0 +1,137 @@
+import threading
+import time
+
+from collections import deque
+from typing import Dict, Hashable, Optional
+
+from requests.exceptions import RequestException
+
+
+class CircuitOpenError(RequestException):
+    """Raised instead of sending a request while the circuit of its manager and endpoint family is open"""
+    def __init__(self, key: Hashable, retry_in: float):
+        super().__init__(f'circuit open for {key}, next attempt in {retry_in:.1f}s')
+        self.key = key
+        self.retry_in = retry_in
+
+
+def circuit_key(url: str, path: str) -> str:
+    """Circuit of a request: the API base URL and endpoint family, e.g. https://wazuh:55000/syscollector"""
+    return f"{url}/{path.strip('/').split('/')[0]}"
+
+
+class _Circuit:
+    __slots__ = ('state', 'outcomes', 'opened_at', 'probes')
+
+    def __init__(self, window: int):
+        self.state = CircuitBreaker.CLOSED
+        # True for a failed or slow call, over the last `window` calls
+        self.outcomes = deque(maxlen=window)
+        self.opened_at = 0.0
+        self.probes = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker per key, an API base URL and endpoint family such as /syscollector. A closed circuit
+    lets requests through and opens once `failure_rate` of the last `window` calls failed: connection
+    errors, timeouts, 429 and 5xx answers, and calls slower than `slow_call` seconds. An open circuit
+    fails calls at once with CircuitOpenError for `reset_timeout` seconds, then half-opens and lets
+    `half_open_calls` probes through: a successful probe closes it, a failed one opens it again.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 10, reset_timeout: float = 30,
+                 slow_call: Optional[float] = None, half_open_calls: int = 1):
+        """
+        :param failure_rate: Share of failed calls in the window that opens the circuit
+        :param window: Number of recent calls the failure rate is computed over
+        :param min_calls: Number of calls needed in the window before the circuit can open
+        :param reset_timeout: Seconds an open circuit rejects calls before letting a probe through
+        :param slow_call: Calls taking longer than this many seconds count as failures. Disabled if not specified
+        :param half_open_calls: Number of probes let through by a half-open circuit
+        """
+        self.failure_rate = failure_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.slow_call = slow_call
+        self.half_open_calls = half_open_calls
+        self.rejected = 0
+        self._circuits: Dict[Hashable, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def before(self, key: Hashable):
+        """Raise CircuitOpenError if a call may not be sent now"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return
+
+            if circuit.state == self.OPEN:
+                remaining = circuit.opened_at + self.reset_timeout - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(key, remaining)
+                circuit.state = self.HALF_OPEN
+                circuit.probes = 0
+
+            if circuit.state == self.HALF_OPEN:
+                if circuit.probes >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(key, 0.0)
+                circuit.probes += 1
+
+    def allows(self, key: Hashable) -> bool:
+        """Whether before would let a call through now, without counting it as a probe"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None or circuit.state == self.CLOSED:
+                return True
+            if circuit.state == self.OPEN:
+                return time.monotonic() >= circuit.opened_at + self.reset_timeout
+            return circuit.probes < self.half_open_calls
+
+    def record(self, key: Hashable, failed: bool, elapsed: float):
+        """
+        Record the outcome of a call let through by before
+
+        :param key: Circuit key
+        :param failed: Whether the call failed in a way that points at an overloaded manager
+        :param elapsed: Seconds taken by the call
+        """
+        failed = failed or (self.slow_call is not None and elapsed > self.slow_call)
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                circuit = self._circuits[key] = _Circuit(self.window)
+
+            if circuit.state == self.HALF_OPEN:
+                if failed:
+                    self._open(circuit)
+                else:
+                    circuit.state = self.CLOSED
+                    circuit.outcomes.clear()
+                return
+            if circuit.state == self.OPEN:
+                # a call sent before the circuit opened
+                return
+
+            circuit.outcomes.append(failed)
+            if len(circuit.outcomes) >= self.min_calls and sum(circuit.outcomes) >= self.failure_rate * len(circuit.outcomes):
+                self._open(circuit)
+
+    @staticmethod
+    def _open(circuit: _Circuit):
+        circuit.state = CircuitBreaker.OPEN
+        circuit.opened_at = time.monotonic()
+        circuit.outcomes.clear()
+
+    def state(self, key: Hashable) -> str:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit.state if circuit is not None else self.CLOSED
+
+    def reset(self):
+        with self._lock:
+            self._circuits.clear()
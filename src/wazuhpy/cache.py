@@ -0,0 +1,93 @@
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class ResponseCache:
+    """
+    Thread-safe in-memory response cache with a time-to-live per entry and least recently used
+    eviction once `maxsize` entries are stored. Entries are keyed on HTTP method, URL and the
+    normalized query parameters. Expired entries are kept `stale_ttl` more seconds for get_stale,
+    which serves them while the manager is unavailable.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 60, stale_ttl: float = 0):
+        """
+        :param maxsize: Maximum number of cached responses
+        :param ttl: Time-to-live in seconds used when an entry is stored without its own ttl
+        :param stale_ttl: Seconds an expired entry remains available to get_stale
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(http_method: str, url: str, params: Dict = None) -> tuple:
+        """Build the cache key of a request, ignoring unset parameters and parameter order"""
+        normalized = tuple(sorted((name, str(value)) for name, value in (params or {}).items() if value is not None))
+        return http_method.upper(), url, normalized
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is None or entry[0] <= now:
+                if entry is not None and entry[0] + self.stale_ttl <= now:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, key: Hashable, default: Any = None) -> Any:
+        """Return an entry even if it expired less than stale_ttl seconds ago"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] + self.stale_ttl <= time.monotonic():
+                return default
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, prefix: str = None) -> int:
+        """
+        Drop cached responses
+
+        :param prefix: Only drop responses whose URL starts with this prefix. Everything if not specified
+        :return: Number of dropped entries
+        """
+        with self._lock:
+            if prefix is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+
+            stale = [key for key in self._entries if key[1].startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        self.invalidate()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self)}
+
+    def __len__(self):
+        return len(self._entries)
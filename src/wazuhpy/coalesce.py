@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from .deadline import Deadline, DeadlineExceeded
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """
+    Deduplicates identical requests in flight: the first caller of a key sends the request and every
+    caller arriving before it completes waits for, and receives, the same response or exception.
+    Nothing is kept once the request completes, combine it with a ResponseCache to reuse responses.
+    """
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any], deadline: Deadline = None) -> Any:
+        """
+        Call func, unless a call with the same key is in flight in another thread, then share its outcome
+
+        :param deadline: Time budget of this caller, a caller sharing another's call stops waiting once it expires
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not call.event.wait(None if deadline is None else deadline.remaining()):
+                raise DeadlineExceeded('deadline exceeded')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable], deadline: Deadline = None) -> Any:
+        """asyncio version of do, func is a coroutine function. A cancelled waiter does not cancel the others"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+        if deadline is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded('deadline exceeded') from None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._tasks)
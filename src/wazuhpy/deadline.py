@@ -0,0 +1,139 @@
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+from requests.exceptions import Timeout
+
+
+# connect and read timeouts of a client in seconds, when not specified
+DEFAULT_TIMEOUT = (10, 300)
+
+_current: ContextVar[Optional['Deadline']] = ContextVar('wazuhpy_deadline', default=None)
+_END = object()
+
+
+class DeadlineExceeded(Timeout):
+    """Raised instead of sending a request, or a retry, once the time budget of the call is spent"""
+
+
+class Deadline:
+    """
+    Time budget shared by every request of a block of code or of one call. Requests check it before every
+    attempt and cap their connect and read timeouts to what is left, paginators stop between pages and
+    fan-outs stop submitting calls. Use it as a context manager, a nested deadline never extends the
+    enclosing one:
+
+        with Deadline(60):
+            inventory = list(client.syscol.collect(agent_ids))
+
+    or pass deadline=<seconds or Deadline> to any endpoint method, paginator or fan-out.
+    """
+    __slots__ = ('expires_at', '_tokens')
+
+    def __init__(self, seconds: float):
+        """
+        :param seconds: Budget from now
+        """
+        self.expires_at = time.monotonic() + seconds
+        self._tokens = []
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded('deadline exceeded')
+
+    def cap(self, timeout: Union[float, Tuple[float, float], None]) -> Union[float, Tuple[float, float]]:
+        """Limit a requests timeout, a number or a (connect, read) tuple, to the remaining budget"""
+        remaining = self.remaining()
+        if not remaining:
+            raise DeadlineExceeded('deadline exceeded')
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def bound(self, iterable: Iterable) -> 'BoundedIterator':
+        """Iterate over iterable until the deadline expires, see BoundedIterator"""
+        return BoundedIterator(self, iterable)
+
+    def __enter__(self) -> 'Deadline':
+        outer = _current.get()
+        if outer is not None and outer.expires_at < self.expires_at:
+            self.expires_at = outer.expires_at
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _current.reset(self._tokens.pop())
+
+
+class BoundedIterator:
+    """Iterator stopping early once its deadline has expired, the items it did not return are in remaining()"""
+    def __init__(self, deadline: Deadline, iterable: Iterable):
+        self.deadline = deadline
+        self.truncated = False
+        self._iterator = iter(iterable)
+        self._peeked = _END
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.truncated:
+            raise StopIteration
+        if self.deadline.expired:
+            # only truncated if something is left
+            self._peeked = next(self._iterator, _END)
+            self.truncated = self._peeked is not _END
+            raise StopIteration
+        return next(self._iterator)
+
+    def remaining(self) -> Iterator:
+        if self._peeked is not _END:
+            yield self._peeked
+            self._peeked = _END
+        if self.truncated:
+            yield from self._iterator
+
+
+def current() -> Optional[Deadline]:
+    """Deadline of the enclosing `with Deadline(...)` block, if any"""
+    return _current.get()
+
+
+@contextmanager
+def active(deadline: Optional[Deadline]):
+    """Make deadline the current one for the code the request runs without it being passed, e.g. authentication"""
+    if deadline is None:
+        yield
+        return
+    token = _current.set(deadline)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def resolve(deadline: Union[float, Deadline, None] = None) -> Optional[Deadline]:
+    """
+    Turn a deadline argument into a Deadline, bounded by the enclosing one
+
+    :param deadline: Seconds, a Deadline, or None for the deadline of the enclosing block
+    """
+    outer = current()
+    if deadline is None:
+        return outer
+    if not isinstance(deadline, Deadline):
+        deadline = Deadline(deadline)
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        return outer
+    return deadline
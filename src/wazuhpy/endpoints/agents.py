@@ -1,12 +1,20 @@
 import json
 import requests
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Optional, List, Iterable, Iterator, Tuple, Union
+from requests.exceptions import RequestException
 from .endpoint import BaseEndpoint
+from ..models import Agent
+from ..deadline import BoundedIterator, Deadline, DeadlineExceeded
+from ..results import BulkResult
 
 
 class WazuhAgents(BaseEndpoint):
-    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True):
-        super().__init__(url, session, verify_ssl)
+    cache_ttls = {'active_config': 300}
+
+    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True, **kwargs):
+        super().__init__(url, session, verify_ssl, **kwargs)
 
     def delete(self, agents_list: List, status: List, pretty: bool = False, wait: bool = False,
                purge: bool = False, older_than: str = None, query: str = None, os_platform: str = None,
@@ -25,7 +33,7 @@ class WazuhAgents(BaseEndpoint):
             For never_connected agents, register date is considered instead of last keep alive.
             For example, 7d, 10s, 10 are valid values. When no time unit is specified, seconds
             are assumed.  Use 0s to select all agents.
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param os_platform: Filter by OS platform
         :param os_version: Filter by OS version
         :param os_name: Filter by OS name
@@ -65,7 +73,9 @@ class WazuhAgents(BaseEndpoint):
             params.update({'agents_list': f"{','.join(agents_list) if agents_list is not None else ''}",
                            'status': f"{','.join(status) if status is not None else ''}"})
 
-        return self._do(http_method='DELETE', endpoint=endpoint, params=params, **kwargs)
+        # deleted agents take their group membership, syscollector and vulnerability data with them
+        return self._do(http_method='DELETE', endpoint=endpoint, params=params, invalidates=('',),
+                        split='agents_list', **kwargs)
 
     def list(self, pretty: bool = False, wait: bool = False, agents_list: List = None,
              offset: int = 0, limit: int = 500, select: List = None, sort: str = None,
@@ -92,7 +102,7 @@ class WazuhAgents(BaseEndpoint):
         :param search: Look for elements containing the specified string. To obtain a complementary search,
             use '-' at the beginning
         :param status: Filter by agent status
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param older_than: Filter out agents whose time lapse from last keep alive signal is longer than specified.
             Time in seconds, ‘[n_days]d’, ‘[n_hours]h’, ‘[n_minutes]m’ or ‘[n_seconds]s’. For never_connected agents,
             uses the register date. For example, 7d, 10s and 10 are valid values. If no time unit is specified,
@@ -148,7 +158,8 @@ class WazuhAgents(BaseEndpoint):
         if status:
             params.update({'status': f"{','.join(status) if status is not None else ''}"})
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=Agent, split='agents_list',
+                        **kwargs)
 
     def add(self, agent_name: str, ip_address: Optional[str] = None,
             pretty: bool = False, wait: bool = False, **kwargs):
@@ -174,7 +185,8 @@ class WazuhAgents(BaseEndpoint):
 
         payload = json.dumps(data)
 
-        return self._do(http_method='POST', endpoint=endpoint, data=payload, params=params, **kwargs)
+        return self._do(http_method='POST', endpoint=endpoint, data=payload, params=params,
+                        invalidates=('/agents', '/groups'), **kwargs)
 
     def active_config(self, agent_id: str, component: str,
                       configuration: str, pretty: bool = False, wait: bool = False, **kwargs):
@@ -189,6 +201,7 @@ class WazuhAgents(BaseEndpoint):
         :param pretty: Show results in human-readable format
         :param wait: Disable timeout response
         :other_param retry: can be bool or and instance of Retry
+        :other_param cache_ttl: Seconds to keep the response when the client has a cache (Default: 300, see cache_ttls)
         :return: Response object
         """
 
@@ -197,6 +210,7 @@ class WazuhAgents(BaseEndpoint):
         params = {'pretty': 'True' if pretty else None,
                   'wait_for_complete': 'True' if wait else None}
 
+        kwargs.setdefault('cache_ttl', self.cache_ttls.get('active_config'))
         return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
 
     def remove_from_group(self, agent_id: str, group_id: str, pretty: bool = False, wait: bool = False, **kwargs):
@@ -216,7 +230,8 @@ class WazuhAgents(BaseEndpoint):
         params = {'pretty': 'True' if pretty else None,
                   'wait_for_complete': 'True' if wait else None}
 
-        return self._do(http_method='DELETE', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='DELETE', endpoint=endpoint, params=params,
+                        invalidates=('/agents', '/groups'), **kwargs)
 
     def remove_from_groups(self, agent_id: str, pretty: bool = False,
                           wait: bool = False, groups_list: List = None, **kwargs):
@@ -237,7 +252,146 @@ class WazuhAgents(BaseEndpoint):
                   'wait_for_complete': 'True' if wait else None,
                   'groups_list': f"{','.join(groups_list) if groups_list else None}"}
 
-        return self._do(http_method='DELETE', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='DELETE', endpoint=endpoint, params=params,
+                        invalidates=('/agents', '/groups'), split='groups_list', **kwargs)
+
+    def assign_to_group(self, group_id: str, agents_list: List, force_single_group: bool = False,
+                        pretty: bool = False, wait: bool = False, **kwargs):
+        """
+        Assign a list of agents to a group
+
+        :param group_id: (required) Group ID. (Name of the group)
+        :param agents_list: (required) List of agent IDs
+        :param force_single_group: Remove the agents from the groups they belong to before assigning them
+        :param pretty: Show results in human-readable format
+        :param wait: Disable timeout response
+        :other_param retry: can be bool or and instance of Retry
+        :return: Response object
+        """
+        endpoint = f'{self.url}/agents/group'
+
+        params = {'pretty': 'True' if pretty else None,
+                  'wait_for_complete': 'True' if wait else None,
+                  'group_id': group_id,
+                  'agents_list': ','.join(agents_list),
+                  'force_single_group': 'True' if force_single_group else None}
+
+        return self._do(http_method='PUT', endpoint=endpoint, params=params,
+                        invalidates=('/agents', '/groups'), split='agents_list', **kwargs)
+
+    def unassign_from_group(self, group_id: str, agents_list: List, pretty: bool = False, wait: bool = False,
+                            **kwargs):
+        """
+        Remove a list of agents from a group. Agents removed from all their groups revert to the default group
+
+        :param group_id: (required) Group ID. (Name of the group)
+        :param agents_list: (required) List of agent IDs
+        :param pretty: Show results in human-readable format
+        :param wait: Disable timeout response
+        :other_param retry: can be bool or and instance of Retry
+        :return: Response object
+        """
+        endpoint = f'{self.url}/agents/group'
+
+        params = {'pretty': 'True' if pretty else None,
+                  'wait_for_complete': 'True' if wait else None,
+                  'group_id': group_id,
+                  'agents_list': ','.join(agents_list)}
+
+        return self._do(http_method='DELETE', endpoint=endpoint, params=params,
+                        invalidates=('/agents', '/groups'), split='agents_list', **kwargs)
+
+    def add_many(self, agents: Iterable[Union[str, Tuple[str, Optional[str]]]], concurrency: int = 8,
+                 **kwargs) -> BulkResult:
+        """
+        Register many agents, one POST per agent on a pool of `concurrency` workers. A failing registration
+        is reported in the result and does not abort the batch
+
+        :param agents: Agent names, or (name, ip_address) tuples
+        :param concurrency: Maximum number of registrations in flight (Default: 8)
+        :param kwargs: Any other parameter accepted by add, for example wait or retry
+        :return: BulkResult whose affected_items hold the name, id and key of every registered agent
+        """
+        deadline = self._with_deadline(kwargs)
+
+        def calls():
+            for agent in agents:
+                name, ip_address = (agent, None) if isinstance(agent, str) else agent
+                yield [name], {'name': name}, self.add, dict(agent_name=name, ip_address=ip_address, **kwargs)
+
+        return self._bulk(calls(), concurrency, deadline)
+
+    def assign_many(self, group_id: str, agent_ids: Iterable[str], chunk_size: int = 500, concurrency: int = 4,
+                    **kwargs) -> BulkResult:
+        """
+        Assign any number of agents to a group, `chunk_size` agents per call
+
+        :param group_id: Group ID. (Name of the group)
+        :param agent_ids: Agent IDs to assign
+        :param chunk_size: Number of agents per call (Default: 500)
+        :param concurrency: Maximum number of calls in flight (Default: 4)
+        :param kwargs: Any other parameter accepted by assign_to_group, for example force_single_group
+        :return: BulkResult merging the affected_items and failed_items of every call
+        """
+        deadline = self._with_deadline(kwargs)
+        return self._bulk(self._chunked_calls(self.assign_to_group, group_id, agent_ids, chunk_size, kwargs),
+                          concurrency, deadline)
+
+    def unassign_many(self, group_id: str, agent_ids: Iterable[str], chunk_size: int = 500, concurrency: int = 4,
+                      **kwargs) -> BulkResult:
+        """
+        Remove any number of agents from a group, `chunk_size` agents per call
+
+        :param group_id: Group ID. (Name of the group)
+        :param agent_ids: Agent IDs to remove
+        :param chunk_size: Number of agents per call (Default: 500)
+        :param concurrency: Maximum number of calls in flight (Default: 4)
+        :param kwargs: Any other parameter accepted by unassign_from_group
+        :return: BulkResult merging the affected_items and failed_items of every call
+        """
+        deadline = self._with_deadline(kwargs)
+        return self._bulk(self._chunked_calls(self.unassign_from_group, group_id, agent_ids, chunk_size, kwargs),
+                          concurrency, deadline)
+
+    @staticmethod
+    def _chunked_calls(func, group_id: str, agent_ids: Iterable[str], chunk_size: int, kwargs) -> Iterator[tuple]:
+        ids = iter(agent_ids)
+        while chunk := list(islice(ids, chunk_size)):
+            yield chunk, None, func, dict(group_id=group_id, agents_list=chunk, **kwargs)
+
+    def _bulk(self, calls: Iterator[tuple], concurrency: int, deadline: Deadline = None) -> BulkResult:
+        """
+        Run (ids, item, func, kwargs) calls with at most `concurrency` in flight and merge their responses.
+        Calls not started when the deadline expires are recorded as failed
+        """
+        result = BulkResult()
+        if deadline is not None:
+            calls = deadline.bound(calls)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = {executor.submit(func, **call_kwargs): (ids, item)
+                       for ids, item, func, call_kwargs in islice(calls, concurrency)}
+
+            while pending:
+                future = next(as_completed(pending))
+                ids, item = pending.pop(future)
+                for next_ids, next_item, func, call_kwargs in islice(calls, 1):
+                    pending[executor.submit(func, **call_kwargs)] = (next_ids, next_item)
+
+                try:
+                    data = future.result().json().get('data', {})
+                except (RequestException, ValueError) as err:
+                    result.fail(ids, err)
+                    continue
+                result.merge(data, item)
+
+        self._expired(calls, result)
+        return result
+
+    @staticmethod
+    def _expired(calls: Iterator[tuple], result: BulkResult):
+        if isinstance(calls, BoundedIterator):
+            for ids, _, _, _ in calls.remaining():
+                result.fail(ids, DeadlineExceeded('deadline exceeded before the call was sent'))
 
     def distinct(self, pretty: bool = False, wait: bool = False, fields: List = None,
                  offset: int = 0, limit: int = 500, sort: str = None, search: str = None,
@@ -257,7 +411,7 @@ class WazuhAgents(BaseEndpoint):
             may be selected with 'field1.field2'
         :param search: Look for elements containing the specified string. To obtain a complementary search,
             use '-' at the beginning
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
         """
@@ -275,3 +429,23 @@ class WazuhAgents(BaseEndpoint):
             params.update({'fields': f"{','.join(fields) if fields is not None else ''}"})
 
         return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+
+    def iter_list(self, **kwargs):
+        """
+        Iterate over all available agents or the ones matching the given filters.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as list, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.list, **kwargs)
+
+    def iter_distinct(self, **kwargs):
+        """
+        Iterate over all the different combinations that agents have for the selected fields.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as distinct, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.distinct, **kwargs)
@@ -1,38 +1,641 @@
+import json
+import time
+
 import requests
 
-from typing import Optional, Dict
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Optional, Dict, Callable, Iterable, Iterator, List, Type, Union
+from urllib.parse import urlsplit
+
+from requests.exceptions import ConnectionError, ConnectTimeout, RequestException, Timeout
+from requests.adapters import Retry
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import MaxRetryError
+
+from ..breaker import CircuitBreaker, CircuitOpenError, circuit_key
+from ..cache import ResponseCache
+from ..deadline import Deadline, DeadlineExceeded, active as active_deadline, resolve as resolve_deadline
+from ..coalesce import RequestCoalescer
+from ..hedge import HedgePolicy
+from ..metrics import MetricsHook, RequestMetric, endpoint_template, pool_wait, reset_pool_wait
+from ..ratelimit import RateLimiter
+from ..tuning import PageSizeTuner
+from ..models import Record, RecordPage
+from ..query import Query
+from ..streaming import AffectedItemsStream
+
+
+# policy used when retry=True is passed
+DEFAULT_RETRY = Retry(total=5,
+                      backoff_factor=0.1,
+                      status_forcelist=[500, 502, 503, 504])
+
 
-from requests.exceptions import HTTPError
-from requests.adapters import HTTPAdapter, Retry
+def resolve_retry(retry: Union[bool, Retry, None]) -> Optional[Retry]:
+    """Turn a retry argument (bool, Retry or None) into a Retry policy or None"""
+    if isinstance(retry, bool):
+        return DEFAULT_RETRY if retry else None
+    return retry
+
+
+def can_retry_error(retry: Retry, http_method: str, error: Exception) -> bool:
+    """A connection that was never established is safe to retry, other errors only for allowed methods"""
+    if isinstance(error, ConnectTimeout):
+        return True
+    return retry.allowed_methods is None or http_method.upper() in retry.allowed_methods
 
 
 class BaseEndpoint:
     """Class for handling requests"""
-    def __init__(self, url: str, session: requests.Session = None, verify_ssl: bool = True):
+    # default cache time-to-live in seconds of read-mostly methods, used when a cache is configured
+    cache_ttls: Dict[str, float] = {}
+    # longest comma-separated list parameter sent in a single request, longer lists are split
+    max_list_length: int = 4096
+    # number of sub-requests of a split request sent in parallel
+    split_concurrency: int = 4
+
+    def __init__(self, url: str, session: requests.Session = None, verify_ssl: bool = True,
+                 retry: Union[bool, Retry, None] = None, cache: ResponseCache = None, models: bool = False,
+                 coalescer: RequestCoalescer = None, rate_limiter: RateLimiter = None,
+                 page_tuner: PageSizeTuner = None, metrics: MetricsHook = None, router=None,
+                 breaker: CircuitBreaker = None, timeout: Union[float, tuple, None] = None,
+                 hedge: HedgePolicy = None):
         self.url = url
         self.verify_ssl = verify_ssl
         self.session = session
+        # default retry policy of this endpoint, a retry argument passed to a method takes precedence
+        self.retry = retry
+        self.cache = cache
+        self.cache_ttls = dict(self.cache_ttls)
+        # return typed records instead of Response objects from methods that have a model
+        self.models = models
+        # share a single in-flight request between identical concurrent GETs
+        self.coalescer = coalescer
+        # token bucket shared by the client's endpoints, also pauses them all after a 429
+        self.rate_limiter = rate_limiter
+        # page sizes tuned per paginated method, used by paginate when no page_size is given
+        self.page_tuner = page_tuner
+        # called with a RequestMetric after every request, e.g. a MetricsCollector
+        self.metrics = metrics
+        # spreads requests over the managers of a cluster, see WazuhClientPool
+        self.router = router
+        # fails requests at once while the manager's endpoint family keeps failing
+        self.breaker = breaker
+        # connect and read timeouts of every request, a timeout argument passed to a method takes precedence
+        self.timeout = timeout
+        # total_affected_items of every chunk of the recently paginated split lists
+        self._split_totals: Dict[tuple, List[int]] = {}
+        # sends a second copy of GETs slower than usual, see HedgePolicy
+        self.hedge = hedge
 
     def _do(self, http_method: str, endpoint: str, params: Dict = None,
-            data=None, files: Dict = None, **kwargs):
-
-        if 'retry' in kwargs:
-            _retry = kwargs.pop('retry')
-            if isinstance(_retry, bool):
-                _retry = Retry(total=5,
-                               backoff_factor=0.1,
-                               status_forcelist=[500, 502, 503, 504])
-            elif isinstance(_retry, Retry):
-                pass
-            
-            self.session.mount('https://', HTTPAdapter(max_retries=_retry))
-            self.session.mount('http://', HTTPAdapter(max_retries=_retry))
-            
+            data=None, files: Dict = None, invalidates: Iterable[str] = (), model: Type[Record] = None,
+            split: str = None, **kwargs):
+        """
+        Send a request and raise for error statuses
+
+        :param invalidates: Paths, relative to the API URL, whose cached responses become stale once this
+            request succeeds
+        :param model: Record type of the affected items, returned instead of the Response when models are enabled
+        :param split: Comma-separated list parameter that is split over several requests when longer than
+            max_list_length, their responses are merged into one. Items come in the order of the list's
+            chunks, sort is rejected with a split list. offset and limit apply to the merged items, only the
+            chunks overlapping that window are read
+        :other_param retry: can be bool or and instance of Retry
+        :other_param cache_ttl: Cache a GET response for this many seconds when a cache is configured
+        :other_param models: Override the endpoint's models setting for this call
+        :other_param timeout: Connect and read timeouts in seconds, a number or a (connect, read) tuple
+        :other_param deadline: Time budget of the call, retries included, in seconds or as a Deadline
+        :other_param hedge: Set to False to never hedge this call when the endpoint has a HedgePolicy
+        """
+        model = model if kwargs.pop('models', self.models) else None
+        params = self._push_down(params, model)
+        self._with_deadline(kwargs)
+        hedge = self._hedge_key(http_method, endpoint, kwargs)
+
+        cache_key, cache_ttl = self._cache_key(http_method, endpoint, params, kwargs)
+        response = self.cache.get(cache_key) if cache_key is not None else None
+
+        if response is None:
+            coalesce_key = self._coalesce_key(http_method, endpoint, params, kwargs)
+            try:
+                if coalesce_key is None:
+                    response = self._send(http_method, endpoint, params, data, files, split, hedge, **kwargs)
+                else:
+                    response = self.coalescer.do(
+                        coalesce_key, lambda: self._send(http_method, endpoint, params, data, files, split, hedge, **kwargs),
+                        kwargs.get('deadline'))
+            except CircuitOpenError:
+                response = self._stale(cache_key)
+                if response is None:
+                    raise
+            else:
+                self._cache_store(cache_key, cache_ttl, response, invalidates)
+
+        return self._records(response, model, kwargs.get('stream', False))
+
+    @staticmethod
+    def _with_deadline(kwargs: Dict) -> Optional[Deadline]:
+        """Resolve the deadline argument of a call, or the enclosing one, so it follows the call across threads"""
+        deadline = resolve_deadline(kwargs.pop('deadline', None))
+        if deadline is not None:
+            kwargs['deadline'] = deadline
+        return deadline
+
+    @staticmethod
+    def _push_down(params: Optional[Dict], model: Type[Record] = None) -> Optional[Dict]:
+        """
+        Compile a Query passed as q to WQL. Unless the call has a select, the query's projection becomes
+        select, or else the fields the records of the call are read from, when it returns records
+        """
+        if not params:
+            return params
+
+        fields = ()
+        query = params.get('q')
+        if isinstance(query, Query):
+            params = dict(params, q=query.wql or None)
+            fields = query.fields
+        if not fields and model is not None:
+            fields = model.select_fields()
+        if fields and not params.get('select'):
+            params = dict(params, select=','.join(fields))
+        return params
+
+    def _send(self, http_method: str, endpoint: str, params: Dict = None, data=None, files: Dict = None,
+              split: str = None, hedge: str = None, **kwargs):
+        chunks = self._split(params, split)
+        with self._circuit(endpoint):
+            if chunks is not None:
+                return self._request_split(http_method, endpoint, params, chunks, data, files, **kwargs)
+            if hedge is None:
+                return self._request(http_method, endpoint, params, data, files, **kwargs)
+
+            if self.router is not None and self.hedge.other_node:
+                # managers already sent this request, the router sends the hedge to another one
+                kwargs['avoid'] = []
+            return self.hedge.call(hedge, lambda: self._request(http_method, endpoint, params, data, files, **kwargs))
+
+    def _hedge_key(self, http_method: str, endpoint: str, kwargs: Dict) -> Optional[str]:
+        """Endpoint template whose latencies decide when a GET is hedged, None if it is not hedged"""
+        # a streamed body is read by the caller, after the hedge has been decided
+        if not kwargs.pop('hedge', True) or self.hedge is None or http_method != 'GET' or kwargs.get('stream'):
+            return None
+        return endpoint_template(self._path(endpoint))
+
+    def _path(self, endpoint: str) -> str:
+        return endpoint[len(self.url):] if endpoint.startswith(self.url) else urlsplit(endpoint).path
+
+    @contextmanager
+    def _circuit(self, endpoint: str):
+        """Check the circuit breaker before a request and record its outcome, raises CircuitOpenError"""
+        # a router keeps one circuit per manager, around the requests it sends to each
+        if self.breaker is None or self.router is not None or not endpoint.startswith(self.url):
+            yield
+            return
+
+        # one circuit per API and endpoint family, e.g. https://wazuh:55000/syscollector
+        key = circuit_key(self.url, endpoint[len(self.url):])
+        self.breaker.before(key)
+        start = time.perf_counter()
         try:
-            response = self.session.request(method=http_method, url=endpoint, params=params,
-                                            data=data, files=files, verify=self.verify_ssl, **kwargs)
-            response.raise_for_status()
+            yield
+        except Exception as err:
+            self.breaker.record(key, self._overloaded(err), time.perf_counter() - start)
+            raise
+        self.breaker.record(key, False, time.perf_counter() - start)
+
+    @staticmethod
+    def _overloaded(err: Exception) -> bool:
+        """Whether a request error points at an unavailable or saturated manager, rather than at the request"""
+        if isinstance(err, DeadlineExceeded):
+            return False
+        response = getattr(err, 'response', None)
+        if response is not None:
+            return response.status_code >= 500 or response.status_code == 429
+        return isinstance(err, (ConnectionError, Timeout))
+
+    def _stale(self, cache_key: Optional[tuple]):
+        if self.cache is None or cache_key is None:
+            return None
+        return self.cache.get_stale(cache_key)
+
+    def _request_split(self, http_method: str, endpoint: str, params: Dict, chunks: List[Dict],
+                       data=None, files: Dict = None, **kwargs) -> requests.Response:
+        totals = None
+        if 'offset' in params:
+            totals = self._known_totals(endpoint, params)
+            if totals is None:
+                probes = self._request_parts(http_method, endpoint, self._probes(chunks), data, files, kwargs)
+                totals = self._remember_totals(endpoint, params, probes)
+            chunks = self._windows(params, chunks, [total['total_affected_items'] for total in totals])
+        parts = self._request_parts(http_method, endpoint, chunks, data, files, kwargs)
+
+        first = parts[0]
+        response = requests.Response()
+        response.status_code = first.status_code
+        response.reason = first.reason
+        response.headers = CaseInsensitiveDict(first.headers)
+        for header in ('Content-Length', 'Content-Encoding', 'Transfer-Encoding'):
+            response.headers.pop(header, None)
+        response.url = first.url
+        response.request = first.request
+        response.encoding = 'utf-8'
+        response._content = json.dumps(self._merge_parts([part.json() for part in parts], totals)).encode('utf-8')
+        response._content_consumed = True
+        return response
+
+    def _request_parts(self, http_method: str, endpoint: str, chunks: List[Dict], data, files: Optional[Dict],
+                       kwargs: Dict) -> List[requests.Response]:
+        if len(chunks) == 1:
+            return [self._request(http_method, endpoint, chunks[0], data, files, **kwargs)]
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.split_concurrency)) as executor:
+            return list(executor.map(lambda chunk: self._request(http_method, endpoint, chunk, data, files, **kwargs),
+                                     chunks))
+
+    def _known_totals(self, endpoint: str, params: Dict) -> Optional[List[Dict]]:
+        """Chunk totals learnt by a previous page of the same split list, a first page always learns them again"""
+        if not int(params['offset']):
+            return None
+        return self._split_totals.get(self._totals_key(endpoint, params))
+
+    def _remember_totals(self, endpoint: str, params: Dict, probes: List) -> List[Dict]:
+        """Item and failure totals of every chunk, with its failed items which the API does not paginate"""
+        totals = []
+        for probe in probes:
+            data = probe.json().get('data', {})
+            totals.append({'total_affected_items': data.get('total_affected_items', 0),
+                           'total_failed_items': data.get('total_failed_items', 0),
+                           'failed_items': data.get('failed_items', [])})
+        if len(self._split_totals) >= 32:
+            self._split_totals.pop(next(iter(self._split_totals)), None)
+        self._split_totals[self._totals_key(endpoint, params)] = totals
+        return totals
+
+    @staticmethod
+    def _totals_key(endpoint: str, params: Dict) -> tuple:
+        return endpoint, tuple(sorted((k, str(v)) for k, v in params.items() if k not in ('offset', 'limit')))
+
+    @staticmethod
+    def _probes(chunks: List[Dict]) -> List[Dict]:
+        """Sub-requests reading a single item of every chunk, to learn how many items each one has"""
+        return [{**chunk, 'offset': '0', 'limit': '1'} for chunk in chunks]
+
+    @staticmethod
+    def _windows(params: Dict, chunks: List[Dict], totals: List[int]) -> List[Dict]:
+        """Sub-requests reading the offset and limit window of the items of all chunks, in chunk order"""
+        offset = int(params['offset'])
+        end = offset + int(params['limit']) if params.get('limit') else sum(totals)
+        windows, start = [], 0
+        for chunk, total in zip(chunks, totals):
+            first, last = max(offset, start), min(end, start + total)
+            if first < last:
+                windows.append({**chunk, 'offset': str(first - start), 'limit': str(last - first)})
+            start += total
+        # past the last item, an empty page still carries the other fields of the response
+        return windows or [{**chunks[-1], 'offset': str(totals[-1]), 'limit': '1'}]
+
+    def _split(self, params: Optional[Dict], split: Optional[str]) -> Optional[List[Dict]]:
+        """Parameters of every sub-request when params[split] is too long for one request, None otherwise"""
+        value = (params or {}).get(split) if split else None
+        if not value or len(value) <= self.max_list_length:
+            return None
+
+        chunks, chunk, length = [], [], 0
+        for item in value.split(','):
+            if chunk and length + len(item) + 1 > self.max_list_length:
+                chunks.append(chunk)
+                chunk, length = [], 0
+            chunk.append(item)
+            length += len(item) + 1
+        chunks.append(chunk)
+
+        if params.get('sort'):
+            # every chunk is sorted on its own, the merged items would not be
+            raise ValueError(f'sort cannot be used with a {split} longer than max_list_length ({self.max_list_length}), '
+                             f'sort the items once returned')
+        return [{**params, split: ','.join(chunk)} for chunk in chunks]
+
+    @staticmethod
+    def _merge_parts(bodies: List[Dict], totals: List[Dict] = None) -> Dict:
+        """
+        Merge the bodies of split sub-requests, summing their totals
+
+        :param bodies: Bodies of the sub-requests, in chunk order
+        :param totals: Totals and failed items of every chunk, when the sub-requests only read a window of the
+            list. Every page then reports the totals and failed items of the whole list
+        """
+        items, failed = [], []
+        total_affected = total_failed = 0
+        for body in bodies:
+            data = body.get('data', {})
+            items.extend(data.get('affected_items', []))
+            failed.extend(data.get('failed_items', []))
+            total_affected += data.get('total_affected_items', 0)
+            total_failed += data.get('total_failed_items', 0)
+        if totals is not None:
+            total_affected = sum(total['total_affected_items'] for total in totals)
+            total_failed = sum(total['total_failed_items'] for total in totals)
+            failed = [item for total in totals for item in total['failed_items']]
+
+        merged = dict(bodies[0])
+        merged['data'] = {**bodies[0].get('data', {}), 'affected_items': items, 'failed_items': failed,
+                          'total_affected_items': total_affected, 'total_failed_items': total_failed}
+        if 'error' in merged:
+            # 0: every item succeeded, 1: every item failed, 2: some failed
+            merged['error'] = 0 if not failed else 2 if total_affected else 1
+        return merged
+
+    @staticmethod
+    def _records(response, model: Optional[Type[Record]], stream: bool):
+        if model is None:
             return response
+        if stream:
+            return AffectedItemsStream(response, factory=model.from_dict)
+
+        data = response.json().get('data', {})
+        return RecordPage(map(model.from_dict, data.get('affected_items', [])),
+                          total_affected_items=data.get('total_affected_items', 0),
+                          total_failed_items=data.get('total_failed_items', 0),
+                          failed_items=data.get('failed_items'))
+
+    @staticmethod
+    def _as_stream(result) -> AffectedItemsStream:
+        # methods with a model already wrap streamed responses
+        return result if isinstance(result, AffectedItemsStream) else AffectedItemsStream(result)
+
+    @staticmethod
+    def _page_items(result) -> tuple:
+        """Affected items and total_affected_items of a Response, RecordPage or AffectedItemsStream"""
+        if isinstance(result, AffectedItemsStream):
+            return list(result), result.total_affected_items
+        if isinstance(result, RecordPage):
+            return result, result.total_affected_items
+
+        data = result.json().get('data', {})
+        return data.get('affected_items', []), data.get('total_affected_items', 0)
+
+    def _cache_key(self, http_method: str, endpoint: str, params: Dict, kwargs: Dict):
+        cache_ttl = kwargs.pop('cache_ttl', None)
+        if self.cache is None or not cache_ttl or http_method != 'GET' or kwargs.get('stream'):
+            return None, None
+        return self.cache.key(http_method, endpoint, params), cache_ttl
+
+    def _coalesce_key(self, http_method: str, endpoint: str, params: Dict, kwargs: Dict) -> Optional[tuple]:
+        # streamed bodies can only be read once, they are never shared
+        if self.coalescer is None or http_method != 'GET' or kwargs.get('stream'):
+            return None
+        return ResponseCache.key(http_method, endpoint, params)
+
+    def _cache_store(self, cache_key: Optional[tuple], cache_ttl: Optional[float], response, invalidates: Iterable[str]):
+        if self.cache is None:
+            return
+        if cache_key is not None:
+            self.cache.set(cache_key, response, cache_ttl)
+        for path in invalidates:
+            self.cache.invalidate(f'{self.url}{path}')
+
+    def _request(self, http_method: str, endpoint: str, params: Dict = None,
+                 data=None, files: Dict = None, **kwargs):
+
+        # retries run here on the session's long-lived adapter instead of mounting a new one, so
+        # a retry reuses pooled keep-alive connections
+        _retry = resolve_retry(kwargs.pop('retry', self.retry))
+        deadline = kwargs.pop('deadline', None)
+        timeout = kwargs.pop('timeout', self.timeout)
+        throttled = 0
+        attempts = 0
+        start = time.perf_counter()
+        if self.metrics is not None:
+            reset_pool_wait()
+
+        try:
+            while True:
+                attempts += 1
+                if deadline is not None:
+                    deadline.check()
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(deadline)
+                    if deadline is not None:
+                        deadline.check()
+                try:
+                    with active_deadline(deadline):
+                        response = self._session_request(http_method, endpoint, params=params, data=data,
+                                                         files=files, verify=self.verify_ssl, timeout=timeout,
+                                                         deadline=deadline, **kwargs)
+                except DeadlineExceeded:
+                    raise
+                except (ConnectionError, Timeout) as err:
+                    if _retry is None or not can_retry_error(_retry, http_method, err):
+                        raise
+                    try:
+                        _retry = _retry.increment(method=http_method, url=endpoint, error=err)
+                    except MaxRetryError:
+                        raise err
+                    # no point in waiting for a retry the budget does not cover
+                    if deadline is not None and _retry.get_backoff_time() >= deadline.remaining():
+                        raise err
+                    _retry.sleep()
+                    continue
+
+                if self._throttled(response.status_code, response.headers, throttled):
+                    throttled += 1
+                    response.close()
+                    continue
+
+                has_retry_after = 'Retry-After' in response.headers
+                if _retry is None or not _retry.is_retry(http_method, response.status_code, has_retry_after):
+                    break
+
+                try:
+                    _retry = _retry.increment(method=http_method, url=endpoint, response=response.raw)
+                except MaxRetryError:
+                    break
+
+                delay = _retry.get_backoff_time()
+                if has_retry_after and _retry.respect_retry_after_header:
+                    delay = max(delay, _retry.parse_retry_after(response.headers['Retry-After']))
+                if deadline is not None and delay >= deadline.remaining():
+                    break
+                response.close()
+                time.sleep(delay)
+        except RequestException as err:
+            self._observe(http_method, endpoint, None, start, attempts, kwargs.get('stream'), pool_wait(), err)
+            raise
+
+        self._observe(http_method, endpoint, response, start, attempts, kwargs.get('stream'), pool_wait())
+        response.raise_for_status()
+        return response
+
+    def _session_request(self, http_method: str, endpoint: str, deadline: Deadline = None,
+                         **kwargs) -> requests.Response:
+        avoid = kwargs.pop('avoid', None)
+        if self.router is None or not endpoint.startswith(self.url):
+            if deadline is not None:
+                kwargs['timeout'] = deadline.cap(kwargs.get('timeout'))
+            return self.session.request(method=http_method, url=endpoint, **kwargs)
+        # the router caps the timeout of every node it tries
+        return self.router.request(http_method, endpoint[len(self.url):], avoid=avoid, deadline=deadline, **kwargs)
+
+    def _observe(self, http_method: str, endpoint: str, response, start: float, attempts: int, stream: bool,
+                 waited: Optional[float], error: Exception = None):
+        """Pass the outcome of a request, retries included, to the metrics hook"""
+        if self.metrics is None:
+            return
+
+        size = None
+        if response is not None and not stream:
+            size = len(response.content)
+        elif response is not None and response.headers.get('Content-Length'):
+            size = int(response.headers['Content-Length'])
+
+        self.metrics(RequestMetric(method=http_method, endpoint=endpoint_template(self._path(endpoint)),
+                                   status=response.status_code if response is not None else None,
+                                   elapsed=time.perf_counter() - start, size=size, retries=attempts - 1,
+                                   pool_wait=waited, error=type(error).__name__ if error is not None else None))
+
+    def _throttled(self, status_code: int, headers, throttled: int) -> bool:
+        """Whether a 429 is left to the rate limiter, which then pauses every caller before the request is resent"""
+        if status_code != 429 or self.rate_limiter is None or throttled >= self.rate_limiter.max_retries:
+            return False
+        self.rate_limiter.throttle(headers.get('Retry-After'), throttled + 1)
+        return True
+
+    def stream(self, func: Callable, *args, **kwargs) -> AffectedItemsStream:
+        """
+        Call a collection method with stream=True and decode data.affected_items incrementally from the
+        socket, one item at a time, instead of loading the whole response. Useful with large limits.
+
+        :param func: Bound collection method, for example client.vulns.get
+        :param args: Positional arguments passed to func, for example the agent ID
+        :param kwargs: Any other parameter accepted by func
+        :return: AffectedItemsStream, an iterator of items exposing the other data fields once consumed
+        """
+        return self._as_stream(func(*args, stream=True, **kwargs))
+
+    def paginate(self, func: Callable, *args, page_size: int = None, offset: int = 0,
+                 concurrency: int = 1, ordered: bool = True, stream: bool = False, **kwargs) -> Iterator[Dict]:
+        """
+        Lazily iterate over every item of a paginated collection. Iteration stops once
+        total_affected_items have been returned.
+
+        With concurrency=1 pages are requested one at a time and only the current page is kept in memory.
+        With a higher concurrency the first page is fetched to learn total_affected_items, then the
+        remaining offset windows are fetched on a bounded thread pool sharing the endpoint session, with
+        at most `concurrency` pages in flight or buffered at any time. Keep concurrency at or below the
+        session's connection pool size, otherwise connections are discarded instead of reused.
+
+        :param func: Bound collection method accepting offset and limit, for example client.agents.list
+        :param args: Positional arguments passed to func, for example the agent ID
+        :param page_size: Number of elements to request per page. If not specified, 500 or the size tuned
+            by the endpoint's page_tuner
+        :param offset: First element to return in the collection (Default: 0)
+        :param concurrency: Number of pages fetched in parallel (Default: 1)
+        :param ordered: Yield items in collection order. If False, pages are yielded as they complete
+        :param stream: Decode every page incrementally from the socket, see stream(). Sequential pagination
+            then holds a single item in memory instead of a page
+        :param kwargs: Any other parameter accepted by func, deadline is the budget of the whole iteration
+        :return: Iterator of affected items
+        """
+        if stream:
+            kwargs['stream'] = True
+        deadline = self._with_deadline(kwargs)
+
+        tune_key = self._tune_key(func, kwargs) if page_size is None and self.page_tuner is not None else None
+        if page_size is None:
+            page_size = self.page_tuner.size(tune_key) if tune_key is not None else 500
+
+        if concurrency > 1:
+            yield from self._paginate_concurrent(func, args, kwargs, page_size, offset, concurrency, ordered,
+                                                 tune_key)
+            return
+
+        while True:
+            if deadline is not None:
+                deadline.check()
+            if tune_key is not None:
+                page_size = self.page_tuner.size(tune_key)
+            if stream:
+                page = self._as_stream(func(*args, offset=offset, limit=page_size, **kwargs))
+                count = 0
+                for item in page:
+                    count += 1
+                    yield item
+                total = page.total_affected_items
+            else:
+                items, total = self._fetch_page(func, args, kwargs, offset, page_size, tune_key)
+                count = len(items)
+                yield from items
+                del items
+
+            offset += count
+            if not count or offset >= total:
+                break
+
+    def _fetch_page(self, func: Callable, args: tuple, kwargs: Dict, offset: int, limit: int, tune_key=None):
+        start = time.monotonic()
+        result = func(*args, offset=offset, limit=limit, **kwargs)
+        elapsed = time.monotonic() - start
+
+        if kwargs.get('stream'):
+            return self._page_items(self._as_stream(result))
+
+        items, total = self._page_items(result)
+        if tune_key is not None:
+            self.page_tuner.observe(tune_key, limit, len(items), elapsed, self._body_size(result))
+        return items, total
+
+    @staticmethod
+    def _tune_key(func: Callable, kwargs: Dict) -> tuple:
+        # a select-trimmed page is much lighter than a full one, they are tuned separately
+        selected = kwargs.get('select') or getattr(kwargs.get('query'), 'fields', None)
+        return getattr(func, '__qualname__', repr(func)), bool(selected)
+
+    @staticmethod
+    def _body_size(result) -> Optional[int]:
+        content = getattr(result, 'content', None)
+        return len(content) if content else None
+
+    def _paginate_concurrent(self, func: Callable, args: tuple, kwargs: Dict, page_size: int,
+                             offset: int, concurrency: int, ordered: bool, tune_key=None) -> Iterator[Dict]:
+        items, total = self._fetch_page(func, args, kwargs, offset, page_size, tune_key)
+        yield from items
+
+        if not items:
+            return
+
+        # the manager may cap the page size, so step by what it actually returned
+        step = len(items)
+        windows = iter(range(offset + step, total, step))
+        del items
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending = deque() if ordered else set()
+
+        def submit(window: int):
+            future = executor.submit(self._fetch_page, func, args, kwargs, window, step, tune_key)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+
+        try:
+            for window in islice(windows, concurrency):
+                submit(window)
+
+            while pending:
+                if ordered:
+                    future = pending.popleft()
+                else:
+                    future = next(as_completed(pending))
+                    pending.remove(future)
 
-        except HTTPError as err:
-            raise
\ No newline at end of file
+                page, _ = future.result()
+                for window in islice(windows, 1):
+                    submit(window)
+                yield from page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -2,11 +2,14 @@ import json
 import requests
 
 from .endpoint import BaseEndpoint
+from ..models import Agent
 
 
 class WazuhGroups(BaseEndpoint):
-    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True):
-        super().__init__(url, session, verify_ssl)
+    cache_ttls = {'config': 300}
+
+    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True, **kwargs):
+        super().__init__(url, session, verify_ssl, **kwargs)
 
     def get(self, pretty: bool = False, wait: bool = False, group_list: list = None,
             offset: int = 0, limit: int = 500, sort: str = None, search: str = None,
@@ -28,7 +31,7 @@ class WazuhGroups(BaseEndpoint):
         :param search: Look for elements containing the specified string. To obtain a complementary search, use
             '-' at the beginning
         :param hash: Select algorithm to generate the returned checksums
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param select: Select which fields to return (separated by comma). Use '.' for nested fields. For example,
             '{field1: field2}' may be selected with 'field1.field2'
         :param distinct: Look for distinct values.
@@ -71,7 +74,7 @@ class WazuhGroups(BaseEndpoint):
         :param search: Look for elements containing the specified string. To obtain a complementary search,
             use '-' at the beginning
         :param status: Filter by agent status (use commas to enter multiple statuses)
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -89,7 +92,7 @@ class WazuhGroups(BaseEndpoint):
                   'q': query,
                   'distinct': 'True' if distinct else None}
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=Agent, **kwargs)
 
     def create(self, group_name: str, pretty: bool = False, wait: bool = False, **kwargs):
         """
@@ -109,7 +112,8 @@ class WazuhGroups(BaseEndpoint):
 
         payload = json.dumps({'group_id': group_name})
 
-        return self._do(http_method='POST', endpoint=endpoint, data=payload, params=params, **kwargs)
+        return self._do(http_method='POST', endpoint=endpoint, data=payload, params=params,
+                        invalidates=('/groups',), **kwargs)
 
     def delete(self, groups_list: list, pretty: bool = False, wait: bool = False, **kwargs):
         """
@@ -129,7 +133,8 @@ class WazuhGroups(BaseEndpoint):
         if groups_list:
             params.update({'groups_list': f"{','.join(groups_list) if groups_list is not None else ''}"})
 
-        return self._do(http_method='DELETE', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='DELETE', endpoint=endpoint, params=params,
+                        invalidates=('/groups', '/agents'), split='groups_list', **kwargs)
 
     def config(self, group_name: str, pretty: bool = False, wait: bool = False,
                offset: int = 0, limit: int = 500, **kwargs):
@@ -143,6 +148,7 @@ class WazuhGroups(BaseEndpoint):
         :param limit: Maximum number of elements to return. Although up to 100.000 can be specified, it is
             recommended not to exceed 500 elements. Responses may be slower the more this number is exceeded.
         :other_param retry: can be bool or and instance of Retry
+        :other_param cache_ttl: Seconds to keep the response when the client has a cache (Default: 300, see cache_ttls)
         :return: Response object
         """
         endpoint = f'{self.url}/groups/{group_name}/configuration'
@@ -151,4 +157,36 @@ class WazuhGroups(BaseEndpoint):
                   'wait_for_complete': 'True' if wait else None,
                   'offset': str(offset),
                   'limit': str(limit)}
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
\ No newline at end of file
+
+        kwargs.setdefault('cache_ttl', self.cache_ttls.get('config'))
+        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+
+    def iter_get(self, **kwargs):
+        """
+        Iterate over all groups or a list of them.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as get, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.get, **kwargs)
+
+    def iter_agents(self, group_name: str, **kwargs):
+        """
+        Iterate over the agents that belong to the specified group.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agents, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agents, group_name, **kwargs)
+
+    def iter_config(self, group_name: str, **kwargs):
+        """
+        Iterate over the group configuration defined in the agent.conf file.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as config, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.config, group_name, **kwargs)
@@ -1,12 +1,30 @@
 import json
 import requests
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Optional, List, Iterable, Iterator, NamedTuple
+from requests.exceptions import RequestException
 from .endpoint import BaseEndpoint
+from ..deadline import BoundedIterator, DeadlineExceeded
+from ..models import Hotfix, NetAddr, Package, Port, Process
+
+
+class CollectResult(NamedTuple):
+    """Items of one syscollector kind for one agent. error is set instead of items when the call failed"""
+    agent_id: str
+    kind: str
+    items: Optional[List]
+    error: Optional[Exception] = None
 
 
 class WazuhSyscollector(BaseEndpoint):
-    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True):
-        super().__init__(url, session, verify_ssl)
+    # kinds accepted by collect(), the ones returning a single object are not paginated
+    KINDS = ('hardware', 'hotfixes', 'netaddr', 'netiface', 'netproto', 'os', 'packages', 'ports', 'processes')
+    UNPAGINATED_KINDS = ('hardware', 'os')
+    cache_ttls = {'agent_hardware': 300, 'agent_os': 300}
+
+    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True, **kwargs):
+        super().__init__(url, session, verify_ssl, **kwargs)
 
     def agent_hardware(self, agent_id: str, pretty: bool = False, wait: bool = False,
                        select: list = None, **kwargs):
@@ -19,6 +37,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param select: Select which fields to return (separated by comma). Use '.' for nested fields. For example,
             '{field1: field2}' may be selected with 'field1.field2'
         :other_param retry: can be bool or and instance of Retry
+        :other_param cache_ttl: Seconds to keep the response when the client has a cache (Default: 300, see cache_ttls)
         :return: Response object
         """
         endpoint = f'{self.url}/syscollector/{agent_id}/hardware'
@@ -29,6 +48,7 @@ class WazuhSyscollector(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
+        kwargs.setdefault('cache_ttl', self.cache_ttls.get('agent_hardware'))
         return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
 
     def agent_hotfixes(self, agent_id: str, pretty: bool = False, wait: bool = False,
@@ -52,7 +72,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param select: Select which fields to return (separated by comma). Use '.' for nested fields. For example,
             '{field1: field2}' may be selected with 'field1.field2'
         :param hotfix: Filter by hotfix
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -72,7 +92,7 @@ class WazuhSyscollector(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=Hotfix, **kwargs)
 
     def agent_netaddr(self, agent_id: str, pretty: bool = False, wait: bool = False,
                       offset: int = 0, limit: int = 500, sort: str = None, search: str = None,
@@ -100,7 +120,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param address: Filter by IP address
         :param broadcast: Filter by broadcast direction
         :param netmask: Filter by netmask
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -124,7 +144,7 @@ class WazuhSyscollector(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=NetAddr, **kwargs)
 
     def agent_netiface(self, agent_id: str, pretty: bool = False, wait: bool = False,
                        offset: int = 0, limit: int = 500, sort: str = None, search: str = None,
@@ -163,7 +183,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param rx_errors: Filter by rx.errors
         :param tx_dropped: Filter by tx.dropped
         :param rx_dropped: Filter by rx.dropped
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -222,7 +242,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param type: Type of network
         :param gateway: Filter by network gateway
         :param dhcp: Filter by network dhcp (enabled or disabled)
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -258,6 +278,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param select: Select which fields to return (separated by comma). Use '.' for nested fields. For example,
             '{field1: field2}' may be selected with 'field1.field2'
         :other_param retry: can be bool or and instance of Retry
+        :other_param cache_ttl: Seconds to keep the response when the client has a cache (Default: 300, see cache_ttls)
         :return: Response object
         """
         endpoint = f'{self.url}/syscollector/{agent_id}/os'
@@ -268,6 +289,7 @@ class WazuhSyscollector(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
+        kwargs.setdefault('cache_ttl', self.cache_ttls.get('agent_os'))
         return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
 
     def agent_packages(self, agent_id: str, pretty: bool = False, wait: bool = False,
@@ -297,7 +319,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param architecture: Filter by architecture
         :param format: Filter by file format. For example 'deb' will output deb files
         :param version: Filter by package version
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -321,7 +343,7 @@ class WazuhSyscollector(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=Package, **kwargs)
 
     def agent_ports(self, agent_id: str, pretty: bool = False, wait: bool = False,
                     offset: int = 0, limit: int = 500, sort: str = None, search: str = None,
@@ -352,7 +374,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param tx_queue: Filter by tx_queue
         :param state: Filter by state
         :param process: Filter by process name
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -379,7 +401,7 @@ class WazuhSyscollector(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=Port, **kwargs)
 
     def agent_processes(self, agent_id: str, pretty: bool = False, wait: bool = False,
                         offset: int = 0, limit: int = 500, sort: str = None, search: str = None, select: list = None,
@@ -417,7 +439,7 @@ class WazuhSyscollector(BaseEndpoint):
         :param ruser: Filter by process ruser
         :param sgroup: Filter by process sgroup
         :param suser: Filter by process suser
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -450,4 +472,134 @@ class WazuhSyscollector(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
\ No newline at end of file
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=Process, **kwargs)
+
+    def iter_agent_hotfixes(self, agent_id: str, **kwargs):
+        """
+        Iterate over the agent's hotfixes.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agent_hotfixes, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agent_hotfixes, agent_id, **kwargs)
+
+    def iter_agent_netaddr(self, agent_id: str, **kwargs):
+        """
+        Iterate over the agent's network addresses.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agent_netaddr, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agent_netaddr, agent_id, **kwargs)
+
+    def iter_agent_netiface(self, agent_id: str, **kwargs):
+        """
+        Iterate over the agent's network interfaces.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agent_netiface, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agent_netiface, agent_id, **kwargs)
+
+    def iter_agent_netproto(self, agent_id: str, **kwargs):
+        """
+        Iterate over the agent's routing configuration.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agent_netproto, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agent_netproto, agent_id, **kwargs)
+
+    def iter_agent_packages(self, agent_id: str, **kwargs):
+        """
+        Iterate over the agent's packages.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agent_packages, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agent_packages, agent_id, **kwargs)
+
+    def iter_agent_ports(self, agent_id: str, **kwargs):
+        """
+        Iterate over the agent's ports.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agent_ports, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agent_ports, agent_id, **kwargs)
+
+    def iter_agent_processes(self, agent_id: str, **kwargs):
+        """
+        Iterate over the agent's processes.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as agent_processes, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.agent_processes, agent_id, **kwargs)
+
+    def collect(self, agent_ids: Iterable[str], kinds: List[str] = None, concurrency: int = 8,
+                page_size: int = None, **kwargs) -> Iterator[CollectResult]:
+        """
+        Collect syscollector inventory for many agents. Every (agent, kind) pair is fetched on a pool of
+        `concurrency` workers sharing the endpoint session, paginated kinds are read in full. Results are
+        yielded as they complete, a failing call is reported through CollectResult.error and does not abort
+        the batch. agent_ids is consumed lazily so it can be a generator over a large fleet.
+
+        :param agent_ids: Agent IDs to collect
+        :param kinds: Kinds of inventory to collect, any of KINDS. All kinds if not specified
+        :param concurrency: Maximum number of calls in flight (Default: 8)
+        :param page_size: Number of elements to request per page for paginated kinds (Default: 500, or tuned, see paginate)
+        :param kwargs: Any other parameter accepted by the agent_* methods, for example wait or retry. With a
+            deadline, calls not started when it expires are reported with a DeadlineExceeded error
+        :return: Iterator of CollectResult(agent_id, kind, items, error)
+        """
+        kinds = list(kinds or self.KINDS)
+        unknown = set(kinds) - set(self.KINDS)
+        if unknown:
+            raise ValueError(f'unknown syscollector kinds: {", ".join(sorted(unknown))}')
+
+        calls = ((agent_id, kind) for agent_id in agent_ids for kind in kinds)
+        deadline = self._with_deadline(kwargs)
+        if deadline is not None:
+            calls = deadline.bound(calls)
+        return self._collect(calls, concurrency, page_size, **kwargs)
+
+    def _collect(self, calls: Iterator[tuple], concurrency: int, page_size: int, **kwargs) -> Iterator[CollectResult]:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = {executor.submit(self._collect_one, agent_id, kind, page_size, **kwargs)
+                       for agent_id, kind in islice(calls, concurrency)}
+
+            while pending:
+                future = next(as_completed(pending))
+                pending.remove(future)
+                for agent_id, kind in islice(calls, 1):
+                    pending.add(executor.submit(self._collect_one, agent_id, kind, page_size, **kwargs))
+                yield future.result()
+
+        yield from self._expired(calls)
+
+    @staticmethod
+    def _expired(calls: Iterator[tuple]) -> Iterator[CollectResult]:
+        """Report the calls a deadline left unsent"""
+        if isinstance(calls, BoundedIterator):
+            for agent_id, kind in calls.remaining():
+                yield CollectResult(agent_id, kind, None, DeadlineExceeded('deadline exceeded before the call was sent'))
+
+    def _collect_one(self, agent_id: str, kind: str, page_size: int, **kwargs) -> CollectResult:
+        method = getattr(self, f'agent_{kind}')
+        try:
+            if kind in self.UNPAGINATED_KINDS:
+                items, _ = self._page_items(method(agent_id, **kwargs))
+            else:
+                items = list(self.paginate(method, agent_id, page_size=page_size, **kwargs))
+        except (RequestException, ValueError) as err:
+            return CollectResult(agent_id, kind, None, err)
+
+        return CollectResult(agent_id, kind, items)
@@ -2,11 +2,12 @@ import json
 import requests
 from typing import Optional, List
 from .endpoint import BaseEndpoint
+from ..models import Vulnerability
 
 
 class WazuhVulnerability(BaseEndpoint):
-    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True):
-        super().__init__(url, session, verify_ssl)
+    def __init__(self, url: str, session: requests.Session, verify_ssl: bool = True, **kwargs):
+        super().__init__(url, session, verify_ssl, **kwargs)
 
     def get(self, agent_id: str, pretty: bool = False, wait: bool = False,
             offset: int = 0, limit: int = 500, sort: str = None, search: str = None,
@@ -27,7 +28,7 @@ class WazuhVulnerability(BaseEndpoint):
             use '-' at the beginning
         :param select:  Select which fields to return (separated by comma). Use '.' for nested fields. For example,
             '{field1: field2}' may be selected with 'field1.field2'
-        :param query: Query to filter results by. For example q="status=active"
+        :param query: Query to filter results by. For example q="status=active", or a wazuhpy.Query
         :param distinct: Look for distinct values.
         :other_param retry: can be bool or and instance of Retry
         :return: Response object
@@ -46,4 +47,31 @@ class WazuhVulnerability(BaseEndpoint):
         if select:
             params.update({'select': f"{','.join(select) if select is not None else ''}"})
 
-        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
\ No newline at end of file
+        return self._do(http_method='GET', endpoint=endpoint, params=params, model=Vulnerability, **kwargs)
+
+    def last_scan(self, agent_id: str, pretty: bool = False, wait: bool = False, **kwargs):
+        """
+        Return when the last full and partial vulnerability scans of an agent finished
+
+        :param agent_id: Agent ID. All possible values from 000 onwards
+        :param pretty: Show results in human-readable format
+        :param wait: Disable timeout response
+        :other_param retry: can be bool or and instance of Retry
+        :return: Response object
+        """
+        endpoint = f'{self.url}/vulnerability/{agent_id}/last_scan'
+
+        params = {'pretty': 'True' if pretty else None,
+                  'wait_for_complete': 'True' if wait else None}
+
+        return self._do(http_method='GET', endpoint=endpoint, params=params, **kwargs)
+
+    def iter_get(self, agent_id: str, **kwargs):
+        """
+        Iterate over the vulnerabilities of an agent.
+        Pages are fetched lazily until every item has been returned. Accepts the same parameters as get, except offset and limit
+
+        :param page_size: Number of elements to request per page (Default: 500, or the size tuned by the page_tuner)
+        :return: Iterator of affected items
+        """
+        return self.paginate(self.get, agent_id, **kwargs)
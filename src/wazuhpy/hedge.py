@@ -0,0 +1,196 @@
+import asyncio
+import math
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+
+class HedgePolicy:
+    """
+    Hedged GETs: a request still unanswered after the `percentile` of the recent latencies of its endpoint
+    is sent a second time, to another manager when the client is a WazuhClientPool, and the first answer
+    wins. Hedges are limited to `max_extra` per request sent, e.g. 0.05 for at most 5% extra requests with
+    bursts of `burst`, and only start once `min_samples` latencies of the endpoint are known.
+
+    Synchronous requests being hedged run on a thread pool of `max_workers` threads, requests arriving
+    while it is busy are sent without a hedge.
+    """
+    def __init__(self, percentile: float = 95, max_extra: float = 0.05, burst: int = 10, window: int = 200,
+                 min_samples: int = 20, min_delay: float = 0.01, other_node: bool = True, max_workers: int = 64):
+        """
+        :param percentile: Percentile of the recent latencies of an endpoint after which its requests are hedged
+        :param max_extra: Hedges allowed per request sent
+        :param burst: Hedges that can be sent in a row once enough requests went through without one
+        :param window: Number of recent latencies kept per endpoint
+        :param min_samples: Number of latencies of an endpoint needed before its requests are hedged
+        :param min_delay: Shortest delay in seconds before a hedge is sent
+        :param other_node: Send the hedge to another manager than the first request, on a WazuhClientPool
+        :param max_workers: Threads sending synchronous hedged requests
+        """
+        self.percentile = percentile
+        self.max_extra = max_extra
+        self.burst = burst
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.other_node = other_node
+        self.max_workers = max_workers
+        # hedges sent, and hedges that answered first
+        self.hedged = 0
+        self.won = 0
+        self._tokens = float(burst)
+        self._latencies: Dict[Hashable, deque] = {}
+        self._busy = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def delay(self, key: Hashable) -> Optional[float]:
+        """Seconds after which a request of this endpoint is hedged, None until enough latencies are known"""
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+            samples = sorted(latencies)
+        # nearest-rank
+        rank = min(len(samples) - 1, max(0, math.ceil(self.percentile / 100 * len(samples)) - 1))
+        return max(self.min_delay, samples[rank])
+
+    def observe(self, key: Hashable, elapsed: float):
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None:
+                latencies = self._latencies[key] = deque(maxlen=self.window)
+            latencies.append(elapsed)
+
+    def call(self, key: Hashable, send: Callable[[], Any]) -> Any:
+        """
+        Call send and return its response, calling it a second time if it is slower than the endpoint's delay
+
+        :param key: Endpoint the latencies are kept for, e.g. its template
+        :param send: Sends the request, called once more for the hedge from another thread
+        """
+        delay = self._admit(key)
+        start = time.perf_counter()
+        primary = self._submit(send) if delay is not None else None
+        if primary is None:
+            response = send()
+            self.observe(key, time.perf_counter() - start)
+            return response
+
+        futures = [primary]
+        if not wait(futures, timeout=delay).done:
+            hedge = self._submit(send, hedge=True)
+            if hedge is not None:
+                futures.append(hedge)
+
+        response, pending = _NONE, set(futures)
+        while response is _NONE and pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            response = self._winner(futures, done)
+        # the slower request cannot be interrupted, its response is closed once it arrives
+        for future in pending:
+            future.add_done_callback(_close)
+
+        if response is _NONE:
+            # every copy failed, raise the error of the first request
+            raise primary.exception()
+        self.observe(key, time.perf_counter() - start)
+        return response
+
+    async def call_async(self, key: Hashable, send: Callable[[], Awaitable]) -> Any:
+        """asyncio version of call, send is a coroutine function. The slower request is cancelled"""
+        delay = self._admit(key)
+        start = time.perf_counter()
+        if delay is None:
+            response = await send()
+            self.observe(key, time.perf_counter() - start)
+            return response
+
+        tasks = [asyncio.ensure_future(send())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self._take():
+                tasks.append(asyncio.ensure_future(send()))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # bodies of async responses are already read
+                response = self._winner(tasks, done, close=False)
+                if response is not _NONE or not pending:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if response is _NONE:
+            # every copy failed, raise the error of the first request
+            raise tasks[0].exception()
+        self.observe(key, time.perf_counter() - start)
+        return response
+
+    def _admit(self, key: Hashable) -> Optional[float]:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.max_extra)
+        return self.delay(key)
+
+    def _take(self) -> bool:
+        with self._lock:
+            return self._spend()
+
+    def _spend(self) -> bool:
+        """Spend the budget of one hedge, the lock is held"""
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        self.hedged += 1
+        return True
+
+    def _submit(self, send: Callable[[], Any], hedge: bool = False) -> Optional[Future]:
+        """Run send on the thread pool, None when it is busy or when a hedge is over budget"""
+        with self._lock:
+            if self._busy >= self.max_workers or (hedge and not self._spend()):
+                return None
+            self._busy += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='wazuhpy-hedge')
+        future = self._executor.submit(send)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, _: Future):
+        with self._lock:
+            self._busy -= 1
+
+    def _winner(self, futures: list, done: Iterable, close: bool = True) -> Any:
+        """Response of the first request of done that succeeded, the other responses are closed if close is set"""
+        response = _NONE
+        for future in sorted(done, key=futures.index):
+            if future.exception() is not None:
+                continue
+            if response is _NONE:
+                response = future.result()
+                if future is not futures[0]:
+                    with self._lock:
+                        self.won += 1
+            elif close:
+                _close(future)
+        return response
+
+    def shutdown(self):
+        """Stop the thread pool once the requests in flight complete"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+_NONE = object()
+
+
+def _close(future):
+    """Release the connection of a response nobody reads"""
+    if not future.cancelled() and future.exception() is None and hasattr(future.result(), 'close'):
+        future.result().close()
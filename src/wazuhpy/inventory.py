@@ -0,0 +1,194 @@
+import sqlite3
+
+from dataclasses import fields
+from itertools import islice
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from .endpoints.agents import WazuhAgents
+from .models import Agent
+
+
+# the manager reports a keep alive in the far future, it must not move the watermark
+MANAGER_ID = '000'
+
+_COLUMNS = tuple(field.name for field in fields(Agent) if field.name != 'group')
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS agents ({', '.join(f'{column} TEXT' if column != 'id' else 'id TEXT PRIMARY KEY'
+                                              for column in _COLUMNS)});
+CREATE TABLE IF NOT EXISTS agent_groups (
+    agent_id TEXT NOT NULL REFERENCES agents (id) ON DELETE CASCADE,
+    group_name TEXT NOT NULL,
+    PRIMARY KEY (agent_id, group_name)
+);
+CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);
+CREATE INDEX IF NOT EXISTS agents_status ON agents (status);
+CREATE INDEX IF NOT EXISTS agents_os_platform ON agents (os_platform);
+CREATE INDEX IF NOT EXISTS agents_version ON agents (version);
+CREATE INDEX IF NOT EXISTS agents_node_name ON agents (node_name);
+CREATE INDEX IF NOT EXISTS agents_last_keep_alive ON agents (last_keep_alive);
+CREATE INDEX IF NOT EXISTS agent_groups_group_name ON agent_groups (group_name);
+"""
+
+
+class InventorySyncResult(NamedTuple):
+    """Number of agents written by the incremental crawl and by the reconciliation pass, and deleted agents"""
+    updated: int
+    reconciled: int
+    deleted: List[str]
+
+
+class AgentInventory:
+    """
+    Local SQLite mirror of the agent inventory. The first sync crawls every agent, later syncs only
+    page through agents sorted by lastKeepAlive, newest first, until they reach the keep alive
+    watermark of the previous sync. A reconciliation pass then lists every agent ID and status, which
+    is cheap compared to the full agent documents, to drop deleted agents, update the status of agents
+    that disconnected and fetch agents that never connected. Reports can then run against the indexed
+    agents and agent_groups tables.
+    """
+    def __init__(self, agents: WazuhAgents, path: str = ':memory:', page_size: int = 500):
+        """
+        :param agents: Agents endpoint, for example client.agents
+        :param path: SQLite database file, kept between runs
+        :param page_size: Number of agents requested per page
+        """
+        self.agents = agents
+        self.page_size = page_size
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA foreign_keys = ON')
+        self.db.executescript(_SCHEMA)
+
+    @property
+    def watermark(self) -> Optional[str]:
+        """Most recent lastKeepAlive stored by a sync, None before the first sync"""
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def sync(self, reconcile: bool = True) -> InventorySyncResult:
+        """
+        Fetch the agents whose keep alive moved since the previous sync, then reconcile deletions
+        and status changes
+
+        :param reconcile: Run the reconciliation pass
+        :return: InventorySyncResult(updated, reconciled, deleted)
+        """
+        watermark = self.watermark
+        newest = watermark
+        changed = []
+
+        # ISO 8601 timestamps in UTC compare correctly as strings
+        for agent in self.agents.iter_list(select=Agent.select_fields(), sort='-lastKeepAlive',
+                                           page_size=self.page_size, models=True):
+            if agent.id == MANAGER_ID:
+                changed.append(agent)
+                continue
+            if watermark is not None and (agent.last_keep_alive is None or agent.last_keep_alive < watermark):
+                break
+            changed.append(agent)
+            if agent.last_keep_alive is not None and (newest is None or agent.last_keep_alive > newest):
+                newest = agent.last_keep_alive
+
+        with self.db:
+            self._store(changed)
+            if newest is not None:
+                self.db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('watermark', ?)", (newest,))
+
+        reconciled, deleted = self.reconcile() if reconcile else (0, [])
+        return InventorySyncResult(len(changed), reconciled, deleted)
+
+    def reconcile(self) -> tuple:
+        """
+        Compare the IDs and statuses of every remote agent with the mirror. Deleted agents are removed,
+        statuses are updated in place and agents missing from the mirror are fetched by ID
+
+        :return: Number of agents updated or fetched, and the IDs of deleted agents
+        """
+        remote = {agent['id']: agent.get('status')
+                  for agent in self.agents.iter_list(select=['id', 'status'], page_size=self.page_size, models=False)}
+        local = dict(self.db.execute('SELECT id, status FROM agents'))
+
+        deleted = sorted(set(local) - set(remote))
+        missing = [agent_id for agent_id in remote if agent_id not in local]
+        statuses = [(status, agent_id) for agent_id, status in remote.items()
+                    if agent_id in local and local[agent_id] != status]
+
+        fetched = []
+        ids = iter(missing)
+        while chunk := list(islice(ids, self.page_size)):
+            fetched.extend(self.agents.iter_list(agents_list=chunk, select=Agent.select_fields(),
+                                                 page_size=self.page_size, models=True))
+
+        with self.db:
+            self.db.executemany('DELETE FROM agents WHERE id = ?', ((agent_id,) for agent_id in deleted))
+            self.db.executemany('UPDATE agents SET status = ? WHERE id = ?', statuses)
+            self._store(fetched)
+
+        return len(statuses) + len(fetched), deleted
+
+    def _store(self, agents: Iterable[Agent]):
+        placeholders = ', '.join('?' for _ in _COLUMNS)
+        for agent in agents:
+            self.db.execute(f"INSERT OR REPLACE INTO agents ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                            tuple(getattr(agent, column) for column in _COLUMNS))
+            self.db.execute('DELETE FROM agent_groups WHERE agent_id = ?', (agent.id,))
+            self.db.executemany('INSERT INTO agent_groups (agent_id, group_name) VALUES (?, ?)',
+                                ((agent.id, group) for group in agent.group or ()))
+
+    def get(self, agent_id: str) -> Optional[Agent]:
+        agents = self.find(id=agent_id)
+        return agents[0] if agents else None
+
+    def find(self, group: str = None, **columns) -> List[Agent]:
+        """
+        Select agents from the mirror
+
+        :param group: Only agents belonging to this group
+        :param columns: Equality filters on the Agent fields, for example status='active', os_platform='ubuntu'
+        :return: List of Agent
+        """
+        unknown = set(columns) - set(_COLUMNS)
+        if unknown:
+            raise ValueError(f'Unknown agent fields: {", ".join(sorted(unknown))}')
+
+        where = [f'{column} = ?' for column in columns]
+        values = list(columns.values())
+        if group is not None:
+            where.append('id IN (SELECT agent_id FROM agent_groups WHERE group_name = ?)')
+            values.append(group)
+
+        sql = f'SELECT {", ".join(_COLUMNS)} FROM agents'
+        if where:
+            sql += f' WHERE {" AND ".join(where)}'
+
+        rows = self.db.execute(f'{sql} ORDER BY id', values).fetchall()
+        groups = self._groups(row[0] for row in rows)
+        return [Agent(**dict(zip(_COLUMNS, row)), group=groups.get(row[0])) for row in rows]
+
+    def count_by(self, column: str) -> Dict[Optional[str], int]:
+        """Number of agents per value of an Agent field, or per group with column='group'"""
+        if column == 'group':
+            return dict(self.db.execute('SELECT group_name, COUNT(*) FROM agent_groups GROUP BY group_name'))
+        if column not in _COLUMNS:
+            raise ValueError(f'Unknown agent field: {column}')
+        return dict(self.db.execute(f'SELECT {column}, COUNT(*) FROM agents GROUP BY {column}'))
+
+    def _groups(self, agent_ids: Iterable[str]) -> Dict[str, tuple]:
+        groups = {}
+        ids = iter(agent_ids)
+        # stay below SQLite's bound parameter limit
+        while chunk := list(islice(ids, 500)):
+            placeholders = ', '.join('?' for _ in chunk)
+            for agent_id, group in self.db.execute(f'SELECT agent_id, group_name FROM agent_groups '
+                                                   f'WHERE agent_id IN ({placeholders}) ORDER BY rowid', chunk):
+                groups.setdefault(agent_id, []).append(group)
+        return {agent_id: tuple(names) for agent_id, names in groups.items()}
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,226 @@
+import math
+import threading
+import time
+
+from collections import Counter, deque
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class RequestMetric(NamedTuple):
+    """One request sent by an endpoint, retries included, as passed to the client's metrics hook"""
+    method: str
+    endpoint: str
+    status: Optional[int]
+    elapsed: float
+    size: Optional[int]
+    retries: int
+    pool_wait: Optional[float]
+    error: Optional[str] = None
+
+
+# signature of a metrics hook
+MetricsHook = Callable[[RequestMetric], None]
+
+# segments following these are agent IDs, unless they are one of the listed literal sub-paths
+_AGENT_PARENTS = {'agents': {'group', 'stats', 'outdated', 'summary', 'upgrade', 'restart', 'no_group', 'node',
+                             'insert', 'reconnect'},
+                  'syscollector': set(),
+                  'vulnerability': set()}
+# placeholders of the segments following these under /agents/{agent_id}
+_AGENT_CHILDREN = {'group': '{group_id}', 'config': '{component}', '{component}': '{configuration}'}
+
+
+def endpoint_template(path: str) -> str:
+    """
+    Replace the agent IDs, group names and configuration sections of an API path with placeholders, so
+    that requests to the same endpoint are aggregated, e.g. /agents/001/config/logcollector/localfile
+    becomes /agents/{agent_id}/config/{component}/{configuration}
+    """
+    template = []
+    for part in path.strip('/').split('/'):
+        depth = len(template)
+        root = template[0] if template else None
+        if depth == 1 and root in _AGENT_PARENTS and part not in _AGENT_PARENTS[root]:
+            part = '{agent_id}'
+        elif depth == 1 and root == 'groups':
+            part = '{group_id}'
+        elif depth >= 2 and root == 'agents' and template[1] == '{agent_id}':
+            part = _AGENT_CHILDREN.get(template[-1], part)
+        template.append(part)
+    return '/' + '/'.join(template)
+
+
+_pool_wait = threading.local()
+
+
+def reset_pool_wait():
+    _pool_wait.seconds = 0.0
+
+
+def pool_wait() -> float:
+    """Seconds the current thread spent waiting for a pooled connection since reset_pool_wait"""
+    return getattr(_pool_wait, 'seconds', 0.0)
+
+
+class _TimedPoolMixin:
+    def _get_conn(self, timeout=None):
+        start = time.perf_counter()
+        try:
+            return super()._get_conn(timeout)
+        finally:
+            _pool_wait.seconds = pool_wait() + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(_TimedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _TimedHTTPSConnectionPool(_TimedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+def instrument_adapter(adapter: HTTPAdapter):
+    """Time the connection checkouts of an adapter's pools, the wait shows up when pool_block is set"""
+    adapter.poolmanager.pool_classes_by_scheme = {'http': _TimedHTTPConnectionPool,
+                                                  'https': _TimedHTTPSConnectionPool}
+
+
+class _EndpointStats:
+    __slots__ = ('count', 'elapsed', 'bytes', 'retries', 'pool_wait', 'statuses', 'errors', 'buckets', 'samples')
+
+    def __init__(self, buckets: int, samples: int):
+        self.count = 0
+        self.elapsed = 0.0
+        self.bytes = 0
+        self.retries = 0
+        self.pool_wait = 0.0
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.buckets = [0] * buckets
+        self.samples = deque(maxlen=samples)
+
+
+class MetricsCollector:
+    """
+    In-process metrics hook. Aggregates requests per (method, endpoint template): latency histogram and
+    percentiles over the most recent `samples` requests, response bytes, retries, pool wait, status codes
+    and errors. to_prometheus() renders everything in the Prometheus text exposition format.
+    """
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, samples: int = 1000, buckets: Iterable[float] = BUCKETS):
+        """
+        :param samples: Number of recent latencies kept per endpoint to compute percentiles
+        :param buckets: Upper bounds in seconds of the latency histogram buckets
+        """
+        self.samples = samples
+        self.buckets = tuple(sorted(buckets))
+        self.endpoints: Dict[Tuple[str, str], _EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, metric: RequestMetric):
+        key = (metric.method, metric.endpoint)
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = _EndpointStats(len(self.buckets), self.samples)
+
+            stats.count += 1
+            stats.elapsed += metric.elapsed
+            stats.bytes += metric.size or 0
+            stats.retries += metric.retries
+            stats.pool_wait += metric.pool_wait or 0.0
+            stats.samples.append(metric.elapsed)
+            if metric.status is not None:
+                stats.statuses[metric.status] += 1
+            if metric.error is not None:
+                stats.errors[metric.error] += 1
+            for i, bound in enumerate(self.buckets):
+                if metric.elapsed <= bound:
+                    stats.buckets[i] += 1
+                    break
+
+    def percentile(self, q: float, method: str = None, endpoint: str = None) -> Optional[float]:
+        """
+        Latency percentile over the recent samples of the matching endpoints
+
+        :param q: Percentile between 0 and 100
+        :param method: Only requests with this HTTP method
+        :param endpoint: Only requests to this endpoint template, for example /agents/{agent_id}
+        """
+        with self._lock:
+            samples = sorted(sample for (m, e), stats in self.endpoints.items()
+                             if (method is None or m == method) and (endpoint is None or e == endpoint)
+                             for sample in stats.samples)
+        if not samples:
+            return None
+        # nearest-rank
+        return samples[min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))]
+
+    def summary(self) -> Dict[Tuple[str, str], Dict]:
+        """Statistics per (method, endpoint template), slowest total time first"""
+        with self._lock:
+            keys = sorted(self.endpoints, key=lambda key: self.endpoints[key].elapsed, reverse=True)
+            stats = {key: self.endpoints[key] for key in keys}
+
+        return {key: {'count': s.count,
+                      'total_time': s.elapsed,
+                      'mean': s.elapsed / s.count,
+                      'p50': self.percentile(50, *key),
+                      'p90': self.percentile(90, *key),
+                      'p99': self.percentile(99, *key),
+                      'bytes': s.bytes,
+                      'retries': s.retries,
+                      'pool_wait': s.pool_wait,
+                      'statuses': dict(s.statuses),
+                      'errors': dict(s.errors)}
+                for key, s in stats.items()}
+
+    def to_prometheus(self, prefix: str = 'wazuhpy') -> str:
+        """Render the collected metrics in the Prometheus text exposition format"""
+        lines = [f'# HELP {prefix}_request_duration_seconds Wazuh API request latency, retries included',
+                 f'# TYPE {prefix}_request_duration_seconds histogram']
+        counters = {'response_bytes_total': 'Bytes received in response bodies',
+                    'request_retries_total': 'Requests sent again after an error or a retryable status',
+                    'pool_wait_seconds_total': 'Time spent waiting for a pooled connection'}
+        totals = {name: [] for name in counters}
+        responses, errors = [], []
+
+        with self._lock:
+            for (method, endpoint), s in sorted(self.endpoints.items()):
+                labels = f'method="{method}",endpoint="{_escape(endpoint)}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, s.buckets):
+                    cumulative += count
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {s.count}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {s.elapsed}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {s.count}')
+
+                totals['response_bytes_total'].append(f'{{{labels}}} {s.bytes}')
+                totals['request_retries_total'].append(f'{{{labels}}} {s.retries}')
+                totals['pool_wait_seconds_total'].append(f'{{{labels}}} {s.pool_wait}')
+                responses.extend(f'{{{labels},status="{status}"}} {count}' for status, count in sorted(s.statuses.items()))
+                errors.extend(f'{{{labels},error="{error}"}} {count}' for error, count in sorted(s.errors.items()))
+
+        for name, help_text in counters.items():
+            lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} counter']
+            lines += [f'{prefix}_{name}{sample}' for sample in totals[name]]
+        lines += [f'# HELP {prefix}_responses_total Responses per status code',
+                  f'# TYPE {prefix}_responses_total counter']
+        lines += [f'{prefix}_responses_total{sample}' for sample in responses]
+        lines += [f'# HELP {prefix}_request_errors_total Requests that failed without a response',
+                  f'# TYPE {prefix}_request_errors_total counter']
+        lines += [f'{prefix}_request_errors_total{sample}' for sample in errors]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')
@@ -0,0 +1,207 @@
+import sys
+
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+
+class Record:
+    """
+    Base of the typed result models. Models are slotted dataclasses populated from the items
+    of a response: FIELDS maps each attribute to the dotted path of the API field it is read from,
+    and the string values of INTERNED attributes are interned so that values repeated across
+    thousands of items (statuses, versions, vendors, ...) share a single string object.
+    """
+    __slots__ = ()
+
+    # attribute name -> dotted path of the field in the API item
+    FIELDS: ClassVar[Dict[str, str]] = {}
+    # attributes holding low-cardinality strings
+    INTERNED: ClassVar[frozenset] = frozenset()
+
+    _paths: ClassVar[tuple] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._paths = tuple((attr, tuple(path.split('.')), attr in cls.INTERNED) for attr, path in cls.FIELDS.items())
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]):
+        values = {}
+        for attr, path, interned in cls._paths:
+            value = item
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+            values[attr] = _intern(value) if interned else value
+        return cls(**values)
+
+    @classmethod
+    def select_fields(cls) -> List[str]:
+        """API fields the model is populated from, usable as the select parameter"""
+        return list(cls.FIELDS.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_intern(v) for v in value)
+    return value
+
+
+class RecordPage(list):
+    """List of records built from one response, carrying the response totals"""
+    __slots__ = ('total_affected_items', 'total_failed_items', 'failed_items')
+
+    def __init__(self, records=(), total_affected_items: int = 0, total_failed_items: int = 0,
+                 failed_items: List = None):
+        super().__init__(records)
+        self.total_affected_items = total_affected_items
+        self.total_failed_items = total_failed_items
+        self.failed_items = failed_items or []
+
+
+@dataclass(slots=True)
+class Agent(Record):
+    FIELDS = {'id': 'id', 'name': 'name', 'ip': 'ip', 'register_ip': 'registerIP', 'status': 'status',
+              'version': 'version', 'manager': 'manager', 'node_name': 'node_name', 'group': 'group',
+              'os_name': 'os.name', 'os_platform': 'os.platform', 'os_version': 'os.version',
+              'os_arch': 'os.arch', 'date_add': 'dateAdd', 'last_keep_alive': 'lastKeepAlive',
+              'group_config_status': 'group_config_status'}
+    INTERNED = frozenset({'status', 'version', 'manager', 'node_name', 'group', 'os_name', 'os_platform',
+                          'os_version', 'os_arch', 'group_config_status', 'register_ip'})
+
+    id: Optional[str] = None
+    name: Optional[str] = None
+    ip: Optional[str] = None
+    register_ip: Optional[str] = None
+    status: Optional[str] = None
+    version: Optional[str] = None
+    manager: Optional[str] = None
+    node_name: Optional[str] = None
+    group: Optional[Tuple[str, ...]] = None
+    os_name: Optional[str] = None
+    os_platform: Optional[str] = None
+    os_version: Optional[str] = None
+    os_arch: Optional[str] = None
+    date_add: Optional[str] = None
+    last_keep_alive: Optional[str] = None
+    group_config_status: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Package(Record):
+    FIELDS = {'name': 'name', 'version': 'version', 'vendor': 'vendor', 'architecture': 'architecture',
+              'format': 'format', 'description': 'description', 'size': 'size', 'install_time': 'install_time',
+              'location': 'location', 'scan_id': 'scan.id', 'scan_time': 'scan.time'}
+    INTERNED = frozenset({'name', 'version', 'vendor', 'architecture', 'format', 'description', 'install_time',
+                          'location', 'scan_time'})
+
+    name: Optional[str] = None
+    version: Optional[str] = None
+    vendor: Optional[str] = None
+    architecture: Optional[str] = None
+    format: Optional[str] = None
+    description: Optional[str] = None
+    size: Optional[int] = None
+    install_time: Optional[str] = None
+    location: Optional[str] = None
+    scan_id: Optional[int] = None
+    scan_time: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Process(Record):
+    FIELDS = {'pid': 'pid', 'ppid': 'ppid', 'name': 'name', 'cmd': 'cmd', 'state': 'state', 'euser': 'euser',
+              'ruser': 'ruser', 'egroup': 'egroup', 'priority': 'priority', 'nlwp': 'nlwp',
+              'start_time': 'start_time', 'vm_size': 'vm_size', 'scan_id': 'scan.id', 'scan_time': 'scan.time'}
+    INTERNED = frozenset({'name', 'cmd', 'state', 'euser', 'ruser', 'egroup', 'scan_time'})
+
+    pid: Optional[str] = None
+    ppid: Optional[int] = None
+    name: Optional[str] = None
+    cmd: Optional[str] = None
+    state: Optional[str] = None
+    euser: Optional[str] = None
+    ruser: Optional[str] = None
+    egroup: Optional[str] = None
+    priority: Optional[int] = None
+    nlwp: Optional[int] = None
+    start_time: Optional[int] = None
+    vm_size: Optional[int] = None
+    scan_id: Optional[int] = None
+    scan_time: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Port(Record):
+    FIELDS = {'protocol': 'protocol', 'local_ip': 'local.ip', 'local_port': 'local.port',
+              'remote_ip': 'remote.ip', 'remote_port': 'remote.port', 'state': 'state', 'pid': 'pid',
+              'process': 'process', 'tx_queue': 'tx_queue', 'rx_queue': 'rx_queue', 'inode': 'inode',
+              'scan_id': 'scan.id', 'scan_time': 'scan.time'}
+    INTERNED = frozenset({'protocol', 'local_ip', 'remote_ip', 'state', 'process', 'scan_time'})
+
+    protocol: Optional[str] = None
+    local_ip: Optional[str] = None
+    local_port: Optional[int] = None
+    remote_ip: Optional[str] = None
+    remote_port: Optional[int] = None
+    state: Optional[str] = None
+    pid: Optional[int] = None
+    process: Optional[str] = None
+    tx_queue: Optional[int] = None
+    rx_queue: Optional[int] = None
+    inode: Optional[int] = None
+    scan_id: Optional[int] = None
+    scan_time: Optional[str] = None
+
+
+@dataclass(slots=True)
+class NetAddr(Record):
+    FIELDS = {'iface': 'iface', 'proto': 'proto', 'address': 'address', 'netmask': 'netmask',
+              'broadcast': 'broadcast', 'scan_id': 'scan.id'}
+    INTERNED = frozenset({'iface', 'proto', 'netmask', 'broadcast'})
+
+    iface: Optional[str] = None
+    proto: Optional[str] = None
+    address: Optional[str] = None
+    netmask: Optional[str] = None
+    broadcast: Optional[str] = None
+    scan_id: Optional[int] = None
+
+
+@dataclass(slots=True)
+class Hotfix(Record):
+    FIELDS = {'hotfix': 'hotfix', 'scan_id': 'scan.id', 'scan_time': 'scan.time'}
+    INTERNED = frozenset({'hotfix', 'scan_time'})
+
+    hotfix: Optional[str] = None
+    scan_id: Optional[int] = None
+    scan_time: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Vulnerability(Record):
+    FIELDS = {'cve': 'cve', 'name': 'name', 'version': 'version', 'architecture': 'architecture',
+              'severity': 'severity', 'cvss2_score': 'cvss2_score', 'cvss3_score': 'cvss3_score',
+              'status': 'status', 'type': 'type', 'condition': 'condition', 'title': 'title',
+              'published': 'published', 'updated': 'updated', 'detection_time': 'detection_time'}
+    INTERNED = frozenset({'cve', 'name', 'version', 'architecture', 'severity', 'status', 'type', 'condition',
+                          'title', 'published', 'updated'})
+
+    cve: Optional[str] = None
+    name: Optional[str] = None
+    version: Optional[str] = None
+    architecture: Optional[str] = None
+    severity: Optional[str] = None
+    cvss2_score: Optional[float] = None
+    cvss3_score: Optional[float] = None
+    status: Optional[str] = None
+    type: Optional[str] = None
+    condition: Optional[str] = None
+    title: Optional[str] = None
+    published: Optional[str] = None
+    updated: Optional[str] = None
+    detection_time: Optional[str] = None
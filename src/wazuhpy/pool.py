@@ -0,0 +1,207 @@
+import threading
+import time
+
+from functools import cached_property
+from typing import Iterable, List, Optional, Set
+
+import requests
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+from urllib3.exceptions import ConnectTimeoutError
+
+from .breaker import CircuitBreaker, circuit_key
+from .cache import ResponseCache
+from .coalesce import RequestCoalescer
+from .deadline import Deadline
+from .hedge import HedgePolicy
+from .metrics import MetricsCollector
+from .ratelimit import RateLimiter
+from .tuning import PageSizeTuner
+from .wazuhpy import WazuhClient
+from .endpoints.groups import WazuhGroups
+from .endpoints.agents import WazuhAgents
+from .endpoints.syscollector import WazuhSyscollector
+from .endpoints.vulnerability import WazuhVulnerability
+
+
+class ManagerNode:
+    """A manager of the pool with its own client, session and token"""
+    __slots__ = ('url', 'client', 'master', 'outstanding', 'requests', 'failures', 'down_until')
+
+    def __init__(self, url: str, client: WazuhClient, master: bool = False):
+        self.url = url
+        self.client = client
+        self.master = master
+        # requests in flight on this node
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.down_until = 0.0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.down_until
+
+    def __repr__(self) -> str:
+        return f'ManagerNode({self.url!r}, master={self.master}, outstanding={self.outstanding})'
+
+
+class WazuhClientPool:
+    """
+    Client over the API of every manager of a Wazuh cluster. Reads (GET) go to the healthy node with the
+    fewest requests in flight, writes go to the master. A node failing with a connection error is left
+    out for `cooldown` seconds and the read is sent to another node; a write whose connection could not
+    even be opened fails over to a worker, which forwards it to the master. A read timeout is raised as is,
+    the node is up but slow and resending the request would only add to its load. Every node authenticates
+    on its first request. With a circuit breaker, every node has its own circuits and reads skip the nodes
+    whose circuit for the endpoint family is open.
+
+    Endpoints are used as on WazuhClient: pool.agents.list(), pool.syscol.collect(...). Cache, coalescing,
+    page tuning, metrics, the circuit breaker, hedging and the rate limit are shared by the whole pool.
+    """
+    def __init__(self, urls: Iterable[str], username: str = None, password: str = None, master: str = None,
+                 cooldown: float = 30, **client_options):
+        """
+        :param urls: Base URL of each manager's API, for example ['https://master:55000', 'https://worker1:55000']
+        :param username: API user
+        :param password: API password
+        :param master: URL of the master node, the first URL if not specified
+        :param cooldown: Seconds a node is left out of the pool after a connection error
+        :param client_options: Any other argument of WazuhClient, applied to every node. rate_limit is the
+            budget of the whole pool
+        """
+        urls = list(urls)
+        if not urls:
+            raise ValueError('WazuhClientPool needs at least one manager URL')
+        master = master or urls[0]
+        if master not in urls:
+            raise ValueError(f'master {master} is not one of the pool URLs')
+
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+
+        # shared instead of one per node, only the master client's endpoints are used
+        for option, factory in (('cache', ResponseCache), ('coalesce', RequestCoalescer),
+                                ('adaptive_pages', PageSizeTuner), ('metrics', MetricsCollector),
+                                ('circuit_breaker', CircuitBreaker), ('hedge', HedgePolicy)):
+            if client_options.get(option) is True:
+                client_options[option] = factory()
+        if isinstance(client_options.get('rate_limit'), (int, float)):
+            client_options['rate_limit'] = RateLimiter(client_options['rate_limit'])
+
+        client_options['lazy'] = True
+        self.nodes: List[ManagerNode] = [
+            ManagerNode(url, WazuhClient(url, username, password, **client_options), master=url == master)
+            for url in urls]
+        self.master = next(node for node in self.nodes if node.master)
+        self.breaker = self.master.client.breaker
+        self._options = dict(self.master.client._options, router=self)
+
+    @cached_property
+    def groups(self) -> WazuhGroups:
+        return WazuhGroups(**self._options)
+
+    @cached_property
+    def agents(self) -> WazuhAgents:
+        return WazuhAgents(**self._options)
+
+    @cached_property
+    def syscol(self) -> WazuhSyscollector:
+        return WazuhSyscollector(**self._options)
+
+    @cached_property
+    def vulns(self) -> WazuhVulnerability:
+        return WazuhVulnerability(**self._options)
+
+    @property
+    def metrics(self):
+        return self.master.client.metrics
+
+    def request(self, http_method: str, path: str, avoid: List[str] = None, deadline: Deadline = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request to the node chosen for its method, failing over to the other nodes on connection errors
+
+        :param http_method: HTTP method
+        :param path: Path relative to the API URL, for example /agents
+        :param avoid: URLs of nodes a read is only sent to when no other node is healthy, the URL of the chosen
+            node is appended to it. Copies of a hedged request share the list
+        :param deadline: Time budget of the request, the timeout of every node tried is capped to what is left
+        :param kwargs: Arguments of requests.Session.request
+        :return: Response object
+        """
+        read = http_method == 'GET'
+        timeout = kwargs.pop('timeout', None)
+        tried: Set[ManagerNode] = set()
+        while True:
+            node_timeout = deadline.cap(timeout) if deadline is not None else timeout
+            node = self._acquire(read, tried, avoid, path)
+            key = circuit_key(node.url, path) if self.breaker is not None else None
+            try:
+                if key is not None:
+                    self.breaker.before(key)
+                start = time.perf_counter()
+                response = node.client.session.request(method=http_method, url=f'{node.url}{path}',
+                                                       timeout=node_timeout, **kwargs)
+            except ReadTimeout:
+                # a slow node is not down, it still counts against its circuit
+                self._record(key, True, start)
+                raise
+            except (ConnectionError, ConnectTimeout) as err:
+                self._record(key, True, start)
+                self._mark_down(node)
+                tried.add(node)
+                # a write is only resent when it cannot have reached the manager
+                if not (read or _not_sent(err)) or len(tried) == len(self.nodes):
+                    raise
+            else:
+                self._record(key, response.status_code >= 500 or response.status_code == 429, start)
+                return response
+            finally:
+                self._release(node)
+
+    def _acquire(self, read: bool, tried: Set[ManagerNode], avoid: List[str] = None, path: str = '') -> ManagerNode:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [node for node in self.nodes if node not in tried]
+            healthy = [node for node in candidates if node.healthy(now)]
+            if read and self.breaker is not None:
+                # when every circuit is open, the chosen node raises CircuitOpenError
+                healthy = [node for node in healthy if self.breaker.allows(circuit_key(node.url, path))] or healthy
+            if read and avoid:
+                healthy = [node for node in healthy if node.url not in avoid] or healthy
+            if not read and self.master in healthy:
+                node = self.master
+            elif healthy:
+                node = min(healthy, key=lambda n: (n.outstanding, n.requests))
+            else:
+                # every node left is cooling down, try the one that failed first
+                node = min(candidates, key=lambda n: n.down_until)
+            node.outstanding += 1
+            node.requests += 1
+            if avoid is not None:
+                avoid.append(node.url)
+            return node
+
+    def _record(self, key: Optional[str], failed: bool, start: float):
+        if key is not None:
+            self.breaker.record(key, failed, time.perf_counter() - start)
+
+    def _release(self, node: ManagerNode):
+        with self._lock:
+            node.outstanding -= 1
+
+    def _mark_down(self, node: ManagerNode):
+        with self._lock:
+            node.failures += 1
+            node.down_until = time.monotonic() + self.cooldown
+
+    def node(self, url: str) -> Optional[ManagerNode]:
+        return next((node for node in self.nodes if node.url == url), None)
+
+
+def _not_sent(err: Exception) -> bool:
+    """Whether the request failed before a connection was opened"""
+    if isinstance(err, ConnectTimeout):
+        return True
+    reason = getattr(err.args[0], 'reason', None) if err.args else None
+    # NewConnectionError is a ConnectTimeoutError
+    return isinstance(reason, ConnectTimeoutError)
@@ -0,0 +1,184 @@
+import copy
+import re
+
+from functools import reduce
+from typing import Any, Iterable, Tuple, Type, Union
+
+from .models import Record
+
+
+# WQL separators and grouping characters, the API rejects them inside values
+_RESERVED = re.compile(r'[;,()]')
+
+
+class Query:
+    """
+    Composable WQL filter with an optional field projection, passed as the query argument of the endpoint
+    methods. Conditions are built from fields, e.g. (F.os.platform == 'ubuntu') & (F.status != 'disconnected'),
+    and combined with & (AND, ';') and | (OR, ','). The filter is sent as q and the projection as select,
+    unless the call gives its own select. Queries are immutable and compiled to WQL once.
+    """
+    __slots__ = ('fields', '_wql')
+
+    def __init__(self, fields: Tuple[str, ...] = ()):
+        self.fields = fields
+        self._wql = None
+
+    @property
+    def wql(self) -> str:
+        if self._wql is None:
+            self._wql = self._compile()
+        return self._wql
+
+    def _compile(self) -> str:
+        return ''
+
+    def __str__(self) -> str:
+        return self.wql
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.wql!r}, fields={self.fields!r})'
+
+    def __and__(self, other: 'Query') -> 'Query':
+        return self._combine(';', other)
+
+    def __or__(self, other: 'Query') -> 'Query':
+        return self._combine(',', other)
+
+    def _combine(self, op: str, other: 'Query') -> 'Query':
+        if not isinstance(other, Query):
+            return NotImplemented
+        return _Group(op, (self, other), _merge(self.fields, other.fields))
+
+    def select(self, *fields: Union[str, 'Field', Type[Record]]) -> 'Query':
+        """
+        Return a copy of the query projecting the given fields
+
+        :param fields: API field names, Field objects, or Record classes whose fields are all selected,
+            for example query.select(Agent) or query.select('id', F.os.platform)
+        """
+        selected = []
+        for field in fields:
+            if isinstance(field, type) and issubclass(field, Record):
+                selected.extend(field.select_fields())
+            else:
+                selected.append(str(field))
+
+        query = copy.copy(self)
+        query.fields = _merge(self.fields, selected)
+        return query
+
+
+class _Condition(Query):
+    __slots__ = ('path', 'op', 'value')
+
+    def __init__(self, path: str, op: str, value: Any):
+        super().__init__()
+        self.path = path
+        self.op = op
+        self.value = _format(value)
+
+    def _compile(self) -> str:
+        # WQL has no <= or >=
+        if self.op in ('<=', '>='):
+            return f'({self.path}{self.op[0]}{self.value},{self.path}={self.value})'
+        return f'{self.path}{self.op}{self.value}'
+
+
+class _Group(Query):
+    __slots__ = ('op', 'terms')
+
+    def __init__(self, op: str, terms: Tuple[Query, ...], fields: Tuple[str, ...] = ()):
+        super().__init__(fields)
+        self.op = op
+        # a & b & c is kept flat, a mix of & and | is parenthesized
+        self.terms = tuple(part for term in terms
+                           for part in (term.terms if isinstance(term, _Group) and term.op == op else (term,)))
+
+    def _compile(self) -> str:
+        parts = []
+        for term in self.terms:
+            wql = term.wql
+            if not wql:
+                continue
+            if isinstance(term, _Group) and len(term.terms) > 1:
+                wql = f'({wql})'
+            parts.append(wql)
+        return self.op.join(parts)
+
+
+class Field:
+    """
+    Reference to an API field in a Query. Nested fields are reached by attribute access, F.os.platform
+    is the os.platform field, or given as a dotted path: Field('os.platform')
+    """
+    __slots__ = ('_path',)
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def __getattr__(self, attr: str) -> 'Field':
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return Field(f'{self._path}.{attr}')
+
+    def __str__(self) -> str:
+        return self._path
+
+    def __repr__(self) -> str:
+        return f'Field({self._path!r})'
+
+    def __eq__(self, value) -> Query:
+        return _Condition(self._path, '=', value)
+
+    def __ne__(self, value) -> Query:
+        return _Condition(self._path, '!=', value)
+
+    def __lt__(self, value) -> Query:
+        return _Condition(self._path, '<', value)
+
+    def __gt__(self, value) -> Query:
+        return _Condition(self._path, '>', value)
+
+    def __le__(self, value) -> Query:
+        return _Condition(self._path, '<=', value)
+
+    def __ge__(self, value) -> Query:
+        return _Condition(self._path, '>=', value)
+
+    __hash__ = None
+
+    def like(self, value) -> Query:
+        """Field contains value"""
+        return _Condition(self._path, '~', value)
+
+    def isin(self, values: Iterable) -> Query:
+        """Field equals any of the values, which may not be empty: no filter would match every item"""
+        conditions = [self == value for value in values]
+        if not conditions:
+            raise ValueError(f'{self._path}.isin() needs at least one value')
+        return reduce(lambda query, condition: query | condition, conditions)
+
+
+class _Fields:
+    def __getattr__(self, attr: str) -> Field:
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return Field(attr)
+
+
+# field factory: F.status, F.os.platform, ...
+F = _Fields()
+
+
+def _format(value: Any) -> str:
+    if isinstance(value, bool):
+        value = str(value).lower()
+    value = str(value)
+    if _RESERVED.search(value):
+        raise ValueError(f'WQL values cannot contain ; , ( or ): {value!r}')
+    return value
+
+
+def _merge(fields: Iterable[str], more: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys((*fields, *more)))
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from .deadline import Deadline, DeadlineExceeded
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every endpoint of a client, keeping the request rate under the
+    manager's max_request_per_minute. Tokens are refilled continuously at `rate` per `per` seconds, up
+    to `burst`. A 429 answer pauses every caller until the Retry-After delay, or an exponential backoff
+    when the header is missing, has elapsed.
+    """
+    def __init__(self, rate: float = 300, per: float = 60, burst: int = None, max_retries: int = 5,
+                 max_backoff: float = 60):
+        """
+        :param rate: Number of requests allowed per period, match the API's max_request_per_minute
+        :param per: Period in seconds (Default: 60)
+        :param burst: Number of requests that can be sent at once after an idle period. 10% of rate if not specified
+        :param max_retries: Number of times a request answered with 429 is sent again
+        :param max_backoff: Longest pause in seconds after a 429 without a Retry-After header
+        """
+        self.rate = rate / per
+        self.burst = burst or max(1, int(rate // 10))
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.throttled = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token if one is available and return 0, otherwise return the time to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, deadline: Deadline = None):
+        """Block until a request may be sent, raises DeadlineExceeded at once if that is after the deadline"""
+        while (delay := self._reserve()) > 0:
+            _check(deadline, delay)
+            time.sleep(delay)
+
+    async def acquire_async(self, deadline: Deadline = None):
+        while (delay := self._reserve()) > 0:
+            _check(deadline, delay)
+            await asyncio.sleep(delay)
+
+    def throttle(self, retry_after: Optional[str] = None, attempt: int = 1):
+        """
+        Pause every caller after a 429
+
+        :param retry_after: Value of the Retry-After header, in seconds or as an HTTP date
+        :param attempt: Number of consecutive 429 answers to the same request, drives the backoff
+        """
+        delay = _parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(self.max_backoff, 2 ** (attempt - 1))
+
+        with self._lock:
+            self.throttled += 1
+            self._tokens = 0
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+
+def _check(deadline: Optional[Deadline], delay: float):
+    if deadline is not None and delay >= deadline.remaining():
+        raise DeadlineExceeded(f'deadline exceeded, the rate limit allows the next request in {delay:.1f}s')
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+class BulkFailure(NamedTuple):
+    """An item a bulk operation could not process, with the Wazuh error code when the manager reported one"""
+    id: str
+    message: str
+    code: Optional[int] = None
+
+
+@dataclass
+class BulkResult:
+    """
+    Outcome of a bulk operation spread over several API calls. affected_items and failed_items of every
+    response are merged, and calls that failed as a whole are reported as one failure per item they carried.
+    """
+    affected_items: List[Any] = field(default_factory=list)
+    failed_items: List[BulkFailure] = field(default_factory=list)
+    calls: int = 0
+
+    @property
+    def total_affected_items(self) -> int:
+        return len(self.affected_items)
+
+    @property
+    def total_failed_items(self) -> int:
+        return len(self.failed_items)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed_items
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        """Error message per failed item ID"""
+        return {failure.id: failure.message for failure in self.failed_items}
+
+    def merge(self, data: Dict, item: Dict = None):
+        """
+        Merge the data field of a response
+
+        :param data: data of the response, either an affected_items/failed_items envelope or a single item
+        :param item: Fields added to a single item, for example the name of an added agent
+        """
+        self.calls += 1
+        if 'affected_items' not in data:
+            self.affected_items.append({**(item or {}), **data})
+            return
+
+        self.affected_items.extend(data.get('affected_items', []))
+        for failed in data.get('failed_items', []):
+            error = failed.get('error', {})
+            for item_id in failed.get('id', []):
+                self.failed_items.append(BulkFailure(str(item_id), error.get('message', ''), error.get('code')))
+
+    def fail(self, ids: Iterable[str], error: Exception):
+        """Record a call that raised, for every item it carried"""
+        self.calls += 1
+        message, code = str(error), None
+
+        response = getattr(error, 'response', None)
+        if response is not None:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+            message = body.get('detail') or body.get('title') or message
+            code = body.get('error')
+
+        self.failed_items.extend(BulkFailure(str(item_id), message, code) for item_id in ids)
@@ -0,0 +1,151 @@
+import codecs
+import json
+
+from typing import Any, Callable, Dict, Iterator
+
+import requests
+
+
+_WHITESPACE = ' \t\n\r'
+
+
+class AffectedItemsStream:
+    """
+    Iterator over data.affected_items of a response requested with stream=True. The body is read from
+    the socket in chunks and decoded one item at a time, so peak memory is bounded by the largest item
+    rather than by the whole response. The remaining fields of data (total_affected_items, failed_items,
+    ...) are available in `data` once the items have been consumed. Only the envelope is walked
+    structurally, items and other values are decoded with the standard json decoder.
+    """
+    def __init__(self, response: requests.Response, chunk_size: int = 65536, factory: Callable = None):
+        """
+        :param response: Response of a request sent with stream=True
+        :param chunk_size: Number of bytes read from the socket at a time
+        :param factory: Callable applied to every item, for example a model's from_dict
+        """
+        self.response = response
+        self.factory = factory
+        self.data: Dict[str, Any] = {}
+        self.envelope: Dict[str, Any] = {}
+        self._chunks = response.iter_content(chunk_size=chunk_size)
+        self._decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._items = self._parse()
+
+    @property
+    def total_affected_items(self) -> int:
+        return self.data.get('total_affected_items', 0)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self
+
+    def __next__(self) -> Dict:
+        return next(self._items)
+
+    def close(self):
+        self._items.close()
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _parse(self) -> Iterator[Dict]:
+        try:
+            self._expect('{')
+            for key in self._keys():
+                if key == 'data' and self._peek() == '{':
+                    self._pos += 1
+                    for data_key in self._keys():
+                        if data_key == 'affected_items' and self._peek() == '[':
+                            self._pos += 1
+                            if self.factory is None:
+                                yield from self._array()
+                            else:
+                                yield from map(self.factory, self._array())
+                        else:
+                            self.data[data_key] = self._value()
+                else:
+                    self.envelope[key] = self._value()
+        finally:
+            self.response.close()
+
+    def _keys(self) -> Iterator[str]:
+        """Walk the members of the object whose opening brace was consumed, yielding each key"""
+        first = True
+        while True:
+            char = self._skip_whitespace()
+            if char == '}':
+                self._pos += 1
+                return
+            if not first:
+                self._expect(',')
+            first = False
+
+            key = self._value()
+            self._expect(':')
+            self._skip_whitespace()
+            yield key
+
+    def _array(self) -> Iterator[Any]:
+        first = True
+        while True:
+            char = self._skip_whitespace()
+            if char == ']':
+                self._pos += 1
+                return
+            if not first:
+                self._expect(',')
+            first = False
+            yield self._value()
+
+    def _value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+                # a number ending with the buffer may continue in the next chunk
+                if end < len(self._buffer) or self._eof or type(value) not in (int, float):
+                    self._pos = end
+                    self._compact()
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+    def _fill(self):
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._buffer += self._decoder.decode(b'', final=True)
+            self._eof = True
+        else:
+            self._buffer += self._decoder.decode(chunk)
+
+    def _compact(self):
+        if self._pos > 65536:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+    def _peek(self) -> str:
+        while self._pos >= len(self._buffer) and not self._eof:
+            self._fill()
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else ''
+
+    def _skip_whitespace(self) -> str:
+        char = self._peek()
+        while char and char in _WHITESPACE:
+            self._pos += 1
+            char = self._peek()
+        return char
+
+    def _expect(self, expected: str):
+        char = self._skip_whitespace()
+        if char != expected:
+            raise json.JSONDecodeError(f'Expecting {expected!r}', self._buffer, self._pos)
+        self._pos += 1
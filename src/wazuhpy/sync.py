@@ -0,0 +1,92 @@
+import json
+import os
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple
+
+from .endpoints.groups import WazuhGroups
+
+
+class GroupSyncResult(NamedTuple):
+    """Group names whose local configuration was created, refreshed or dropped by a sync"""
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+
+
+class GroupConfigSync:
+    """
+    Local copy of every group's configuration (/groups/{group}/configuration) kept up to date through
+    the configuration checksums returned by groups.get. A sync costs one paginated groups.get call plus
+    one configuration download per group whose checksum changed since the previous sync.
+    """
+    def __init__(self, groups: WazuhGroups, path: str = None, hash_algorithm: str = 'md5'):
+        """
+        :param groups: Groups endpoint, for example client.groups
+        :param path: JSON file persisting checksums and configurations between runs
+        :param hash_algorithm: Algorithm the manager uses to compute configSum
+        """
+        self.groups = groups
+        self.path = path
+        self.hash_algorithm = hash_algorithm
+        self.checksums: Dict[str, str] = {}
+        self.configs: Dict[str, List[Dict]] = {}
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def sync(self, concurrency: int = 4) -> GroupSyncResult:
+        """
+        Download the configuration of new groups and of groups whose configSum changed, and forget
+        deleted groups. If a download fails, the other groups are still updated and saved before the
+        error is raised, the failed group is retried on the next sync.
+
+        :param concurrency: Number of configurations downloaded in parallel
+        :return: GroupSyncResult(added, changed, removed)
+        """
+        remote = {group['name']: group.get('configSum')
+                  for group in self.groups.iter_get(hash=self.hash_algorithm, select='name,configSum')}
+
+        removed = sorted(set(self.checksums) - set(remote))
+        for name in removed:
+            self.checksums.pop(name, None)
+            self.configs.pop(name, None)
+
+        stale = sorted(name for name, checksum in remote.items() if self.checksums.get(name) != checksum)
+        added = [name for name in stale if name not in self.checksums]
+        changed = [name for name in stale if name in self.checksums]
+
+        error = None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(self._download, name): name for name in stale}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    self.configs[name] = future.result()
+                except Exception as err:
+                    error = error or err
+                    continue
+                self.checksums[name] = remote[name]
+
+        if self.path is not None:
+            self.save()
+        if error is not None:
+            raise error
+
+        return GroupSyncResult(added, changed, removed)
+
+    def _download(self, name: str) -> List[Dict]:
+        # never serve a configuration from the response cache, its checksum says it changed
+        return list(self.groups.iter_config(name, cache_ttl=None))
+
+    def load(self):
+        with open(self.path, 'r') as f:
+            state = json.load(f)
+        self.checksums = state.get('checksums', {})
+        self.configs = state.get('configs', {})
+
+    def save(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'checksums': self.checksums, 'configs': self.configs}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,53 @@
+import threading
+
+from typing import Dict, Hashable, Optional
+
+
+class PageSizeTuner:
+    """
+    Remembers a page size per paginated method and adjusts it from the latency and payload size of
+    full pages, aiming at `target` seconds per page. A page that took half the target doubles the next
+    one, a page that took twice the target halves it, within [min_size, max_size]. Short pages, such as
+    the last page of a collection, say nothing about a full page and are ignored.
+    """
+    def __init__(self, target: float = 1.0, initial: int = 500, min_size: int = 50, max_size: int = 10000,
+                 max_bytes: int = 16 * 1024 * 1024):
+        """
+        :param target: Page time in seconds to aim for
+        :param initial: Page size used the first time a method is paginated
+        :param min_size: Smallest page size
+        :param max_size: Largest page size. The API accepts up to 100000 but recommends staying near 500
+        :param max_bytes: Largest response body, pages are shrunk to stay under it whatever their latency
+        """
+        self.target = target
+        self.initial = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def size(self, key: Hashable) -> int:
+        return self.sizes.get(key, self.initial)
+
+    def observe(self, key: Hashable, limit: int, count: int, elapsed: float, size: Optional[int] = None) -> int:
+        """
+        Record a page and return the page size to use next
+
+        :param key: Paginated method, see BaseEndpoint._tune_key
+        :param limit: Page size that was requested
+        :param count: Number of items returned
+        :param elapsed: Seconds taken by the request
+        :param size: Body size in bytes, when known
+        """
+        if count < limit or elapsed <= 0:
+            return self.size(key)
+
+        # at most double or halve per page, a single slow or fast outlier must not swing the size
+        factor = min(2.0, max(0.5, self.target / elapsed))
+        if size:
+            factor = min(factor, self.max_bytes / size)
+
+        with self._lock:
+            self.sizes[key] = min(self.max_size, max(self.min_size, int(limit * factor)))
+            return self.sizes[key]
@@ -0,0 +1,190 @@
+import json
+import os
+import sys
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .endpoints.agents import WazuhAgents
+from .endpoints.vulnerability import WazuhVulnerability
+
+
+class VulnIndexRefreshResult(NamedTuple):
+    """Agent IDs whose vulnerabilities were crawled, left untouched because no scan ran since, or dropped"""
+    crawled: List[str]
+    unchanged: List[str]
+    removed: List[str]
+
+
+class VulnerabilityIndex:
+    """
+    Fleet-wide inverted index of vulnerabilities, answering which agents are affected by a CVE, a
+    vulnerable package or a severity without querying every agent. A refresh lists the agent IDs,
+    asks each agent for its last scan times and only crawls /vulnerability/{agent_id} for agents
+    scanned since the previous refresh, on a bounded thread pool.
+    """
+    # fields kept per vulnerability, requested with select to keep crawled pages small
+    FIELDS = ('cve', 'name', 'severity')
+
+    def __init__(self, agents: WazuhAgents, vulns: WazuhVulnerability, path: str = None):
+        """
+        :param agents: Agents endpoint, for example client.agents
+        :param vulns: Vulnerability endpoint, for example client.vulns
+        :param path: JSON file persisting the index between runs
+        """
+        self.agents = agents
+        self.vulns = vulns
+        self.path = path
+        self.scans: Dict[str, Optional[str]] = {}
+        self.entries: Dict[str, List[Tuple[str, str, str]]] = {}
+        self.by_cve: Dict[str, Set[str]] = {}
+        self.by_package: Dict[str, Set[str]] = {}
+        self.by_severity: Dict[str, Set[str]] = {}
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def refresh(self, concurrency: int = 8, page_size: int = 500) -> VulnIndexRefreshResult:
+        """
+        Bring the index up to date. Agents deleted from the manager are dropped, agents whose last
+        vulnerability scan changed are crawled again. If a crawl fails, the other agents are still
+        indexed and saved before the error is raised, the failed agent is crawled on the next refresh.
+
+        :param concurrency: Number of agents queried in parallel
+        :param page_size: Number of vulnerabilities requested per page
+        :return: VulnIndexRefreshResult(crawled, unchanged, removed)
+        """
+        agent_ids = [agent['id'] for agent in self.agents.iter_list(select=['id'], models=False)]
+
+        removed = sorted(set(self.entries) - set(agent_ids))
+        for agent_id in removed:
+            self._unindex(agent_id)
+            self.scans.pop(agent_id, None)
+
+        crawled, unchanged = [], []
+        error = None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(self._refresh_agent, agent_id, page_size): agent_id for agent_id in agent_ids}
+            for future in as_completed(futures):
+                agent_id = futures[future]
+                try:
+                    scan, entries = future.result()
+                except Exception as err:
+                    error = error or err
+                    continue
+
+                if entries is None:
+                    unchanged.append(agent_id)
+                    continue
+
+                self._unindex(agent_id)
+                self._index(agent_id, entries)
+                self.scans[agent_id] = scan
+                crawled.append(agent_id)
+
+        if self.path is not None:
+            self.save()
+        if error is not None:
+            raise error
+
+        return VulnIndexRefreshResult(sorted(crawled), sorted(unchanged), removed)
+
+    def _refresh_agent(self, agent_id: str, page_size: int) -> tuple:
+        """Last scan marker of an agent and its vulnerabilities, or None if no scan ran since the last crawl"""
+        scan = self._last_scan(agent_id)
+        if scan is not None and agent_id in self.entries and self.scans.get(agent_id) == scan:
+            return scan, None
+
+        entries = [tuple(sys.intern(str(item.get(field) or '')) for field in self.FIELDS)
+                   for item in self.vulns.iter_get(agent_id, select=list(self.FIELDS), page_size=page_size,
+                                                   models=False)]
+        return scan, entries
+
+    def _last_scan(self, agent_id: str) -> Optional[str]:
+        items = self.vulns.last_scan(agent_id, models=False).json().get('data', {}).get('affected_items', [])
+        if not items:
+            return None
+        return f"{items[0].get('last_full_scan')}|{items[0].get('last_partial_scan')}"
+
+    def _index(self, agent_id: str, entries: List[Tuple[str, str, str]]):
+        self.entries[agent_id] = entries
+        for cve, package, severity in entries:
+            self.by_cve.setdefault(cve, set()).add(agent_id)
+            self.by_package.setdefault(package, set()).add(agent_id)
+            self.by_severity.setdefault(severity.lower(), set()).add(agent_id)
+
+    def _unindex(self, agent_id: str):
+        for cve, package, severity in self.entries.pop(agent_id, ()):
+            for index, key in ((self.by_cve, cve), (self.by_package, package), (self.by_severity, severity.lower())):
+                agents = index.get(key)
+                if agents is not None:
+                    agents.discard(agent_id)
+                    if not agents:
+                        del index[key]
+
+    def agents_with_cve(self, cve: str) -> Set[str]:
+        return set(self.by_cve.get(cve, ()))
+
+    def agents_with_package(self, package: str) -> Set[str]:
+        return set(self.by_package.get(package, ()))
+
+    def agents_with_severity(self, severity: str) -> Set[str]:
+        return set(self.by_severity.get(severity.lower(), ()))
+
+    def search(self, cve: str = None, package: str = None, severity: str = None) -> Set[str]:
+        """
+        Agents matching every given criterion on a single vulnerability, for example the agents where
+        the openssl package is affected by a critical CVE
+
+        :return: Set of agent IDs
+        """
+        severity = severity.lower() if severity is not None else None
+        candidates = None
+        for index, key in ((self.by_cve, cve), (self.by_package, package), (self.by_severity, severity)):
+            if key is not None:
+                agents = index.get(key, set())
+                candidates = set(agents) if candidates is None else candidates & agents
+        if candidates is None:
+            return set(self.entries)
+
+        return {agent_id for agent_id in candidates
+                if any(self._matches(entry, cve, package, severity) for entry in self.entries[agent_id])}
+
+    @staticmethod
+    def _matches(entry: Tuple[str, str, str], cve: str, package: str, severity: str) -> bool:
+        return ((cve is None or entry[0] == cve) and (package is None or entry[1] == package)
+                and (severity is None or entry[2].lower() == severity))
+
+    def cves(self, agent_id: str) -> Set[str]:
+        return {cve for cve, _, _ in self.entries.get(agent_id, ())}
+
+    def counts(self, by: str = 'severity') -> Dict[str, int]:
+        """Number of affected agents per CVE, package or severity"""
+        indexes = {'cve': self.by_cve, 'package': self.by_package, 'severity': self.by_severity}
+        if by not in indexes:
+            raise ValueError(f'Unknown index: {by}, expected one of {", ".join(indexes)}')
+        index = indexes[by]
+        return {key: len(agents) for key, agents in index.items()}
+
+    def load(self):
+        with open(self.path, 'r') as f:
+            state = json.load(f)
+        self.scans = state.get('scans', {})
+        self.entries, self.by_cve, self.by_package, self.by_severity = {}, {}, {}, {}
+        for agent_id, entries in state.get('agents', {}).items():
+            self._index(agent_id, [tuple(sys.intern(value) for value in entry) for entry in entries])
+
+    def save(self):
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'scans': self.scans, 'agents': self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, agent_id: str):
+        return agent_id in self.entries
+
+    def __iter__(self) -> Iterable[str]:
+        return iter(self.entries)
@@ -1,47 +1,152 @@
-import json
 import requests
+from functools import cached_property
+from typing import Tuple, Union
+from requests.adapters import HTTPAdapter, Retry
 from requests.auth import HTTPBasicAuth
-from requests.exceptions import HTTPError
 
+from .auth import TokenCache, WazuhTokenAuth
+from .breaker import CircuitBreaker
+from .deadline import DEFAULT_TIMEOUT
+from .cache import ResponseCache
+from .coalesce import RequestCoalescer
+from .hedge import HedgePolicy
+from .metrics import MetricsCollector, MetricsHook, instrument_adapter
+from .ratelimit import RateLimiter
+from .tuning import PageSizeTuner
 from .endpoints.groups import WazuhGroups
 from .endpoints.agents import WazuhAgents
 from .endpoints.syscollector import WazuhSyscollector
 from .endpoints.vulnerability import WazuhVulnerability
+from .vulnindex import VulnerabilityIndex
 
 class WazuhClient:
-    def __init__(self, url: str = None, username: str = None, password: str = None, verify_ssl: bool = False):
+    def __init__(self, url: str = None, username: str = None, password: str = None, verify_ssl: bool = False,
+                 token_refresh_margin: int = 60, retry: Union[bool, Retry, None] = None,
+                 pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False,
+                 cache: Union[bool, ResponseCache] = False, models: bool = False,
+                 coalesce: Union[bool, RequestCoalescer] = False, rate_limit: Union[float, RateLimiter, None] = None,
+                 adaptive_pages: Union[bool, PageSizeTuner] = False, metrics: Union[bool, MetricsHook] = False,
+                 lazy: bool = False, token_cache: str = None, circuit_breaker: Union[bool, CircuitBreaker] = False,
+                 timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+                 hedge: Union[bool, HedgePolicy] = False):
+        """
+        :param url: Base URL of the Wazuh API, for example https://wazuh:55000
+        :param username: API user
+        :param password: API password
+        :param verify_ssl: Verify the manager's TLS certificate
+        :param token_refresh_margin: Seconds before the token expiry at which it is refreshed
+        :param retry: Default retry policy of every endpoint, can be bool or an instance of Retry.
+            Override it per endpoint with e.g. client.syscol.retry, or per call with the retry argument
+        :param pool_connections: Number of connection pools to cache
+        :param pool_maxsize: Maximum number of connections kept per pool. Size it to the number of
+            threads issuing requests concurrently
+        :param pool_block: Block when no free connection is available instead of opening an extra one
+        :param cache: Cache responses of read-mostly endpoints in memory. True for a default ResponseCache,
+            or a ResponseCache instance. Time-to-live per method is set in each endpoint's cache_ttls
+        :param models: Return slotted records (wazuhpy.models) instead of Response objects from the
+            collection methods that have a model, e.g. agents.list returns a RecordPage of Agent
+        :param coalesce: Send a single request for identical GETs issued concurrently by several threads, every
+            caller receives the shared response. True for a new RequestCoalescer, or an instance to share
+        :param rate_limit: Requests per minute allowed by the manager's max_request_per_minute, or a RateLimiter
+            for a custom burst. Requests of every endpoint and thread draw from the same budget and a 429 pauses
+            them all for the Retry-After delay
+        :param adaptive_pages: Tune the page size of iter_* methods called without page_size towards a target
+            page time, per method, for the lifetime of the client. True for a default PageSizeTuner
+        :param metrics: Callable receiving a RequestMetric after every request. True for a MetricsCollector,
+            which exposes latency percentiles per endpoint and a Prometheus exporter
+        :param lazy: Authenticate on the first request instead of in the constructor, so that creating a client
+            never waits on the manager. Off by default so that wrong credentials or an unreachable manager still
+            fail in the constructor, as they always did; AsyncWazuhClient and WazuhClientPool are always lazy
+        :param token_cache: JSON file keeping the token between runs. A still valid token saved by a previous
+            process is used instead of authenticating, which saves a round-trip to short-lived scripts
+        :param circuit_breaker: Fail requests at once with CircuitOpenError while an endpoint family of the manager
+            keeps failing or answering slowly, instead of queueing behind timeouts. Responses of cached methods are
+            served from the cache meanwhile, for up to the cache's stale_ttl after they expired. True for a default
+            CircuitBreaker, or an instance for custom thresholds
+        :param timeout: Connect and read timeouts in seconds of every request, a number or a (connect, read) tuple.
+            None waits forever. Bound the total time of a block of calls with a wazuhpy.Deadline
+        :param hedge: Send a second copy of GETs slower than the 95th percentile of their endpoint's recent
+            latencies and use the first response, for at most 5% extra requests. True for a default HedgePolicy,
+            or an instance for another percentile or budget
+        """
         self.base_url = url
         self.verify_ssl = verify_ssl
+        self.token_refresh_margin = token_refresh_margin
+        self.timeout = timeout
+        self.retry = retry
+        self.cache = ResponseCache() if cache is True else cache if cache is not False else None
+        self.models = models
+        self.coalescer = RequestCoalescer() if coalesce is True else coalesce or None
+        self.rate_limiter = RateLimiter(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+        self.page_tuner = PageSizeTuner() if adaptive_pages is True else adaptive_pages or None
+        self.metrics = MetricsCollector() if metrics is True else metrics or None
+        self.breaker = CircuitBreaker() if circuit_breaker is True else circuit_breaker or None
+        self.hedge = HedgePolicy() if hedge is True else hedge or None
+        self.token_cache = TokenCache(token_cache) if token_cache is not None else None
+        self.auth = None
 
         if not verify_ssl:
             requests.packages.urllib3.disable_warnings()
 
         self.session = requests.Session()
 
+        # mounted once, every endpoint shares its connection pool
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        if self.metrics is not None:
+            instrument_adapter(adapter)
+
         if username is not None and password is not None:
             _credentials = HTTPBasicAuth(username, password)
-            self.authenticate(_credentials)
+            self.authenticate(_credentials, lazy=lazy)
+
+        # endpoints are created on first access
+        self._options = dict(url=self.base_url, session=self.session, verify_ssl=self.verify_ssl,
+                             retry=self.retry, cache=self.cache, models=self.models,
+                             coalescer=self.coalescer, rate_limiter=self.rate_limiter, page_tuner=self.page_tuner,
+                             metrics=self.metrics, breaker=self.breaker, timeout=self.timeout, hedge=self.hedge)
+
+    @cached_property
+    def groups(self) -> WazuhGroups:
+        return WazuhGroups(**self._options)
+
+    @cached_property
+    def agents(self) -> WazuhAgents:
+        return WazuhAgents(**self._options)
 
-        # initialize endpoints
-        self.groups = WazuhGroups(url=self.base_url, session=self.session, verify_ssl=self.verify_ssl)
-        self.agents = WazuhAgents(url=self.base_url, session=self.session, verify_ssl=self.verify_ssl)
-        self.syscol = WazuhSyscollector(url=self.base_url, session=self.session, verify_ssl=self.verify_ssl)
-        self.vulns = WazuhVulnerability(url=self.base_url, session=self.session, verify_ssl=self.verify_ssl)
+    @cached_property
+    def syscol(self) -> WazuhSyscollector:
+        return WazuhSyscollector(**self._options)
+
+    @cached_property
+    def vulns(self) -> WazuhVulnerability:
+        return WazuhVulnerability(**self._options)
 
     def _update_headers(self, headers: dict):
         return self.session.headers.update(headers)
 
-    def authenticate(self, credentials: HTTPBasicAuth):
-        endpoint = f'{self.base_url}/security/user/authenticate'
-        try:
-            response = self.session.get(url=endpoint, auth=credentials, verify=self.verify_ssl)
-            response.raise_for_status()
-
-            if response.status_code == 200:
-                json_response = json.loads(response.text)
-                if 'token' in json_response.get('data'):
-                    headers = {'Authorization': f'Bearer {json_response.get('data')['token']}',
-                               'Content-Type': 'application/json'}
-                    self._update_headers(headers)
-        except HTTPError as err:
-            raise
\ No newline at end of file
+    def authenticate(self, credentials: HTTPBasicAuth, lazy: bool = False):
+        """
+        Request a JWT and install it on the session. The token is refreshed shortly before it expires,
+        and once if the manager answers 401, so long running jobs keep working past the token lifetime
+
+        :param credentials: Basic auth credentials of the API user
+        :param lazy: Only request the token when the first request is sent
+        """
+        self.auth = WazuhTokenAuth(self.session, self.base_url, credentials, verify_ssl=self.verify_ssl,
+                                   refresh_margin=self.token_refresh_margin, token_cache=self.token_cache,
+                                   timeout=self.timeout)
+        self.session.auth = self.auth
+        self._update_headers({'Content-Type': 'application/json'})
+        if not lazy:
+            self.auth.refresh()
+
+    def vulnerability_index(self, path: str = None) -> VulnerabilityIndex:
+        """
+        Build a fleet-wide vulnerability index on this client's endpoints. Call refresh() on it to crawl
+
+        :param path: JSON file persisting the index between runs
+        :return: VulnerabilityIndex
+        """
+        return VulnerabilityIndex(self.agents, self.vulns, path=path)
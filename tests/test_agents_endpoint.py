@@ -267,3 +267,159 @@ class TestWazuhAgentsEndpoints:
 
         
 
+
+
+class TestWazuhAgentsBulk:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+        return _client
+
+    @responses.activate
+    def test_add_many_reports_registered_and_failed_agents(self, client):
+        for name, agent_id in (('web-01', '001'), ('web-02', '002')):
+            responses.add(
+                responses.POST,
+                url=f'{base_url}/agents',
+                json={'data': {'id': agent_id, 'key': 'key'}, 'error': 0},
+                match=[matchers.json_params_matcher({'name': name})],
+                status=200,
+            )
+        responses.add(
+            responses.POST,
+            url=f'{base_url}/agents',
+            json={'title': 'Bad Request', 'detail': 'Agent already exists', 'error': 1705},
+            match=[matchers.json_params_matcher({'name': 'web-03', 'ip': '10.0.0.3'})],
+            status=400,
+        )
+
+        result = client.agents.add_many(['web-01', 'web-02', ('web-03', '10.0.0.3')], concurrency=2)
+
+        assert sorted(item['name'] for item in result.affected_items) == ['web-01', 'web-02']
+        assert result.errors == {'web-03': 'Agent already exists'}
+        assert result.failed_items[0].code == 1705
+        assert result.calls == 3
+
+    @responses.activate
+    def test_assign_many_chunks_agents_and_merges_envelopes(self, client):
+        responses.add(
+            responses.PUT,
+            url=f'{base_url}/agents/group',
+            json={'data': {'affected_items': ['001', '002'], 'total_affected_items': 2,
+                           'failed_items': [], 'total_failed_items': 0}},
+            match=[matchers.query_param_matcher({'group_id': 'web', 'agents_list': '001,002'})],
+            status=200,
+        )
+        responses.add(
+            responses.PUT,
+            url=f'{base_url}/agents/group',
+            json={'data': {'affected_items': [], 'total_affected_items': 0, 'total_failed_items': 1,
+                           'failed_items': [{'error': {'code': 1701, 'message': 'Agent does not exist'},
+                                             'id': ['999']}]}},
+            match=[matchers.query_param_matcher({'group_id': 'web', 'agents_list': '999'})],
+            status=200,
+        )
+
+        result = client.agents.assign_many('web', ['001', '002', '999'], chunk_size=2)
+
+        assert sorted(result.affected_items) == ['001', '002']
+        assert result.failed_items == [('999', 'Agent does not exist', 1701)]
+        assert not result.ok
+
+    @responses.activate
+    def test_unassign_from_group_sends_agents_list(self, client):
+        responses.add(responses.DELETE, url=f'{base_url}/agents/group', json={}, status=200)
+
+        result = client.agents.unassign_from_group('web', ['001', '002'])
+
+        assert result.url == f'{base_url}/agents/group?group_id=web&agents_list=001%2C002'
+
+
+class TestWazuhAgentsSplitLists:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+        _client.agents.max_list_length = 12
+        return _client
+
+    @staticmethod
+    def agents_callback(request, missing=('005',)):
+        """Agents of agents_list except the missing ones, which do not exist, paginated with offset and limit"""
+        ids = request.params['agents_list'].split(',')
+        found = [agent_id for agent_id in ids if agent_id not in missing]
+        failed = [agent_id for agent_id in ids if agent_id in missing]
+        offset = int(request.params['offset'])
+        body = {'data': {'affected_items': [{'id': agent_id}
+                                            for agent_id in found[offset:offset + int(request.params['limit'])]],
+                         'total_affected_items': len(found),
+                         'failed_items': [{'error': {'code': 1701}, 'id': failed}] if failed else [],
+                         'total_failed_items': len(failed)},
+                'message': 'Some agents were not returned', 'error': 0}
+        return 200, {}, json.dumps(body)
+
+    @responses.activate
+    def test_list_splits_long_agents_list_and_merges_pages(self, client):
+        responses.add_callback(responses.GET, url=f'{base_url}/agents', callback=self.agents_callback)
+
+        result = client.agents.list(agents_list=[f'{i:03}' for i in range(1, 8)], offset=1, limit=4)
+        data = result.json()['data']
+
+        # one single-item request per chunk to learn its total, then the two chunks holding the window
+        assert len(responses.calls) == 5
+        assert [item['id'] for item in data['affected_items']] == ['002', '003', '004', '006']
+        assert data['total_affected_items'] == 6
+        assert data['total_failed_items'] == 1
+        assert result.json()['error'] == 2
+
+    @responses.activate
+    def test_paginating_a_split_list_only_reads_each_item_once(self, client):
+        responses.add_callback(responses.GET, url=f'{base_url}/agents', callback=self.agents_callback)
+        agent_ids = [f'{i:03}' for i in range(10, 22)]
+
+        items = list(client.agents.iter_list(agents_list=agent_ids, page_size=4))
+
+        assert [item['id'] for item in items] == agent_ids
+        # the totals of the 4 chunks are learnt on the first page, then every page spans 2 chunks
+        assert len(responses.calls) == 4 + 2 + 2 + 2
+        read = sum(len(json.loads(call.response.text)['data']['affected_items']) for call in responses.calls)
+        assert read == len(agent_ids) + 4
+
+    @responses.activate
+    def test_every_page_of_a_split_list_reports_the_failures_of_the_whole_list(self, client):
+        responses.add_callback(responses.GET, url=f'{base_url}/agents',
+                               callback=lambda request: self.agents_callback(request, missing=('003', '011')))
+        agent_ids = [f'{i:03}' for i in range(1, 13)]
+
+        pages = [client.agents.list(agents_list=agent_ids, offset=offset, limit=4).json()['data']
+                 for offset in (0, 4, 8)]
+
+        assert [page['total_affected_items'] for page in pages] == [10] * 3
+        assert [page['total_failed_items'] for page in pages] == [2] * 3
+        assert all(sorted(agent_id for item in page['failed_items'] for agent_id in item['id']) == ['003', '011']
+                   for page in pages)
+
+    def test_sort_is_rejected_with_a_split_list(self, client):
+        with pytest.raises(ValueError):
+            client.agents.list(agents_list=[f'{i:03}' for i in range(1, 8)], sort='+name')
+
+    @responses.activate
+    def test_short_agents_list_is_sent_once(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        client.agents.list(agents_list=['001', '002'])
+
+        assert len(responses.calls) == 1
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+import requests
+import responses
+from requests.adapters import Retry
+
+httpx = pytest.importorskip('httpx')
+
+from wazuhpy import AsyncWazuhClient, WazuhClient
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+def page(items, total):
+    return {'data': {'affected_items': items, 'total_affected_items': total,
+                     'total_failed_items': 0, 'failed_items': []}, 'error': 0}
+
+
+class MockWazuh:
+    """Minimal stand-in for the Wazuh API serving a list of agents"""
+    def __init__(self, agents):
+        self.agents = agents
+        self.requests = []
+
+    def __call__(self, request: httpx.Request):
+        self.requests.append(request)
+        if request.url.path == '/security/user/authenticate':
+            return httpx.Response(200, json={'data': {'token': 'secret123'}})
+
+        offset = int(request.url.params.get('offset', 0))
+        limit = int(request.url.params.get('limit', 500))
+        return httpx.Response(200, json=page(self.agents[offset:offset + limit], len(self.agents)))
+
+
+class TestAsyncWazuhClient:
+    @pytest.fixture()
+    def server(self):
+        return MockWazuh([{'id': f'{i:03}'} for i in range(7)])
+
+    @pytest.fixture()
+    def client(self, server):
+        return AsyncWazuhClient(base_url, 'johndoe', 'secret', transport=httpx.MockTransport(server))
+
+    def test_authenticates_on_first_request(self, client, server):
+        async def run():
+            async with client:
+                return await client.agents.list(agents_list=['001', '003'])
+
+        result = asyncio.run(run())
+
+        assert server.requests[0].url.path == '/security/user/authenticate'
+        assert server.requests[1].headers['Authorization'] == 'Bearer secret123'
+        assert str(result.url) == f'{base_url}/agents?offset=0&limit=500&agents_list=001%2C003'
+
+    def test_add_sends_json_payload(self, client, server):
+        async def run():
+            async with client:
+                return await client.agents.add(agent_name='NewAgentOne')
+
+        asyncio.run(run())
+
+        assert server.requests[-1].method == 'POST'
+        assert json.loads(server.requests[-1].content) == {'name': 'NewAgentOne'}
+
+    @pytest.mark.parametrize('concurrency', [1, 3])
+    def test_iter_list_walks_every_page(self, client, server, concurrency):
+        async def run():
+            async with client:
+                return [agent async for agent in client.agents.iter_list(page_size=2, concurrency=concurrency)]
+
+        assert asyncio.run(run()) == server.agents
+
+    def test_collect_yields_a_result_per_agent_and_kind(self, client):
+        async def run():
+            async with client:
+                return [result async for result in client.syscol.collect(['001', '002'], kinds=['ports'])]
+
+        results = asyncio.run(run())
+
+        assert sorted(r.agent_id for r in results) == ['001', '002']
+        assert all(r.kind == 'ports' and r.error is None for r in results)
+
+    def test_add_many_runs_registrations_concurrently(self):
+        def handler(request: httpx.Request):
+            if request.url.path == '/security/user/authenticate':
+                return httpx.Response(200, json={'data': {'token': 'secret123'}})
+            name = json.loads(request.content)['name']
+            if name == 'broken':
+                return httpx.Response(400, json={'detail': 'Invalid name', 'error': 1738})
+            return httpx.Response(200, json={'data': {'id': name[-3:], 'key': 'key'}})
+
+        async def run():
+            async with AsyncWazuhClient(base_url, 'johndoe', 'secret', transport=httpx.MockTransport(handler)) as client:
+                return await client.agents.add_many(['agent-001', 'agent-002', 'broken'], concurrency=2)
+
+        result = asyncio.run(run())
+
+        assert sorted(item['id'] for item in result.affected_items) == ['001', '002']
+        assert result.errors == {'broken': 'Invalid name'}
+
+    def test_streaming_is_rejected_before_sending(self, client, server):
+        async def run():
+            async with client:
+                with pytest.raises(TypeError):
+                    client.syscol.stream(client.syscol.agent_packages, '001')
+                with pytest.raises(TypeError):
+                    [p async for p in client.syscol.iter_agent_packages(agent_id='001', stream=True)]
+
+        asyncio.run(run())
+
+        assert server.requests == []
+
+    @responses.activate
+    def test_status_retries_stop_at_the_same_limit_as_the_sync_client(self):
+        retry = Retry(total=10, status=2, status_forcelist=[503])
+        responses.add(responses.GET, url=f'{base_url}/security/user/authenticate',
+                      json={'data': {'token': 'secret123'}}, status=200)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=503)
+        with pytest.raises(requests.HTTPError):
+            WazuhClient(base_url, 'johndoe', 'secret', retry=retry).agents.list()
+        sync_attempts = len(responses.calls) - 1
+
+        attempts = []
+
+        def handler(request):
+            if request.url.path == '/security/user/authenticate':
+                return httpx.Response(200, json={'data': {'token': 'secret123'}})
+            attempts.append(request)
+            return httpx.Response(503, json={})
+
+        async def run():
+            async with AsyncWazuhClient(base_url, 'johndoe', 'secret', retry=retry,
+                                        transport=httpx.MockTransport(handler)) as client:
+                with pytest.raises(httpx.HTTPStatusError):
+                    await client.agents.list()
+
+        asyncio.run(run())
+
+        assert len(attempts) == sync_attempts == 3
@@ -0,0 +1,169 @@
+import base64
+import json
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import responses
+
+from wazuhpy import WazuhClient
+from wazuhpy.auth import TokenCache, token_expiry
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+def jwt(exp: float) -> str:
+    def encode(part: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip('=')
+    return f"{encode({'alg': 'ES512', 'typ': 'JWT'})}.{encode({'iss': 'wazuh', 'exp': exp})}.signature"
+
+
+def add_token(token: str):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/security/user/authenticate',
+        json={'data': {'token': token}},
+        status=200,
+    )
+
+
+class TestWazuhTokenAuth:
+    def test_token_expiry_reads_exp_claim(self):
+        assert token_expiry(jwt(1700000000)) == 1700000000
+        assert token_expiry('secret123') is None
+
+    @responses.activate
+    def test_token_is_refreshed_before_expiry(self):
+        expiring, fresh = jwt(time.time() + 10), jwt(time.time() + 900)
+        add_token(expiring)
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+
+        responses.replace(responses.GET, url=f'{base_url}/security/user/authenticate',
+                          json={'data': {'token': fresh}}, status=200)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        result = client.agents.list()
+
+        assert result.request.headers['Authorization'] == f'Bearer {fresh}'
+        assert responses.assert_call_count(f'{base_url}/security/user/authenticate', 2)
+
+    @responses.activate
+    def test_unauthorized_response_reauthenticates_once_and_resends(self):
+        add_token('revoked')
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+
+        responses.replace(responses.GET, url=f'{base_url}/security/user/authenticate',
+                          json={'data': {'token': 'renewed'}}, status=200)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={'title': 'Unauthorized'}, status=401)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        result = client.agents.list()
+
+        assert result.status_code == 200
+        assert result.request.headers['Authorization'] == 'Bearer renewed'
+        assert result.history[0].status_code == 401
+
+    @responses.activate
+    def test_concurrent_requests_share_a_single_refresh(self):
+        add_token(jwt(time.time() - 1))
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+
+        responses.replace(responses.GET, url=f'{base_url}/security/user/authenticate',
+                          json={'data': {'token': jwt(time.time() + 900)}}, status=200)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: client.agents.list(), range(16)))
+
+        assert all(r.status_code == 200 for r in results)
+        assert responses.assert_call_count(f'{base_url}/security/user/authenticate', 2)
+
+
+class TestLazyClient:
+    @responses.activate
+    def test_lazy_client_authenticates_on_first_request(self):
+        add_token(jwt(time.time() + 900))
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, lazy=True)
+        assert len(responses.calls) == 0
+        assert 'agents' not in vars(client)
+
+        client.agents.list()
+
+        assert [call.request.path_url.split('?')[0] for call in responses.calls] == ['/security/user/authenticate', '/agents']
+        assert client.agents is client.agents
+
+    @responses.activate
+    def test_lazy_login_is_bounded_by_the_first_call_deadline(self):
+        add_token(jwt(time.time() + 900))
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, lazy=True)
+        client.agents.list(deadline=5)
+
+        assert all(t <= 5 for t in responses.calls[0].request.req_kwargs['timeout'])
+
+    @responses.activate
+    def test_cached_token_skips_authentication(self, tmp_path):
+        token = jwt(time.time() + 900)
+        add_token(token)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+        path = str(tmp_path / 'tokens.json')
+
+        WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, token_cache=path)
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, token_cache=path)
+        result = client.agents.list()
+
+        assert result.request.headers['Authorization'] == f'Bearer {token}'
+        assert responses.assert_call_count(f'{base_url}/security/user/authenticate', 1)
+        assert TokenCache(path).load(TokenCache.cache_key(base_url, 'other')) is None
+
+    @responses.activate
+    def test_rejected_cached_token_is_replaced(self, tmp_path):
+        path = str(tmp_path / 'tokens.json')
+        revoked, fresh = jwt(time.time() + 900), jwt(time.time() + 901)
+        TokenCache(path).store(TokenCache.cache_key(base_url, 'johndoe'), revoked)
+        add_token(fresh)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={'title': 'Unauthorized'}, status=401)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, lazy=True, token_cache=path)
+        result = client.agents.list()
+
+        assert result.request.headers['Authorization'] == f'Bearer {fresh}'
+        assert TokenCache(path).load(TokenCache.cache_key(base_url, 'johndoe')) == fresh
+
+    def test_expiring_tokens_are_not_loaded(self, tmp_path):
+        cache = TokenCache(str(tmp_path / 'tokens.json'))
+        cache.store('johndoe@manager', jwt(time.time() + 30))
+
+        assert cache.load('johndoe@manager') is not None
+        assert cache.load('johndoe@manager', margin=60) is None
+
+
+class TestAsyncTokenAuth:
+    def test_unauthorized_response_reauthenticates_once_and_resends(self):
+        httpx = pytest.importorskip('httpx')
+        import asyncio
+        from wazuhpy import AsyncWazuhClient
+
+        tokens = iter(['revoked', 'renewed'])
+        seen = []
+
+        def handler(request):
+            if request.url.path == '/security/user/authenticate':
+                return httpx.Response(200, json={'data': {'token': next(tokens)}})
+            seen.append(request.headers['Authorization'])
+            return httpx.Response(401 if seen[-1] == 'Bearer revoked' else 200, json={})
+
+        async def run():
+            async with AsyncWazuhClient(base_url, 'johndoe', 'secret', transport=httpx.MockTransport(handler)) as client:
+                return await client.agents.list()
+
+        result = asyncio.run(run())
+
+        assert result.status_code == 200
+        assert seen == ['Bearer revoked', 'Bearer renewed']
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+import requests
+import responses
+
+from wazuhpy import CircuitBreaker, CircuitOpenError, ResponseCache, WazuhClient
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestCircuitBreaker:
+    def test_opens_once_failure_rate_is_reached(self):
+        breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4)
+        for failed in (False, True, False):
+            breaker.before('api')
+            breaker.record('api', failed, 0.1)
+        assert breaker.state('api') == CircuitBreaker.CLOSED
+
+        breaker.record('api', True, 0.1)
+
+        assert breaker.state('api') == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before('api')
+        breaker.before('other')
+
+    def test_half_open_probe_closes_or_reopens(self):
+        breaker = CircuitBreaker(window=1, min_calls=1, reset_timeout=0.01)
+        breaker.record('api', True, 0.1)
+        time.sleep(0.02)
+
+        breaker.before('api')
+        assert breaker.state('api') == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before('api')
+        breaker.record('api', True, 0.1)
+        assert breaker.state('api') == CircuitBreaker.OPEN
+
+        time.sleep(0.02)
+        breaker.before('api')
+        breaker.record('api', False, 0.1)
+        assert breaker.state('api') == CircuitBreaker.CLOSED
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = CircuitBreaker(window=2, min_calls=2, slow_call=1.0)
+        breaker.record('api', False, 2.0)
+        breaker.record('api', False, 0.1)
+
+        assert breaker.state('api') == CircuitBreaker.OPEN
+
+
+class TestCircuitBreakerEndpoints:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        return WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, cache=ResponseCache(stale_ttl=60),
+                           circuit_breaker=CircuitBreaker(window=2, min_calls=2, reset_timeout=60))
+
+    @responses.activate
+    def test_open_circuit_fails_fast_per_endpoint_family(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=503)
+        responses.add(responses.GET, url=f'{base_url}/groups', json={}, status=200)
+
+        for _ in range(2):
+            with pytest.raises(requests.HTTPError):
+                client.agents.list()
+        with pytest.raises(CircuitOpenError):
+            client.agents.list()
+
+        assert client.groups.get().status_code == 200
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_client_errors_do_not_open_the_circuit(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=400)
+
+        for _ in range(3):
+            with pytest.raises(requests.HTTPError):
+                client.agents.list()
+
+        assert client.breaker.state(f'{base_url}/agents') == CircuitBreaker.CLOSED
+
+    @responses.activate
+    def test_open_circuit_serves_stale_cached_response(self, client):
+        responses.add(responses.GET, url=f'{base_url}/syscollector/001/os', json={'data': {'os': 'ubuntu'}}, status=200)
+        responses.add(responses.GET, url=f'{base_url}/syscollector/001/hardware', json={}, status=503)
+
+        client.syscol.agent_os('001', cache_ttl=0.01)
+        with pytest.raises(requests.HTTPError):
+            client.syscol.agent_hardware('001')
+        time.sleep(0.02)
+
+        result = client.syscol.agent_os('001', cache_ttl=0.01)
+
+        assert result.json() == {'data': {'os': 'ubuntu'}}
+        assert len(responses.calls) == 2
+        with pytest.raises(CircuitOpenError):
+            client.syscol.agent_hardware('001')
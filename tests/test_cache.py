@@ -0,0 +1,125 @@
+import re
+import time
+
+import pytest
+import responses
+
+from wazuhpy import WazuhClient, ResponseCache
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestResponseCache:
+    def test_entries_expire_after_ttl(self):
+        cache = ResponseCache(ttl=0.01)
+        cache.set('key', 'value')
+        assert cache.get('key') == 'value'
+
+        time.sleep(0.02)
+        assert cache.get('key') is None
+        assert cache.stats == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 0}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.evictions == 1
+
+    def test_key_ignores_unset_params_and_order(self):
+        assert (ResponseCache.key('GET', f'{base_url}/groups', {'limit': '500', 'offset': '0', 'q': None})
+                == ResponseCache.key('get', f'{base_url}/groups', {'offset': '0', 'limit': '500'}))
+
+
+class TestCachedEndpoints:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, cache=True)
+        return _client
+
+    @responses.activate
+    def test_read_mostly_methods_are_served_from_cache(self, client):
+        responses.add(
+            responses.GET,
+            re.compile(rf'{base_url}\/syscollector\/\w+\/os'),
+            json={'data': {'affected_items': [{'os': {'platform': 'ubuntu'}}]}},
+            status=200,
+        )
+
+        first = client.syscol.agent_os(agent_id='001')
+        second = client.syscol.agent_os(agent_id='001')
+        client.syscol.agent_os(agent_id='002')
+
+        assert second is first
+        assert len(responses.calls) == 2
+        assert client.cache.hits == 1
+
+    @responses.activate
+    def test_other_methods_are_not_cached_unless_asked(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        client.agents.list()
+        client.agents.list()
+        client.agents.list(cache_ttl=30)
+        client.agents.list(cache_ttl=30)
+
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_mutating_calls_invalidate_related_entries(self, client):
+        responses.add(
+            responses.GET,
+            re.compile(rf'{base_url}\/groups\/\w+\/configuration'),
+            json={'data': {'affected_items': []}},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            re.compile(rf'{base_url}\/syscollector\/\w+\/hardware'),
+            json={'data': {'affected_items': []}},
+            status=200,
+        )
+        responses.add(responses.POST, url=f'{base_url}/groups', json={'error': 0}, status=200)
+
+        client.groups.config(group_name='GroupOne')
+        client.syscol.agent_hardware(agent_id='001')
+        client.groups.create(group_name='GroupTwo')
+        client.groups.config(group_name='GroupOne')
+        client.syscol.agent_hardware(agent_id='001')
+
+        assert responses.assert_call_count(f'{base_url}/groups/GroupOne/configuration?offset=0&limit=500', 2)
+        assert responses.assert_call_count(f'{base_url}/syscollector/001/hardware', 1)
+
+    @responses.activate
+    def test_cache_instance_is_used_while_empty(self):
+        responses.add(responses.GET, url=f'{base_url}/security/user/authenticate',
+                      json={'data': {'token': 'secret123'}}, status=200)
+        cache = ResponseCache()
+
+        client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, cache=cache)
+
+        assert len(cache) == 0
+        assert client.cache is cache
+        assert client.syscol.cache is cache
+
+    def test_async_client_uses_an_empty_cache_instance(self):
+        pytest.importorskip('httpx')
+        from wazuhpy import AsyncWazuhClient
+        cache = ResponseCache()
+
+        client = AsyncWazuhClient(base_url, 'johndoe', 'secret', cache=cache)
+
+        assert client.cache is cache
+        assert client.syscol.cache is cache
@@ -1,5 +1,7 @@
 import pytest
 import responses
+from requests.adapters import Retry
+from requests.exceptions import HTTPError
 
 from wazuhpy import WazuhClient
 
@@ -22,4 +24,47 @@ class TestWazuhClient:
 
     @responses.activate
     def test_token_added_to_header(self, client):
-        assert 'Bearer secret123' in client.session.headers.get('Authorization')
\ No newline at end of file
+        assert 'Bearer secret123' in client.session.headers.get('Authorization')
+
+class TestWazuhClientTransport:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False,
+                              pool_maxsize=32, retry=Retry(total=3, backoff_factor=0, status_forcelist=[503]))
+        return _client
+
+    @responses.activate
+    def test_adapter_is_mounted_once_and_sized_from_client(self, client):
+        adapter = client.session.get_adapter(base_url)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        client.agents.list(retry=True)
+
+        assert client.session.get_adapter(base_url) is adapter
+        assert adapter._pool_maxsize == 32
+
+    @responses.activate
+    def test_client_retry_policy_applies_to_every_endpoint(self, client):
+        responses.add(responses.GET, url=f'{base_url}/groups', json={}, status=503)
+        responses.add(responses.GET, url=f'{base_url}/groups', json={}, status=200)
+
+        result = client.groups.get()
+
+        assert result.status_code == 200
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_endpoint_retry_policy_overrides_client_policy(self, client):
+        client.syscol.retry = False
+        responses.add(responses.GET, url=f'{base_url}/syscollector/001/os', json={}, status=503)
+
+        with pytest.raises(HTTPError):
+            client.syscol.agent_os(agent_id='001')
+        assert len(responses.calls) == 1
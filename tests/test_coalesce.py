@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import responses
+
+from wazuhpy import Deadline, DeadlineExceeded, WazuhClient
+from wazuhpy.coalesce import RequestCoalescer
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestRequestCoalescer:
+    def test_concurrent_calls_share_one_execution(self):
+        coalescer = RequestCoalescer()
+        barrier = threading.Barrier(8)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'config'
+
+        def worker(_):
+            barrier.wait()
+            return coalescer.do('key', fetch)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(worker, range(8)))
+
+        assert results == ['config'] * 8
+        assert len(calls) == 1
+        assert coalescer.coalesced == 7
+        assert coalescer.in_flight == 0
+
+    def test_errors_are_shared_and_not_remembered(self):
+        coalescer = RequestCoalescer()
+
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            coalescer.do('key', fail)
+        assert coalescer.do('key', lambda: 'ok') == 'ok'
+
+    def test_async_calls_share_one_task(self):
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'config'
+
+        async def run():
+            return await asyncio.gather(*(coalescer.do_async('key', fetch) for _ in range(5)))
+
+        assert asyncio.run(run()) == ['config'] * 5
+        assert len(calls) == 1
+
+    def test_follower_stops_waiting_at_its_deadline(self):
+        coalescer = RequestCoalescer()
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(1)
+            return 'config'
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            leader = executor.submit(coalescer.do, 'key', slow)
+            started.wait()
+            start = time.perf_counter()
+            with pytest.raises(DeadlineExceeded):
+                coalescer.do('key', slow, Deadline(0.2))
+            assert time.perf_counter() - start < 0.5
+            assert leader.result() == 'config'
+
+    def test_async_follower_stops_waiting_at_its_deadline(self):
+        coalescer = RequestCoalescer()
+
+        async def slow():
+            await asyncio.sleep(0.5)
+            return 'config'
+
+        async def run():
+            leader = asyncio.ensure_future(coalescer.do_async('key', slow))
+            await asyncio.sleep(0)
+            with pytest.raises(DeadlineExceeded):
+                await coalescer.do_async('key', slow, Deadline(0.1))
+            # the leader's request goes on
+            return await leader
+
+        assert asyncio.run(run()) == 'config'
+
+
+class TestClientCoalescing:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, coalesce=True)
+        return _client
+
+    @responses.activate
+    def test_identical_gets_send_one_request(self, client):
+        barrier = threading.Barrier(6)
+
+        def slow_groups(request):
+            time.sleep(0.2)
+            return 200, {}, '{"data": {"affected_items": [{"name": "default"}]}}'
+
+        responses.add_callback(responses.GET, url=f'{base_url}/groups', callback=slow_groups)
+
+        def worker(_):
+            barrier.wait()
+            return client.groups.get()
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(worker, range(6)))
+
+        assert all(r.json()['data']['affected_items'] == [{'name': 'default'}] for r in results)
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_writes_are_never_coalesced(self, client):
+        responses.add(responses.POST, url=f'{base_url}/groups', json={}, status=200)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: client.groups.create('web'), range(4)))
+
+        assert len(responses.calls) == 4
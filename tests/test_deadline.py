@@ -0,0 +1,145 @@
+import time
+
+import pytest
+import requests
+import responses
+from requests.adapters import Retry
+
+from wazuhpy import Deadline, DeadlineExceeded, RateLimiter, WazuhClient, WazuhClientPool
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestDeadline:
+    def test_cap_limits_timeouts_to_remaining_budget(self):
+        deadline = Deadline(5)
+
+        assert deadline.cap(60) <= 5
+        assert all(t <= 5 for t in deadline.cap((10, 300)))
+        assert deadline.cap((1, None))[0] == 1
+        assert deadline.cap(None) <= 5
+        with pytest.raises(DeadlineExceeded):
+            Deadline(0).cap((10, 300))
+
+    def test_nested_deadline_never_extends_enclosing_one(self):
+        with Deadline(1) as outer:
+            with Deadline(60) as inner:
+                assert inner.expires_at == outer.expires_at
+
+    def test_bound_iterator_keeps_what_it_did_not_return(self):
+        calls = Deadline(0).bound(iter([1, 2, 3]))
+
+        assert list(calls) == []
+        assert calls.truncated
+        assert list(calls.remaining()) == [1, 2, 3]
+        assert not Deadline(0).bound(iter([])).truncated
+
+
+class TestDeadlineEndpoints:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        return WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+
+    @responses.activate
+    def test_requests_use_client_timeout_capped_by_deadline(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        client.agents.list()
+        client.agents.list(deadline=2)
+        client.agents.list(timeout=1)
+
+        timeouts = [call.request.req_kwargs['timeout'] for call in responses.calls]
+        assert timeouts[0] == (10, 300)
+        assert all(t <= 2 for t in timeouts[1])
+        assert timeouts[2] == 1
+
+    @responses.activate
+    def test_expired_deadline_sends_nothing(self, client):
+        with Deadline(0):
+            with pytest.raises(DeadlineExceeded):
+                client.agents.list()
+
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_retry_beyond_the_budget_is_not_attempted(self, client):
+        responses.add(responses.GET, url=f'{base_url}/groups', json={}, status=503)
+
+        with pytest.raises(requests.HTTPError):
+            client.groups.get(retry=Retry(total=3, backoff_factor=10, status_forcelist=[503]), deadline=5)
+
+        # the first retry is immediate, the second one would wait 20s
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_retry_after_beyond_the_budget_is_not_waited_for(self, client):
+        responses.add(responses.GET, url=f'{base_url}/groups', json={}, status=503, headers={'Retry-After': '3'})
+
+        start = time.perf_counter()
+        with pytest.raises(requests.HTTPError):
+            client.groups.get(retry=Retry(total=3, status_forcelist=[503]), deadline=0.5)
+
+        assert time.perf_counter() - start < 0.5
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_pagination_stops_between_pages(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents',
+                      json={'data': {'affected_items': [{'id': '001'}], 'total_affected_items': 2}}, status=200)
+
+        items = client.agents.iter_list(page_size=1, deadline=0.05)
+        assert next(items) == {'id': '001'}
+        time.sleep(0.06)
+
+        with pytest.raises(DeadlineExceeded):
+            next(items)
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_collect_reports_calls_left_unsent(self, client):
+        with Deadline(0):
+            results = list(client.syscol.collect(['001', '002'], kinds=['os']))
+
+        assert [(r.agent_id, type(r.error)) for r in results] == [('001', DeadlineExceeded), ('002', DeadlineExceeded)]
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_rate_limit_wait_beyond_the_deadline_fails_at_once(self, client):
+        client.agents.rate_limiter = RateLimiter(rate=1, per=2, burst=1)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+        client.agents.list()
+
+        start = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            client.agents.list(deadline=0.3)
+
+        assert time.perf_counter() - start < 0.3
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_pool_failover_caps_every_node_to_what_is_left(self):
+        master_url, worker_url = 'https://master.wazuh_example.com:55000', 'https://worker.wazuh_example.com:55000'
+        for url in (master_url, worker_url):
+            responses.add(responses.GET, url=f'{url}/security/user/authenticate',
+                          json={'data': {'token': 'secret123'}}, status=200)
+        pool = WazuhClientPool([master_url, worker_url], 'johndoe', 'secret')
+
+        def refused(request):
+            time.sleep(0.2)
+            raise requests.ConnectionError('refused')
+
+        responses.add_callback(responses.GET, url=f'{master_url}/agents', callback=refused)
+        responses.add(responses.GET, url=f'{worker_url}/agents', json={}, status=200)
+
+        pool.agents.list(deadline=1)
+
+        worker_timeout = responses.calls[-1].request.req_kwargs['timeout']
+        assert all(t <= 0.8 for t in worker_timeout)
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import responses
+
+from wazuhpy import HedgePolicy, WazuhClient, WazuhClientPool
+
+
+base_url = 'https://wazuh_example.com:55000'
+master_url = 'https://master.wazuh_example.com:55000'
+worker_url = 'https://worker.wazuh_example.com:55000'
+
+
+def warmed_up(**kwargs) -> HedgePolicy:
+    """Policy hedging /agents requests slower than 10ms"""
+    policy = HedgePolicy(min_samples=1, min_delay=0.01, **kwargs)
+    policy.observe('/agents', 0.01)
+    return policy
+
+
+class SlowFirst:
+    """responses callback answering the first request after `delay` seconds and the others at once"""
+    def __init__(self, delay: float = 0.5):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call == 1:
+            time.sleep(self.delay)
+        return 200, {}, f'{{"call": {call}}}'
+
+
+class TestHedgePolicy:
+    def test_delay_is_a_percentile_of_recent_latencies(self):
+        policy = HedgePolicy(percentile=90, min_samples=10, window=10)
+        for elapsed in range(9):
+            policy.observe('/agents', elapsed / 10)
+        assert policy.delay('/agents') is None
+
+        for elapsed in range(9, 20):
+            policy.observe('/agents', elapsed / 10)
+
+        assert policy.delay('/agents') == pytest.approx(1.8)
+        assert policy.delay('/groups') is None
+
+    def test_hedges_are_capped_by_the_budget(self):
+        policy = warmed_up(percentile=0, max_extra=0.5, burst=1)
+
+        def slow():
+            time.sleep(0.1)
+            return 'answer'
+
+        results = [policy.call('/agents', slow) for _ in range(3)]
+
+        assert results == ['answer'] * 3
+        # the burst, then half a hedge per request
+        assert policy.hedged == 2
+
+    def test_error_of_the_first_request_is_raised_when_no_copy_succeeds(self):
+        policy = warmed_up()
+
+        def fail():
+            raise ValueError('boom')
+
+        with pytest.raises(ValueError):
+            policy.call('/agents', fail)
+        assert policy.hedged == 0
+
+
+class TestHedgedRequests:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(responses.GET, url=f'{base_url}/security/user/authenticate',
+                      json={'data': {'token': 'secret123'}}, status=200)
+        return WazuhClient(base_url, 'johndoe', 'secret', hedge=warmed_up())
+
+    @responses.activate
+    def test_slow_get_is_answered_by_the_hedge(self, client):
+        server = SlowFirst()
+        responses.add_callback(responses.GET, url=f'{base_url}/agents', callback=server)
+
+        start = time.perf_counter()
+        result = client.agents.list()
+
+        assert time.perf_counter() - start < server.delay
+        assert result.json() == {'call': 2}
+        assert (client.hedge.hedged, client.hedge.won) == (1, 1)
+
+    @responses.activate
+    def test_hedging_can_be_disabled_per_call(self, client):
+        server = SlowFirst(delay=0.05)
+        responses.add_callback(responses.GET, url=f'{base_url}/agents', callback=server)
+
+        assert client.agents.list(hedge=False).json() == {'call': 1}
+        assert client.hedge.hedged == 0
+
+    @responses.activate
+    def test_writes_are_never_hedged(self, client):
+        client.hedge.observe('/agents/group', 0.01)
+        server = SlowFirst(delay=0.05)
+        responses.add_callback(responses.PUT, url=f'{base_url}/agents/group', callback=server)
+
+        client.agents.assign_to_group('web', ['001'])
+
+        assert server.calls == 1
+
+    @responses.activate
+    def test_pool_sends_the_hedge_to_another_manager(self):
+        for url in (master_url, worker_url):
+            responses.add(responses.GET, url=f'{url}/security/user/authenticate',
+                          json={'data': {'token': 'secret123'}}, status=200)
+        pool = WazuhClientPool([master_url, worker_url], 'johndoe', 'secret', hedge=warmed_up())
+        responses.add_callback(responses.GET, url=f'{master_url}/agents', callback=SlowFirst())
+        responses.add(responses.GET, url=f'{worker_url}/agents', json={'node': 'worker'}, status=200)
+
+        assert pool.agents.list().json() == {'node': 'worker'}
+        assert pool.master.client.hedge.won == 1
+
+
+class TestAsyncHedgedRequests:
+    def test_slower_copy_is_cancelled(self):
+        httpx = pytest.importorskip('httpx')
+        from wazuhpy import AsyncWazuhClient
+
+        calls = []
+
+        async def handler(request):
+            if request.url.path == '/security/user/authenticate':
+                return httpx.Response(200, json={'data': {'token': 'secret123'}})
+            calls.append(request)
+            if len(calls) == 1:
+                await asyncio.sleep(5)
+            return httpx.Response(200, json={'call': len(calls)})
+
+        async def run():
+            async with AsyncWazuhClient(base_url, 'johndoe', 'secret', hedge=warmed_up(),
+                                        transport=httpx.MockTransport(handler)) as client:
+                return await client.agents.list(), client.hedge
+
+        start = time.perf_counter()
+        result, policy = asyncio.run(run())
+
+        assert time.perf_counter() - start < 1
+        assert result.json() == {'call': 2}
+        assert (policy.hedged, policy.won) == (1, 1)
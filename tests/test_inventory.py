@@ -0,0 +1,102 @@
+import pytest
+import responses
+from responses import matchers
+
+from wazuhpy import WazuhClient, AgentInventory
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+def agent(agent_id: str, keep_alive: str, status: str = 'active', groups=('default',)) -> dict:
+    return {'id': agent_id, 'name': f'agent-{agent_id}', 'status': status, 'group': list(groups),
+            'os': {'platform': 'ubuntu'}, 'lastKeepAlive': keep_alive}
+
+
+def add_crawl(agents: list):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/agents',
+        json={'data': {'affected_items': agents, 'total_affected_items': len(agents)}},
+        match=[matchers.query_param_matcher({'sort': '-lastKeepAlive'}, strict_match=False)],
+        status=200,
+    )
+
+
+def add_ids(agents: list):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/agents',
+        json={'data': {'affected_items': [{'id': a['id'], 'status': a['status']} for a in agents],
+                       'total_affected_items': len(agents)}},
+        match=[matchers.query_param_matcher({'select': 'id,status'}, strict_match=False)],
+        status=200,
+    )
+
+
+class TestAgentInventory:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+        return _client
+
+    @responses.activate
+    def test_first_sync_mirrors_every_agent(self, client):
+        agents = [agent('000', '9999-12-31T23:59:59Z', groups=()),
+                  agent('002', '2024-01-02T00:00:00Z', groups=('default', 'web')),
+                  agent('001', '2024-01-01T00:00:00Z')]
+        add_crawl(agents)
+        add_ids(agents)
+
+        inventory = AgentInventory(client.agents)
+        result = inventory.sync()
+
+        assert result.updated == 3 and result.deleted == []
+        assert inventory.watermark == '2024-01-02T00:00:00Z'
+        assert inventory.get('002').group == ('default', 'web')
+        assert [a.id for a in inventory.find(group='web')] == ['002']
+        assert inventory.count_by('os_platform') == {'ubuntu': 3}
+
+    @responses.activate
+    def test_incremental_sync_stops_at_watermark_and_reconciles(self, client, tmp_path):
+        path = str(tmp_path / 'agents.db')
+        first = [agent('002', '2024-01-02T00:00:00Z'), agent('001', '2024-01-01T00:00:00Z'),
+                 agent('003', '2023-12-01T00:00:00Z')]
+        add_crawl(first)
+        add_ids(first)
+        with AgentInventory(client.agents, path=path) as inventory:
+            inventory.sync()
+
+        responses.reset()
+        # 002 moved, 001 disconnected without a new keep alive, 003 was deleted, 004 never connected
+        second = [agent('002', '2024-01-03T00:00:00Z'), agent('001', '2024-01-01T00:00:00Z', status='disconnected')]
+        add_crawl(second)
+        add_ids(second + [{'id': '004', 'status': 'never_connected'}])
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/agents',
+            json={'data': {'affected_items': [{'id': '004', 'status': 'never_connected'}], 'total_affected_items': 1}},
+            match=[matchers.query_param_matcher({'agents_list': '004'}, strict_match=False)],
+            status=200,
+        )
+
+        with AgentInventory(client.agents, path=path) as inventory:
+            result = inventory.sync()
+
+            assert result.updated == 1
+            assert result.reconciled == 2
+            assert result.deleted == ['003']
+            assert inventory.get('001').status == 'disconnected'
+            assert inventory.get('004').status == 'never_connected'
+            assert inventory.watermark == '2024-01-03T00:00:00Z'
+
+    def test_find_rejects_unknown_fields(self, client):
+        with pytest.raises(ValueError):
+            AgentInventory(client.agents).find(colour='blue')
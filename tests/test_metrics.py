@@ -0,0 +1,71 @@
+import pytest
+import requests
+import responses
+
+from wazuhpy import WazuhClient, MetricsCollector
+from wazuhpy.metrics import RequestMetric, endpoint_template
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestMetricsCollector:
+    @pytest.mark.parametrize('path, template', [
+        ('/agents', '/agents'),
+        ('/agents/group', '/agents/group'),
+        ('/agents/001/config/logcollector/localfile', '/agents/{agent_id}/config/{component}/{configuration}'),
+        ('/agents/001/group/web', '/agents/{agent_id}/group/{group_id}'),
+        ('/groups/web/configuration', '/groups/{group_id}/configuration'),
+        ('/syscollector/001/packages', '/syscollector/{agent_id}/packages'),
+    ])
+    def test_endpoint_template(self, path, template):
+        assert endpoint_template(path) == template
+
+    def test_percentiles_and_prometheus_export(self):
+        collector = MetricsCollector(buckets=(0.1, 1.0))
+        for elapsed in (0.05, 0.2, 0.3, 2.0):
+            collector(RequestMetric('GET', '/agents', 200, elapsed, 100, 0, 0.0))
+        collector(RequestMetric('GET', '/agents', None, 0.5, None, 2, 0.0, 'ConnectionError'))
+
+        assert collector.percentile(50) == 0.3
+        assert collector.percentile(100, 'GET', '/agents') == 2.0
+        assert collector.summary()[('GET', '/agents')]['retries'] == 2
+
+        text = collector.to_prometheus()
+        labels = 'method="GET",endpoint="/agents"'
+        assert f'wazuhpy_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+        assert f'wazuhpy_request_duration_seconds_bucket{{{labels},le="1.0"}} 4' in text
+        assert f'wazuhpy_request_duration_seconds_bucket{{{labels},le="+Inf"}} 5' in text
+        assert f'wazuhpy_response_bytes_total{{{labels}}} 400' in text
+        assert f'wazuhpy_responses_total{{{labels},status="200"}} 4' in text
+        assert f'wazuhpy_request_errors_total{{{labels},error="ConnectionError"}} 1' in text
+
+
+class TestClientMetrics:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, metrics=True, retry=True)
+        return _client
+
+    @responses.activate
+    def test_requests_are_recorded_per_endpoint_template(self, client):
+        responses.add(responses.GET, url=f'{base_url}/syscollector/001/os', status=503)
+        responses.add(responses.GET, url=f'{base_url}/syscollector/001/os', json={'data': {}}, status=200)
+        responses.add(responses.GET, url=f'{base_url}/syscollector/002/os', status=404)
+
+        client.syscol.agent_os(agent_id='001')
+        with pytest.raises(requests.HTTPError):
+            client.syscol.agent_os(agent_id='002')
+
+        stats = client.metrics.summary()[('GET', '/syscollector/{agent_id}/os')]
+        assert stats['count'] == 2
+        assert stats['retries'] == 1
+        assert stats['statuses'] == {200: 1, 404: 1}
+        assert stats['bytes'] == len('{"data": {}}')
@@ -0,0 +1,82 @@
+import pytest
+import responses
+
+from wazuhpy import WazuhClient
+from wazuhpy.models import Agent, Package, RecordPage
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+agent_item = {'id': '001', 'name': 'web-01', 'ip': '10.0.0.1', 'status': 'active', 'group': ['default', 'web'],
+              'os': {'name': 'Ubuntu', 'platform': 'ubuntu', 'version': '22.04', 'arch': 'x86_64'},
+              'lastKeepAlive': '2024-01-01T00:00:00Z'}
+
+
+class TestRecord:
+    def test_from_dict_maps_nested_fields(self):
+        agent = Agent.from_dict(agent_item)
+
+        assert agent.id == '001'
+        assert agent.os_platform == 'ubuntu'
+        assert agent.group == ('default', 'web')
+        assert agent.last_keep_alive == '2024-01-01T00:00:00Z'
+        assert agent.version is None
+        assert not hasattr(agent, '__dict__')
+
+    def test_low_cardinality_strings_are_shared(self):
+        first, second = (Agent.from_dict({'status': ''.join(['act', 'ive'])}) for _ in range(2))
+
+        assert first.status is second.status
+
+    def test_select_fields_lists_api_fields(self):
+        assert 'os.platform' in Agent.select_fields()
+        assert 'scan.time' in Package.select_fields()
+
+
+class TestModelResponses:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False, models=True)
+        return _client
+
+    @responses.activate
+    def test_list_returns_record_page(self, client):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/agents',
+            json={'data': {'affected_items': [agent_item], 'total_affected_items': 1, 'total_failed_items': 0,
+                           'failed_items': []}},
+            status=200,
+        )
+
+        result = client.agents.list()
+
+        assert isinstance(result, RecordPage)
+        assert result == [Agent.from_dict(agent_item)]
+        assert result.total_affected_items == 1
+
+    @responses.activate
+    def test_paginate_and_stream_yield_records(self, client):
+        packages = [{'name': 'zlib', 'version': '1.2.11'}, {'name': 'curl', 'version': '7.81'}]
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/syscollector/001/packages',
+            json={'data': {'affected_items': packages, 'total_affected_items': 2}},
+            status=200,
+        )
+
+        assert [p.name for p in client.syscol.iter_agent_packages(agent_id='001')] == ['zlib', 'curl']
+        assert [p.name for p in client.syscol.iter_agent_packages(agent_id='001', stream=True)] == ['zlib', 'curl']
+
+    @responses.activate
+    def test_models_can_be_disabled_per_call(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={'data': {}}, status=200)
+
+        assert client.agents.list(models=False).status_code == 200
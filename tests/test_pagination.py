@@ -0,0 +1,125 @@
+import re
+
+import pytest
+import responses
+from responses import matchers
+
+from wazuhpy import WazuhClient
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+def page(items, total):
+    return {'data': {'affected_items': items, 'total_affected_items': total,
+                     'total_failed_items': 0, 'failed_items': []},
+            'message': 'All selected agents information was returned', 'error': 0}
+
+
+class TestPagination:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+        return _client
+
+    @responses.activate
+    def test_iter_list_follows_offsets_until_total(self, client):
+        agents = [{'id': f'{i:03}'} for i in range(5)]
+
+        for offset in range(0, 5, 2):
+            responses.add(
+                responses.GET,
+                url=f'{base_url}/agents',
+                json=page(agents[offset:offset + 2], 5),
+                match=[matchers.query_param_matcher({'offset': str(offset), 'limit': '2'})],
+                status=200,
+            )
+
+        result = list(client.agents.iter_list(page_size=2))
+
+        assert result == agents
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_iter_list_is_lazy(self, client):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/agents',
+            json=page([{'id': '000'}, {'id': '001'}], 10),
+            status=200,
+        )
+
+        iterator = client.agents.iter_list(page_size=2)
+        assert len(responses.calls) == 0
+
+        next(iterator)
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_iter_agent_packages_stops_on_empty_page(self, client):
+        responses.add(
+            responses.GET,
+            re.compile(rf'{base_url}\/syscollector\/\w+\/packages'),
+            json=page([], 0),
+            status=200,
+        )
+
+        assert list(client.syscol.iter_agent_packages(agent_id='001')) == []
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_iter_agents_passes_filters_to_every_page(self, client):
+        responses.add(
+            responses.GET,
+            re.compile(rf'{base_url}\/groups\/\w+\/agents'),
+            json=page([{'id': '001'}], 1),
+            status=200,
+        )
+
+        result = list(client.groups.iter_agents(group_name='GroupOne', status='active'))
+
+        assert result == [{'id': '001'}]
+        assert responses.calls[0].request.url == (f'{base_url}/groups/GroupOne/agents?'
+                                                  f'offset=0&limit=500&status=active')
+
+    @responses.activate
+    def test_iter_list_fetches_remaining_pages_concurrently_in_order(self, client):
+        agents = [{'id': f'{i:03}'} for i in range(7)]
+
+        for offset in range(0, 7, 2):
+            responses.add(
+                responses.GET,
+                url=f'{base_url}/agents',
+                json=page(agents[offset:offset + 2], 7),
+                match=[matchers.query_param_matcher({'offset': str(offset), 'limit': '2'})],
+                status=200,
+            )
+
+        result = list(client.agents.iter_list(page_size=2, concurrency=3))
+
+        assert result == agents
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_iter_get_as_completed_returns_every_item(self, client):
+        vulns = [{'cve': f'CVE-2024-{i:04}'} for i in range(6)]
+
+        for offset in range(0, 6, 2):
+            responses.add(
+                responses.GET,
+                url=f'{base_url}/vulnerability/001',
+                json=page(vulns[offset:offset + 2], 6),
+                match=[matchers.query_param_matcher({'offset': str(offset), 'limit': '2'})],
+                status=200,
+            )
+
+        result = list(client.vulns.iter_get(agent_id='001', page_size=2, concurrency=2, ordered=False))
+
+        assert sorted(result, key=lambda v: v['cve']) == vulns
@@ -0,0 +1,95 @@
+import pytest
+import requests
+import responses
+
+from wazuhpy import CircuitBreaker, WazuhClientPool
+
+
+master_url = 'https://master.wazuh_example.com:55000'
+worker_url = 'https://worker.wazuh_example.com:55000'
+
+
+class TestWazuhClientPool:
+    @pytest.fixture()
+    def pool(self):
+        for url in (master_url, worker_url):
+            responses.add(responses.GET, url=f'{url}/security/user/authenticate',
+                          json={'data': {'token': 'secret123'}}, status=200)
+        return WazuhClientPool([master_url, worker_url], 'johndoe', 'secret', verify_ssl=False)
+
+    def served_by(self, path: str):
+        return [call.request.url.split('/')[2].split('.')[0] for call in responses.calls
+                if call.request.url.split('?')[0].endswith(path)]
+
+    @responses.activate
+    def test_reads_are_spread_and_nodes_authenticate_lazily(self, pool):
+        assert len(responses.calls) == 0
+        for url in (master_url, worker_url):
+            responses.add(responses.GET, url=f'{url}/agents', json={}, status=200)
+
+        for _ in range(4):
+            pool.agents.list()
+
+        assert sorted(self.served_by('/agents')) == ['master', 'master', 'worker', 'worker']
+        assert sorted(self.served_by('/authenticate')) == ['master', 'worker']
+
+    @responses.activate
+    def test_writes_go_to_master(self, pool):
+        responses.add(responses.PUT, url=f'{master_url}/agents/group', json={}, status=200)
+
+        pool.agents.assign_to_group('web', ['001'])
+        pool.agents.assign_to_group('web', ['001'])
+
+        assert self.served_by('/agents/group') == ['master', 'master']
+
+    @responses.activate
+    def test_read_fails_over_on_connection_error(self, pool):
+        responses.add(responses.GET, url=f'{master_url}/agents', body=requests.ConnectionError('refused'))
+        responses.add(responses.GET, url=f'{worker_url}/agents', json={}, status=200)
+
+        assert pool.agents.list().status_code == 200
+        assert pool.agents.list().status_code == 200
+
+        assert self.served_by('/agents') == ['master', 'worker', 'worker']
+        assert pool.node(master_url).failures == 1
+
+    @responses.activate
+    def test_read_timeout_is_raised_without_failover(self, pool):
+        responses.add(responses.GET, url=f'{master_url}/agents', body=requests.ReadTimeout('slow'))
+        responses.add(responses.GET, url=f'{worker_url}/agents', json={}, status=200)
+
+        with pytest.raises(requests.ReadTimeout):
+            pool.request('GET', '/agents')
+
+        assert self.served_by('/agents') == ['master']
+        assert pool.node(master_url).failures == 0
+
+    @responses.activate
+    def test_write_is_not_resent_after_read_timeout(self, pool):
+        responses.add(responses.PUT, url=f'{master_url}/agents/group', body=requests.ReadTimeout('slow'))
+
+        with pytest.raises(requests.ReadTimeout):
+            pool.agents.assign_to_group('web', ['001'])
+
+        assert self.served_by('/agents/group') == ['master']
+
+    @responses.activate
+    def test_circuits_are_kept_per_node(self):
+        for url in (master_url, worker_url):
+            responses.add(responses.GET, url=f'{url}/security/user/authenticate',
+                          json={'data': {'token': 'secret123'}}, status=200)
+        pool = WazuhClientPool([master_url, worker_url], 'johndoe', 'secret', verify_ssl=False,
+                               circuit_breaker=CircuitBreaker(window=2, min_calls=2, reset_timeout=60))
+        responses.add(responses.GET, url=f'{master_url}/agents', json={}, status=200)
+        responses.add(responses.GET, url=f'{worker_url}/agents', json={}, status=503)
+
+        statuses = []
+        for _ in range(8):
+            try:
+                statuses.append(pool.agents.list().status_code)
+            except requests.HTTPError as err:
+                statuses.append(err.response.status_code)
+
+        assert statuses == [200, 503, 200, 503, 200, 200, 200, 200]
+        assert pool.breaker.state(f'{worker_url}/agents') == CircuitBreaker.OPEN
+        assert pool.breaker.state(f'{master_url}/agents') == CircuitBreaker.CLOSED
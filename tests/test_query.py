@@ -0,0 +1,108 @@
+import pytest
+import responses
+from responses import matchers
+
+from wazuhpy import F, Field, Query, WazuhClient
+from wazuhpy.models import Agent
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestQuery:
+    def test_conditions_compile_to_wql(self):
+        query = (F.os.platform == 'ubuntu') & (F.status != 'disconnected') & (F.dateAdd > '2024-01-01')
+
+        assert query.wql == 'os.platform=ubuntu;status!=disconnected;dateAdd>2024-01-01'
+        assert str(F.name.like('web')) == 'name~web'
+        assert str(Field('os.name') == 'Ubuntu') == 'os.name=Ubuntu'
+
+    def test_mixed_operators_are_parenthesized(self):
+        query = ((F.status == 'active') | (F.status == 'pending')) & (F.group == 'web')
+
+        assert query.wql == '(status=active,status=pending);group=web'
+        assert F.status.isin(['active', 'pending']).wql == 'status=active,status=pending'
+        assert (F.version <= 'v4').wql == '(version<v4,version=v4)'
+
+    def test_compiled_once(self):
+        query = (F.status == 'active') & (F.group == 'web')
+
+        assert query.wql is query.wql
+        assert query.select('id').wql is query.wql
+
+    def test_select_accepts_fields_and_models(self):
+        query = (F.status == 'active').select('id', F.os.platform).select(Agent)
+
+        assert query.fields[:2] == ('id', 'os.platform')
+        assert query.fields.count('id') == 1
+        assert set(Agent.select_fields()) <= set(query.fields)
+
+    def test_reserved_characters_are_rejected(self):
+        with pytest.raises(ValueError):
+            F.name == 'a,b'
+
+    def test_isin_without_values_is_rejected(self):
+        with pytest.raises(ValueError):
+            (F.status == 'active') & F.id.isin([])
+
+
+class TestQueryPushdown:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        return WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+
+    @responses.activate
+    def test_query_sends_filter_and_projection(self, client):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/agents',
+            match=[matchers.query_param_matcher({'q': 'os.platform=ubuntu', 'select': 'id,name'}, strict_match=False)],
+            json={'data': {'affected_items': [], 'total_affected_items': 0}},
+            status=200,
+        )
+
+        result = client.agents.list(query=(F.os.platform == 'ubuntu').select('id', 'name'))
+
+        assert result.status_code == 200
+
+    @responses.activate
+    def test_explicit_select_wins(self, client):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/syscollector/001/packages',
+            match=[matchers.query_param_matcher({'q': 'vendor~Ubuntu', 'select': 'name'}, strict_match=False)],
+            json={'data': {'affected_items': [], 'total_affected_items': 0}},
+            status=200,
+        )
+
+        result = client.syscol.agent_packages('001', select=['name'],
+                                              query=F.vendor.like('Ubuntu').select('name', 'version'))
+
+        assert result.status_code == 200
+
+    @responses.activate
+    def test_projection_only_query_sends_no_filter(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={'data': {}}, status=200)
+
+        client.agents.list(query=Query().select('id'))
+
+        assert 'q=' not in responses.calls[-1].request.url
+        assert 'select=id' in responses.calls[-1].request.url
+
+    @responses.activate
+    def test_records_select_the_fields_they_read(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', json={'data': {}}, status=200)
+
+        client.agents.list(models=True)
+        client.agents.list(models=True, select=['id'])
+        client.agents.list()
+
+        selects = [call.request.params.get('select') for call in responses.calls]
+        assert selects == [','.join(Agent.select_fields()), 'id', None]
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+import requests
+import responses
+
+from wazuhpy import WazuhClient, RateLimiter
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestRateLimiter:
+    def test_burst_then_sustained_rate(self):
+        limiter = RateLimiter(rate=600, burst=5)  # 10 requests per second
+
+        start = time.monotonic()
+        for _ in range(10):
+            limiter.acquire()
+        elapsed = time.monotonic() - start
+
+        # 5 tokens of burst, then 5 more at 0.1 second intervals
+        assert 0.4 <= elapsed < 0.8
+
+    def test_throttle_pauses_every_caller(self):
+        limiter = RateLimiter(rate=6000, burst=100)
+        limiter.throttle('0.2')
+
+        start = time.monotonic()
+        limiter.acquire()
+
+        assert time.monotonic() - start >= 0.19
+        assert limiter.throttled == 1
+
+
+class TestClientRateLimit:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False,
+                              rate_limit=RateLimiter(rate=6000, burst=100, max_retries=2))
+        return _client
+
+    def test_limiter_is_shared_by_every_endpoint(self, client):
+        assert client.agents.rate_limiter is client.rate_limiter
+        assert client.vulns.rate_limiter is client.rate_limiter
+
+    @responses.activate
+    def test_too_many_requests_is_resent_after_retry_after(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', headers={'Retry-After': '0.1'}, status=429)
+        responses.add(responses.GET, url=f'{base_url}/agents', json={}, status=200)
+
+        result = client.agents.list()
+
+        assert result.status_code == 200
+        assert client.rate_limiter.throttled == 1
+
+    @responses.activate
+    def test_too_many_requests_raises_once_retries_are_exhausted(self, client):
+        responses.add(responses.GET, url=f'{base_url}/agents', headers={'Retry-After': '0'}, status=429)
+
+        with pytest.raises(requests.HTTPError) as err:
+            client.agents.list()
+
+        assert err.value.response.status_code == 429
+        assert len(responses.calls) == 3
@@ -0,0 +1,100 @@
+import io
+import json
+
+import pytest
+import requests
+import responses
+from responses import matchers
+
+from wazuhpy import WazuhClient
+from wazuhpy.streaming import AffectedItemsStream
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+def make_response(body: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body.encode('utf-8'))
+    return response
+
+
+class TestAffectedItemsStream:
+    @pytest.mark.parametrize('chunk_size', [1, 3, 7, 65536])
+    @pytest.mark.parametrize('indent', [None, 4])
+    def test_items_and_data_fields_are_decoded_across_chunks(self, chunk_size, indent):
+        document = {'data': {'affected_items': [{'name': 'zlib', 'version': '1.2.11', 'size': 123456789},
+                                                {'name': 'naïve-ünïcode', 'tags': ['a', 'b'], 'size': 0},
+                                                12345678],
+                             'total_affected_items': 3210, 'total_failed_items': 0, 'failed_items': []},
+                    'message': 'All selected packages were returned', 'error': 0}
+
+        stream = AffectedItemsStream(make_response(json.dumps(document, indent=indent)), chunk_size=chunk_size)
+
+        assert list(stream) == document['data']['affected_items']
+        assert stream.total_affected_items == 3210
+        assert stream.data['failed_items'] == []
+        assert stream.envelope == {'message': 'All selected packages were returned', 'error': 0}
+
+    def test_items_are_yielded_before_the_body_is_read(self):
+        body = json.dumps({'data': {'affected_items': [{'id': str(i)} for i in range(1000)],
+                                    'total_affected_items': 1000}})
+        response = make_response(body)
+        stream = AffectedItemsStream(response, chunk_size=64)
+
+        assert next(stream) == {'id': '0'}
+        assert response.raw.tell() < len(body)
+
+    def test_truncated_body_raises(self):
+        stream = AffectedItemsStream(make_response('{"data": {"affected_items": [{"id": "001"}, {"id": '))
+
+        assert next(stream) == {'id': '001'}
+        with pytest.raises(json.JSONDecodeError):
+            next(stream)
+
+
+class TestStreamingPagination:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+        return _client
+
+    @responses.activate
+    def test_paginate_streams_every_page(self, client):
+        packages = [{'name': f'package-{i}'} for i in range(5)]
+
+        for offset in range(0, 5, 2):
+            responses.add(
+                responses.GET,
+                url=f'{base_url}/syscollector/001/packages',
+                json={'data': {'affected_items': packages[offset:offset + 2], 'total_affected_items': 5}},
+                match=[matchers.query_param_matcher({'offset': str(offset), 'limit': '2'}),
+                       matchers.request_kwargs_matcher({'stream': True})],
+                status=200,
+            )
+
+        result = list(client.syscol.iter_agent_packages(agent_id='001', page_size=2, stream=True))
+
+        assert result == packages
+
+    @responses.activate
+    def test_stream_returns_items_of_a_single_call(self, client):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/vulnerability/001',
+            json={'data': {'affected_items': [{'cve': 'CVE-2024-0001'}], 'total_affected_items': 1}},
+            status=200,
+        )
+
+        stream = client.vulns.stream(client.vulns.get, '001', limit=100000)
+
+        assert list(stream) == [{'cve': 'CVE-2024-0001'}]
+        assert stream.total_affected_items == 1
@@ -0,0 +1,81 @@
+import pytest
+import responses
+from responses import matchers
+
+from wazuhpy import WazuhClient, GroupConfigSync
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+def add_groups(checksums: dict):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/groups',
+        json={'data': {'affected_items': [{'name': name, 'configSum': checksum}
+                                          for name, checksum in checksums.items()],
+                       'total_affected_items': len(checksums)}},
+        match=[matchers.query_param_matcher({'offset': '0', 'limit': '500', 'hash': 'md5',
+                                             'select': 'name,configSum'})],
+        status=200,
+    )
+
+
+def add_config(group: str, config: list):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/groups/{group}/configuration',
+        json={'data': {'affected_items': config, 'total_affected_items': len(config)}},
+        status=200,
+    )
+
+
+class TestGroupConfigSync:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+        return _client
+
+    @responses.activate
+    def test_only_changed_groups_are_downloaded(self, client, tmp_path):
+        path = tmp_path / 'groups.json'
+
+        add_groups({'default': 'aaa', 'linux': 'bbb'})
+        add_config('default', [{'config': {'syscheck': {}}}])
+        add_config('linux', [{'filters': {'os': 'Linux'}, 'config': {}}])
+
+        first = GroupConfigSync(client.groups, path=str(path)).sync()
+        assert first == (['default', 'linux'], [], [])
+
+        responses.reset()
+        add_groups({'linux': 'ccc', 'windows': 'ddd'})
+        add_config('linux', [{'filters': {'os': 'Linux'}, 'config': {'rootcheck': {}}}])
+        add_config('windows', [])
+
+        syncer = GroupConfigSync(client.groups, path=str(path))
+        second = syncer.sync()
+
+        assert second == (['windows'], ['linux'], ['default'])
+        assert sorted(call.request.path_url.split('?')[0] for call in responses.calls) == [
+            '/groups', '/groups/linux/configuration', '/groups/windows/configuration']
+        assert syncer.configs['linux'] == [{'filters': {'os': 'Linux'}, 'config': {'rootcheck': {}}}]
+        assert set(syncer.checksums) == {'linux', 'windows'}
+
+    @responses.activate
+    def test_unchanged_groups_cost_a_single_call(self, client):
+        add_groups({'default': 'aaa'})
+        add_config('default', [])
+
+        syncer = GroupConfigSync(client.groups)
+        syncer.sync()
+        result = syncer.sync()
+
+        assert result == ([], [], [])
+        assert len(responses.calls) == 3
@@ -103,3 +103,51 @@ class TestWazuhSyscollectorEndpoints:
 
         assert result.url == (f'{base_url}/syscollector/{agent_id}/packages?offset=0&limit=500&vendor=Microsoft&'
                               f'select=scan.id%2Cname%2Cvendor%2Cinstall_time')
+
+    @responses.activate
+    def test_syscollector_endpoint_collect_streams_results_per_agent_and_kind(self, client):
+        responses.add(
+            responses.GET,
+            re.compile(rf'{base_url}\/syscollector\/\w+\/os'),
+            json={'data': {'affected_items': [{'os': {'platform': 'ubuntu'}}], 'total_affected_items': 1}},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            re.compile(rf'{base_url}\/syscollector\/\w+\/packages'),
+            json={'data': {'affected_items': [{'name': 'openssl'}], 'total_affected_items': 1}},
+            status=200,
+        )
+
+        results = list(client.syscol.collect(agent_ids=['001', '002'], kinds=['os', 'packages'], concurrency=2))
+
+        assert sorted((r.agent_id, r.kind) for r in results) == [('001', 'os'), ('001', 'packages'),
+                                                                   ('002', 'os'), ('002', 'packages')]
+        assert all(r.error is None for r in results)
+        assert {r.kind: r.items for r in results if r.agent_id == '001'} == {
+            'os': [{'os': {'platform': 'ubuntu'}}], 'packages': [{'name': 'openssl'}]}
+
+    @responses.activate
+    def test_syscollector_endpoint_collect_reports_failures_without_aborting(self, client):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/syscollector/001/hardware',
+            json={'data': {'affected_items': [{'ram': {'total': 8}}], 'total_affected_items': 1}},
+            status=200,
+        )
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/syscollector/002/hardware',
+            json={'title': 'Agent does not exist', 'error': 1701},
+            status=404,
+        )
+
+        results = {r.agent_id: r for r in client.syscol.collect(agent_ids=['001', '002'], kinds=['hardware'])}
+
+        assert results['001'].items == [{'ram': {'total': 8}}]
+        assert results['002'].items is None
+        assert results['002'].error.response.status_code == 404
+
+    def test_syscollector_endpoint_collect_rejects_unknown_kinds(self, client):
+        with pytest.raises(ValueError):
+            client.syscol.collect(agent_ids=['001'], kinds=['drivers'])
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+import responses
+from responses import matchers
+
+from wazuhpy import WazuhClient, PageSizeTuner
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+class TestPageSizeTuner:
+    def test_fast_pages_grow_and_slow_pages_shrink(self):
+        tuner = PageSizeTuner(target=1.0, initial=500, min_size=100, max_size=2000)
+
+        assert tuner.observe('agents', 500, 500, 0.1) == 1000
+        assert tuner.observe('agents', 1000, 1000, 0.1) == 2000
+        assert tuner.observe('agents', 2000, 2000, 0.1) == 2000
+        assert tuner.observe('packages', 500, 500, 4.0) == 250
+        assert tuner.size('agents') == 2000
+
+    def test_short_pages_are_ignored(self):
+        tuner = PageSizeTuner()
+
+        assert tuner.observe('agents', 500, 12, 0.01) == 500
+
+    def test_large_payloads_shrink_the_page(self):
+        tuner = PageSizeTuner(max_bytes=1000)
+
+        assert tuner.observe('packages', 500, 500, 0.1, size=4000) == 125
+
+
+class TestAdaptivePagination:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False,
+                              adaptive_pages=PageSizeTuner(target=60, initial=2, max_size=4))
+        return _client
+
+    @responses.activate
+    def test_page_size_grows_between_pages_and_is_remembered(self, client):
+        agents = [{'id': f'{i:03}'} for i in range(7)]
+        for offset, limit in ((0, 2), (2, 4), (6, 4)):
+            responses.add(
+                responses.GET,
+                url=f'{base_url}/agents',
+                json={'data': {'affected_items': agents[offset:offset + limit], 'total_affected_items': 7}},
+                match=[matchers.query_param_matcher({'offset': str(offset), 'limit': str(limit)})],
+                status=200,
+            )
+
+        assert list(client.agents.iter_list()) == agents
+        assert client.page_tuner.size(('WazuhAgents.list', False)) == 4
+
+    @responses.activate
+    def test_concurrent_pages_are_all_observed(self, client):
+        agents = [{'id': f'{i:03}'} for i in range(6)]
+        observed = []
+
+        class RecordingTuner(PageSizeTuner):
+            def observe(self, key, limit, count, elapsed, size=None):
+                observed.append((key, limit, count))
+                return super().observe(key, limit, count, elapsed, size)
+
+        def agents_callback(request):
+            offset, limit = int(request.params['offset']), int(request.params['limit'])
+            return 200, {}, json.dumps({'data': {'affected_items': agents[offset:offset + limit],
+                                                 'total_affected_items': len(agents)}})
+
+        responses.add_callback(responses.GET, url=f'{base_url}/agents', callback=agents_callback)
+        client.agents.page_tuner = RecordingTuner(target=60, initial=2, max_size=4)
+
+        assert list(client.agents.iter_list(concurrency=2)) == agents
+        assert sorted(observed) == [(('WazuhAgents.list', False), 2, 2)] * 3
+
+    @responses.activate
+    def test_explicit_page_size_is_not_tuned(self, client):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/agents',
+            json={'data': {'affected_items': [{'id': '001'}], 'total_affected_items': 1}},
+            match=[matchers.query_param_matcher({'offset': '0', 'limit': '1'})],
+            status=200,
+        )
+
+        list(client.agents.iter_list(page_size=1))
+
+        assert client.page_tuner.sizes == {}
@@ -0,0 +1,100 @@
+import pytest
+import responses
+from responses import matchers
+
+from wazuhpy import WazuhClient
+
+
+base_url = 'https://wazuh_example.com:55000'
+
+
+def add_agents(agent_ids: list):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/agents',
+        json={'data': {'affected_items': [{'id': agent_id} for agent_id in agent_ids],
+                       'total_affected_items': len(agent_ids)}},
+        status=200,
+    )
+
+
+def add_last_scan(agent_id: str, full_scan: str):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/vulnerability/{agent_id}/last_scan',
+        json={'data': {'affected_items': [{'last_full_scan': full_scan, 'last_partial_scan': None}]}},
+        status=200,
+    )
+
+
+def add_vulns(agent_id: str, vulns: list):
+    responses.add(
+        responses.GET,
+        url=f'{base_url}/vulnerability/{agent_id}',
+        json={'data': {'affected_items': vulns, 'total_affected_items': len(vulns)}},
+        match=[matchers.query_param_matcher({'select': 'cve,name,severity'}, strict_match=False)],
+        status=200,
+    )
+
+
+openssl = {'cve': 'CVE-2022-0778', 'name': 'openssl', 'severity': 'High'}
+curl = {'cve': 'CVE-2023-38545', 'name': 'curl', 'severity': 'Critical'}
+zlib = {'cve': 'CVE-2022-37434', 'name': 'zlib', 'severity': 'Critical'}
+
+
+class TestVulnerabilityIndex:
+    @pytest.fixture()
+    @responses.activate
+    def client(self):
+        responses.add(
+            responses.GET,
+            url=f'{base_url}/security/user/authenticate',
+            json={'data': {'token': 'secret123'}},
+            status=200,
+        )
+        _client = WazuhClient(base_url, 'johndoe', 'secret', verify_ssl=False)
+        return _client
+
+    @responses.activate
+    def test_refresh_builds_inverted_indexes(self, client):
+        add_agents(['001', '002'])
+        add_last_scan('001', '2024-01-01T00:00:00Z')
+        add_last_scan('002', '2024-01-01T00:00:00Z')
+        add_vulns('001', [openssl, curl])
+        add_vulns('002', [zlib])
+
+        index = client.vulnerability_index()
+        result = index.refresh(concurrency=2)
+
+        assert result.crawled == ['001', '002']
+        assert index.agents_with_cve('CVE-2022-0778') == {'001'}
+        assert index.agents_with_package('zlib') == {'002'}
+        assert index.agents_with_severity('critical') == {'001', '002'}
+        assert index.search(package='openssl', severity='Critical') == set()
+        assert index.search(package='curl', severity='Critical') == {'001'}
+        assert index.counts() == {'high': 1, 'critical': 2}
+
+    @responses.activate
+    def test_refresh_only_crawls_rescanned_agents(self, client, tmp_path):
+        path = str(tmp_path / 'vulns.json')
+        add_agents(['001', '002', '003'])
+        for agent_id in ('001', '002', '003'):
+            add_last_scan(agent_id, '2024-01-01T00:00:00Z')
+        add_vulns('001', [openssl])
+        add_vulns('002', [zlib])
+        add_vulns('003', [curl])
+        client.vulnerability_index(path=path).refresh()
+
+        responses.reset()
+        add_agents(['001', '002'])
+        add_last_scan('001', '2024-01-01T00:00:00Z')
+        add_last_scan('002', '2024-02-01T00:00:00Z')
+        add_vulns('002', [curl])
+
+        index = client.vulnerability_index(path=path)
+        result = index.refresh()
+
+        assert result == (['002'], ['001'], ['003'])
+        assert index.agents_with_cve('CVE-2022-0778') == {'001'}
+        assert index.agents_with_cve('CVE-2023-38545') == {'002'}
+        assert 'CVE-2022-37434' not in index.by_cve